@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark: event-loop stalls caused by output file writes
+
+Simulates a crawl where concurrent page fetches finish and their markdown is
+saved to a slow disk (each write sleeps --latency ms first, like a network
+filesystem). The pages are saved either with a blocking write on the event
+loop (the old behaviour) or through AsyncFileWriter. A monitor task ticks
+every millisecond and records how late the loop wakes it up.
+
+Usage (after `pip install -e .`):
+    python benchmarks/event_loop_stall_benchmark.py --pages 200 --latency 20
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from website2md.output_writer import AsyncFileWriter, write_text_file
+
+TICK = 0.001
+
+
+def _slow_write(latency: float, path: str, content: str) -> None:
+    time.sleep(latency)
+    write_text_file(path, content)
+
+
+async def _monitor(lags: list, stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - started - TICK)
+
+
+async def _run(mode: str, pages: int, concurrency: int, latency: float, output_dir: str) -> dict:
+    content = "# Page\n\n" + "Lorem ipsum dolor sit amet. " * 2000
+    lags: list = []
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(_monitor(lags, stop))
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def crawl(index: int, writer) -> None:
+        async with semaphore:
+            await asyncio.sleep(0.05)  # simulated page fetch
+            path = os.path.join(output_dir, f"{mode}-{index}.md")
+            if writer is None:
+                _slow_write(latency, path, content)
+            else:
+                await writer.submit(_slow_write, latency, path, content, key=path)
+
+    started = time.perf_counter()
+    if mode == "blocking":
+        await asyncio.gather(*(crawl(i, None) for i in range(pages)))
+    else:
+        async with AsyncFileWriter(workers=4, max_pending=64) as writer:
+            await asyncio.gather(*(crawl(i, writer) for i in range(pages)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await monitor
+    stalls = [lag for lag in lags if lag > 0.005]
+    return {
+        "elapsed": elapsed,
+        "max_stall_ms": max(lags) * 1000 if lags else 0.0,
+        "stalled_ms": sum(stalls) * 1000,
+        "stalls": len(stalls),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=20.0, help="Simulated write latency in ms")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        for mode in ("blocking", "threaded"):
+            stats = asyncio.run(_run(mode, args.pages, args.concurrency, args.latency / 1000, output_dir))
+            print(
+                f"{mode:>9}: {stats['elapsed']:.2f}s total, "
+                f"max stall {stats['max_stall_ms']:.1f} ms, "
+                f"{stats['stalls']} stalls > 5 ms totalling {stats['stalled_ms']:.0f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark: memory and speed of the seen-URL set backends
+
+Adds --urls synthetic documentation URLs to each backend (memory, hashed,
+bloom), then looks up as many again, half of them already seen. Memory is
+measured with tracemalloc in a separate pass, so it covers everything the
+backend allocated in Python (URL strings included) without slowing the
+timed pass; the bloom backend's SQLite key table is reported as disk usage.
+
+Usage (after `pip install -e .`):
+    python benchmarks/seen_set_benchmark.py --urls 1000000
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from website2md.seen_set import SEEN_SET_BACKENDS, open_seen_set
+
+
+def _url(index: int) -> str:
+    return f"https://docs.example.com/reference/api/v2/section-{index % 997}/page-{index}?lang=en"
+
+
+def _memory(backend: str, count: int) -> int:
+    tracemalloc.start()
+    seen = open_seen_set(backend)
+    for i in range(count):
+        seen.add(_url(i))
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    seen.close()
+    return memory
+
+
+def _run(backend: str, count: int) -> dict:
+    seen = open_seen_set(backend)
+    started = time.perf_counter()
+    for i in range(count):
+        seen.add(_url(i))
+    insert_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    hits = sum(1 for i in range(count // 2, count + count // 2) if _url(i) in seen)
+    lookup_time = time.perf_counter() - started
+
+    disk = seen.disk_bytes() if hasattr(seen, "disk_bytes") else 0
+    size = len(seen)
+    seen.close()
+    return {
+        "memory": _memory(backend, count),
+        "disk": disk,
+        "insert_us": insert_time / count * 1e6,
+        "lookup_us": lookup_time / count * 1e6,
+        "hits": hits,
+        "size": size,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--urls", type=int, default=1_000_000)
+    parser.add_argument("--backends", default=",".join(SEEN_SET_BACKENDS))
+    args = parser.parse_args()
+
+    scale = 1_000_000 / args.urls / (1024 * 1024)
+    for backend in args.backends.split(","):
+        stats = _run(backend, args.urls)
+        print(
+            f"{backend:>7}: {stats['memory'] * scale:7.1f} MB per million URLs in memory, "
+            f"{stats['disk'] * scale:6.1f} MB on disk, "
+            f"add {stats['insert_us']:.2f} us, lookup {stats['lookup_us']:.2f} us, "
+            f"{stats['hits']}/{args.urls} hits (expected {args.urls // 2}), {stats['size']} stored"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark: URL extraction from a large free-text file
+
+Writes --lines lines shaped like a web server log dump (most lines hold
+one URL somewhere in the text, some hold none) and extracts their
+canonical URLs three ways: the old line-by-line loop (a regex search and
+a urlparse validation per line), the ParallelURLExtractor in this
+process, and the ParallelURLExtractor with --workers processes.
+
+Usage (after `pip install -e .`):
+    python benchmarks/url_extract_benchmark.py --lines 5000000 --workers 8
+"""
+
+import argparse
+import os
+import random
+import re
+import tempfile
+import time
+from urllib.parse import urlparse
+
+from website2md.url_extract import ParallelURLExtractor
+from website2md.url_normalizer import URLNormalizer
+
+
+def legacy_extract(line: str):
+    """URLFileCrawler._extract_url_from_line as it was before url_extract"""
+    def valid(url):
+        try:
+            result = urlparse(url)
+            return all([result.scheme, result.netloc]) and result.scheme in ['http', 'https']
+        except Exception:
+            return False
+
+    if line.startswith(('mailto:', 'tel:', 'ftp:', 'file:')):
+        return None
+    if line.startswith(('http://', 'https://')) and valid(line):
+        return line
+    match = re.search(r'https?://[^\s<>"]+[^\s<>"\.]', line)
+    if match and valid(match.group()):
+        return match.group()
+    return None
+
+
+def write_log(path: str, lines: int, seed: int = 1) -> None:
+    rng = random.Random(seed)
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(lines):
+            page = f"https://docs{i % 40}.example.com/guide/section-{i % 997}/page-{rng.randrange(lines)}"
+            kind = rng.random()
+            if kind < 0.4:
+                f.write(page + "\n")
+            elif kind < 0.9:
+                f.write(f'10.0.{i % 256}.{i % 199} - - [12/Mar/2025:10:{i % 60:02d}:00] '
+                        f'"GET /x HTTP/1.1" 200 {i % 5000} "{page}?utm_source=feed" "Mozilla/5.0"\n')
+            else:
+                f.write(f"[worker-{i % 16}] heartbeat ok, queue={i % 1000}\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lines", type=int, default=5_000_000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "urls.log")
+    write_log(path, args.lines)
+    size_mb = os.path.getsize(path) / (1024 * 1024)
+    print(f"{args.lines} lines, {size_mb:.0f} MB")
+
+    normalizer = URLNormalizer()
+    started = time.perf_counter()
+    expected = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                url = legacy_extract(line)
+                if url:
+                    expected.append(normalizer.canonicalize(url))
+    legacy_time = time.perf_counter() - started
+    print(f"   line by line: {legacy_time:6.1f}s, {len(expected)} URLs")
+
+    for workers in sorted({1, args.workers}):
+        started = time.perf_counter()
+        urls = [key for chunk in ParallelURLExtractor(workers=workers).extract_chunks(path) for key in chunk.keys]
+        elapsed = time.perf_counter() - started
+        print(f"{workers:3d} worker(s): {elapsed:6.1f}s, {len(urls)} URLs, "
+              f"{legacy_time / elapsed:.1f}x, same output: {urls == expected}")
+
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark: URL canonicalization throughput and duplicate detection
+
+Generates a link stream shaped like a site crawl: most links are the
+navigation menu repeated on every page, the rest are unique pages, and a
+share of both come in variant spellings (host case, default port, index
+page, trailing slash, fragment, tracking parameters, query order). Each
+link is keyed with the old normalize_url (fragment removal and host
+lowercasing only), the canonicalizer without its cache, and the cached
+URLNormalizer. Fewer distinct keys means more duplicates caught.
+
+Usage (after `pip install -e .`):
+    python benchmarks/url_normalizer_benchmark.py --urls 1000000
+"""
+
+import argparse
+import random
+import time
+from urllib.parse import urlparse
+
+from website2md.url_normalizer import URLNormalizer
+
+
+def legacy_normalize_url(url: str) -> str:
+    """normalize_url as it was before the canonicalizer"""
+    try:
+        parsed = urlparse(url)
+        normalized = f"{parsed.scheme}://{parsed.netloc.lower()}{parsed.path}"
+        if parsed.query:
+            normalized += f"?{parsed.query}"
+        return normalized
+    except Exception:
+        return url
+
+
+def _variant(rng: random.Random, path: str, query: str) -> str:
+    host = rng.choice(["docs.example.com", "Docs.Example.com", "docs.example.com:443"])
+    if path.endswith("/") and rng.random() < 0.3:
+        path += "index.html"
+    elif rng.random() < 0.3:
+        path = path.rstrip("/") + "/"
+    params = query.split("&") if query else []
+    if len(params) > 1 and rng.random() < 0.5:
+        params.reverse()
+    if rng.random() < 0.3:
+        params.append(f"utm_source=nav{rng.randint(0, 9)}")
+    url = f"https://{host}{path}"
+    if params:
+        url += "?" + "&".join(params)
+    if rng.random() < 0.2:
+        url += f"#section-{rng.randint(0, 5)}"
+    return url
+
+
+def generate_links(count: int, nav_links: int, unique_share: float, seed: int = 1) -> list:
+    rng = random.Random(seed)
+    nav = [(f"/guide/{i}/", "lang=en&v=2" if i % 4 == 0 else "") for i in range(nav_links)]
+    links = []
+    for i in range(count):
+        if rng.random() < unique_share:
+            path, query = f"/reference/page-{i}", "page=1&sort=asc" if i % 5 == 0 else ""
+        else:
+            path, query = rng.choice(nav)
+        links.append(_variant(rng, path, query))
+    return links
+
+
+def _time(label: str, func, links: list) -> None:
+    started = time.perf_counter()
+    keys = {func(url) for url in links}
+    elapsed = time.perf_counter() - started
+    print(f"{label:>14}: {elapsed:.2f}s ({len(links) / elapsed / 1000:,.0f}k URLs/s), "
+          f"{len(keys):,} distinct keys")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--urls", type=int, default=1_000_000)
+    parser.add_argument("--nav-links", type=int, default=200, help="Links repeated on every page")
+    parser.add_argument("--unique", type=float, default=0.05, help="Share of links to unique pages")
+    args = parser.parse_args()
+
+    links = generate_links(args.urls, args.nav_links, args.unique)
+    print(f"{len(links):,} links, {len(set(links)):,} distinct spellings")
+
+    _time("legacy", legacy_normalize_url, links)
+    uncached = URLNormalizer(cache_size=0)
+    _time("uncached", uncached.canonicalize, links)
+    cached = URLNormalizer()
+    _time("cached", cached.canonicalize, links)
+    info = cached.cache_info()
+    print(f"{'cache':>14}: {info.hits / (info.hits + info.misses):.1%} hit rate, {info.currsize:,} entries")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,7 +11,7 @@ from .doc_crawler import DocSiteCrawler
 from .url_file_crawler import URLFileCrawler
 from .url_list_crawler import URLListCrawler
 from .config import CrawlConfig
-from .utils import save_results, load_config
+from .utils import save_results, load_config, read_jsonl
 
 __all__ = [
     "WebCrawler",
@@ -20,5 +20,6 @@ __all__ = [
     "URLListCrawler",
     "CrawlConfig", 
     "save_results",
-    "load_config"
+    "load_config",
+    "read_jsonl"
 ]
\ No newline at end of file
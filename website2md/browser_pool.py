@@ -0,0 +1,138 @@
+"""
+Shared browser pool for crawlers that fetch many pages in one run
+"""
+
+import asyncio
+import itertools
+import logging
+from typing import List, Optional
+
+try:
+    from crawl4ai import AsyncWebCrawler
+    from crawl4ai.async_configs import BrowserConfig, CrawlerRunConfig
+except ImportError:
+    print("crawl4ai not installed. Please install it with: pip install crawl4ai")
+    raise
+
+logger = logging.getLogger(__name__)
+
+
+class _PageSlot:
+    """A reusable browser tab (crawl4ai session) bound to one pooled browser"""
+
+    def __init__(self, crawler: AsyncWebCrawler, slot_id: int):
+        self.crawler = crawler
+        self.slot_id = slot_id
+        self.generation = 0
+        self.navigations = 0
+
+    @property
+    def session_id(self) -> str:
+        return f"pool_page_{self.slot_id}_{self.generation}"
+
+
+class BrowserPool:
+    """
+    Keep a small number of long-lived browsers open for a whole crawl run.
+
+    Each browser hands out tabs (crawl4ai sessions) to concurrent workers.
+    A tab is closed and replaced after ``max_navigations_per_page`` page loads
+    so that long runs do not accumulate leaked memory in a single tab.
+    """
+
+    def __init__(
+        self,
+        browser_config: BrowserConfig,
+        size: int = 1,
+        pages_per_browser: int = 5,
+        max_navigations_per_page: int = 50
+    ):
+        self.browser_config = browser_config
+        self.size = max(1, size)
+        self.pages_per_browser = max(1, pages_per_browser)
+        self.max_navigations_per_page = max(1, max_navigations_per_page)
+        self.navigations = 0
+        self.recycled_pages = 0
+        self._crawlers: List[AsyncWebCrawler] = []
+        self._slots: Optional[asyncio.Queue] = None
+
+    async def start(self) -> "BrowserPool":
+        """Launch the pooled browsers and prepare their tab slots"""
+        if self._crawlers:
+            return self
+
+        slot_ids = itertools.count()
+        self._slots = asyncio.Queue()
+
+        for _ in range(self.size):
+            crawler = AsyncWebCrawler(config=self.browser_config)
+            await crawler.start()
+            self._crawlers.append(crawler)
+
+        # Interleave slots so consecutive acquisitions spread across browsers
+        for _ in range(self.pages_per_browser):
+            for crawler in self._crawlers:
+                self._slots.put_nowait(_PageSlot(crawler, next(slot_ids)))
+
+        logger.info(
+            f"Browser pool started: {self.size} browser(s), "
+            f"{self.size * self.pages_per_browser} page slot(s)"
+        )
+        return self
+
+    async def close(self) -> None:
+        """Close every pooled browser"""
+        for crawler in self._crawlers:
+            try:
+                await crawler.close()
+            except Exception as e:
+                logger.debug(f"Error closing pooled browser: {e}")
+
+        self._crawlers = []
+        self._slots = None
+        logger.info(
+            f"Browser pool closed after {self.navigations} navigations "
+            f"({self.recycled_pages} page(s) recycled)"
+        )
+
+    async def __aenter__(self) -> "BrowserPool":
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
+
+    async def arun(self, url: str, config: CrawlerRunConfig):
+        """
+        Crawl a URL on a pooled tab
+
+        Args:
+            url: URL to crawl
+            config: Run configuration; it is cloned with the tab's session id
+
+        Returns:
+            crawl4ai CrawlResult
+        """
+        if self._slots is None:
+            raise RuntimeError("BrowserPool is not started")
+
+        slot = await self._slots.get()
+        try:
+            run_config = config.clone(session_id=slot.session_id)
+            return await slot.crawler.arun(url=url, config=run_config)
+        finally:
+            slot.navigations += 1
+            self.navigations += 1
+            if slot.navigations >= self.max_navigations_per_page:
+                await self._recycle(slot)
+            self._slots.put_nowait(slot)
+
+    async def _recycle(self, slot: _PageSlot) -> None:
+        """Close the slot's tab so the next navigation opens a fresh one"""
+        try:
+            await slot.crawler.crawler_strategy.kill_session(slot.session_id)
+        except Exception:
+            pass  # Session cleanup is best effort
+
+        slot.generation += 1
+        slot.navigations = 0
+        self.recycled_pages += 1
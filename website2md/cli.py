@@ -13,12 +13,14 @@ from .doc_crawler import DocSiteCrawler
 from .url_file_crawler import URLFileCrawler
 from .url_list_crawler import URLListCrawler
 from .config import CrawlConfig
-from .utils import format_file_size, get_file_size, create_safe_filename
+from .page_store import open_page_store
+from .manifest import rebuild_manifest as _rebuild_manifest
+from .segment_store import SEGMENT_DIR_NAME, SegmentStore
+from .sinks import MarkdownDirectorySink, create_writer
+from .utils import format_file_size, get_file_size
 import os
 import re
-import json
 from urllib.parse import urlparse
-from pathlib import Path
 
 # Setup logging
 logging.basicConfig(
@@ -38,6 +40,27 @@ logger = logging.getLogger(__name__)
 @click.option('--allow-external', is_flag=True, help='Allow crawling external domains (default: same domain only)')
 @click.option('--allowed-domains', help='Comma-separated list of additional domains to allow (e.g., "api.example.com,console.example.com")')
 @click.option('--exclude-selectors', help='Comma-separated list of CSS selectors to exclude from content (e.g., ".sidebar,.nav,.footer")')
+@click.option('--force', is_flag=True, help='Re-crawl URLs whose output file already exists (default: skip them)')
+@click.option('--revalidate', is_flag=True,
+              help='Docs/list mode: re-check existing files with ETag/Last-Modified and rewrite only changed pages')
+@click.option('--http-first', is_flag=True,
+              help='Fetch pages over plain HTTP and only render JavaScript-heavy pages in the browser')
+@click.option('--resume', 'resume_state', type=click.Path(dir_okay=False),
+              help='Site mode: checkpoint crawl state to this file and resume from it if it exists')
+@click.option('--format', 'output_format', type=click.Choice(['md', 'jsonl', 'json', 'csv', 'xml', 'txt']), default='md',
+              help='Site mode: one markdown file per page (md) or all pages streamed to <output>/pages.<format>')
+@click.option('--segments', is_flag=True,
+              help='Pack pages into large segment files under <output>/_segments instead of one file per page')
+@click.option('--compress', 'compression', type=click.Choice(['gzip', 'zstd']),
+              help='Write page files and the crawl summary compressed (.gz or .zst)')
+@click.option('--zstd-dictionary', is_flag=True,
+              help='With --compress zstd: train a dictionary on the first pages and share it across the site')
+@click.option('--rebuild-manifest', is_flag=True,
+              help='Recreate <output>/_manifest.sqlite from the files in the output directory before crawling')
+@click.option('--dedupe', is_flag=True,
+              help='Site mode: skip pages whose content is a near-duplicate of an already crawled page')
+@click.option('--seen-set', type=click.Choice(['memory', 'hashed', 'bloom']), default='memory',
+              help='How visited URLs are remembered: exact strings (memory), 64-bit hashes (hashed) or a Bloom filter with keys on disk (bloom)')
 @click.option('--verbose', '-v', is_flag=True, help='Enable verbose logging')
 def main(
     input_source: str,
@@ -47,6 +70,17 @@ def main(
     allow_external: bool,
     allowed_domains: Optional[str],
     exclude_selectors: Optional[str],
+    force: bool,
+    revalidate: bool,
+    http_first: bool,
+    resume_state: Optional[str],
+    output_format: str,
+    segments: bool,
+    compression: Optional[str],
+    zstd_dictionary: bool,
+    rebuild_manifest: bool,
+    dedupe: bool,
+    seen_set: str,
     verbose: bool
 ):
     """
@@ -73,6 +107,18 @@ def main(
     \b
     # Exclude specific content using CSS selectors
     website2md https://example.com --exclude-selectors ".advertisement,.popup,.cookie-banner" --output ./clean
+    
+    \b
+    # Nightly docs refresh: only rewrite pages that changed since the last run
+    website2md https://docs.example.com --type docs --output ./docs --revalidate
+    
+    \b
+    # Store pages zstd-compressed with a dictionary trained on the site's pages
+    website2md https://docs.example.com --type docs --output ./docs --compress zstd --zstd-dictionary
+    
+    \b
+    # Checkpoint a long site crawl and resume it after an interruption
+    website2md https://example.com --type site --resume ./example.state
     """
     
     # Setup logging level
@@ -90,6 +136,10 @@ def main(
     # Create output directory
     os.makedirs(output, exist_ok=True)
     
+    if rebuild_manifest:
+        count = _rebuild_manifest(output)
+        click.echo(f"[MANIFEST] Rebuilt manifest of {output}/ with {count} pages")
+    
     try:
         # Parse allowed domains list
         allowed_domains_list = None
@@ -107,28 +157,32 @@ def main(
         
         # Select and configure appropriate crawler
         if type == 'site':
-            crawler = _create_site_crawler(max_pages, allow_external, allowed_domains_list, exclude_selectors_list)
+            crawler = _create_site_crawler(max_pages, allow_external, allowed_domains_list, exclude_selectors_list, resume_state, http_first, dedupe, segments, compression, zstd_dictionary, seen_set)
             click.echo(f"[SITE] Crawling full website: {input_source}")
-            results = asyncio.run(crawler.crawl(input_source))
             
-            # Save results to markdown files
-            if results:
-                _save_crawl_results(results, output)
+            # Each page is written as soon as it is crawled
+            if output_format == 'md':
+                sink = MarkdownDirectorySink(output, pages=open_page_store(crawler.config, output))
+            else:
+                sink = create_writer(os.path.join(output, f'pages.{output_format}'), output_format)
+            with sink:
+                asyncio.run(crawler.crawl(input_source, sink=sink))
+            processed = sink.pages_received
             
         elif type == 'docs':
-            crawler = _create_docs_crawler(max_pages, output, allow_external, allowed_domains_list, exclude_selectors_list)
+            crawler = _create_docs_crawler(max_pages, output, allow_external, allowed_domains_list, exclude_selectors_list, force, http_first, revalidate, segments, compression, zstd_dictionary, seen_set)
             click.echo(f"[DOCS] Crawling documentation site: {input_source}")
             results = asyncio.run(crawler.crawl_documentation_site(input_source, output))
             
         elif type == 'list':
             if os.path.isfile(input_source):
                 # URL file
-                crawler = _create_url_file_crawler(max_pages, output, allow_external, allowed_domains_list, exclude_selectors_list)
+                crawler = _create_url_file_crawler(max_pages, output, allow_external, allowed_domains_list, exclude_selectors_list, force, http_first, revalidate, segments, compression, zstd_dictionary, seen_set)
                 click.echo(f"[FILE] Processing URL file: {input_source}")
                 results = asyncio.run(crawler.crawl_urls_from_file(input_source, output))
             else:
                 # URL list string
-                crawler = _create_url_list_crawler(max_pages, output, allow_external, allowed_domains_list, exclude_selectors_list)
+                crawler = _create_url_list_crawler(max_pages, output, allow_external, allowed_domains_list, exclude_selectors_list, force, http_first, revalidate, segments, compression, zstd_dictionary, seen_set)
                 click.echo(f"[LIST] Processing URL list")
                 results = asyncio.run(crawler.crawl_url_list(input_source, output))
         
@@ -137,8 +191,10 @@ def main(
             sys.exit(1)
         
         # Show summary
-        if results:
-            click.echo(f"[SUCCESS] Successfully processed {len(results)} pages")
+        if type != 'site':
+            processed = len(results) if results else 0
+        if processed:
+            click.echo(f"[SUCCESS] Successfully processed {processed} pages")
             click.echo(f"[OUTPUT] Output saved to: {output}/")
         else:
             click.echo("[ERROR] No pages were successfully processed", err=True)
@@ -146,6 +202,8 @@ def main(
                     
     except KeyboardInterrupt:
         click.echo("\n[INTERRUPTED] Process interrupted by user", err=True)
+        if resume_state and type == 'site':
+            click.echo(f"[INTERRUPTED] Progress saved, rerun with --resume {resume_state} to continue", err=True)
         sys.exit(1)
     except Exception as e:
         click.echo(f"[ERROR] Error: {str(e)}", err=True)
@@ -178,7 +236,7 @@ def _detect_input_type(input_source: str) -> str:
     return 'list'
 
 
-def _create_site_crawler(max_pages: int, allow_external: bool = False, allowed_domains: list = None, exclude_selectors: list = None) -> WebCrawler:
+def _create_site_crawler(max_pages: int, allow_external: bool = False, allowed_domains: list = None, exclude_selectors: list = None, state_file: Optional[str] = None, http_first: bool = False, dedupe: bool = False, segments: bool = False, compression: Optional[str] = None, compression_dictionary: bool = False, seen_set: str = 'memory') -> WebCrawler:
     """Create crawler for full website crawling"""
     config = CrawlConfig(
         max_depth=3,
@@ -191,12 +249,19 @@ def _create_site_crawler(max_pages: int, allow_external: bool = False, allowed_d
         exclude_selectors=exclude_selectors,
         javascript_enabled=True,
         max_concurrent_requests=5,
-        output_format='json'
+        output_format='json',
+        state_file=state_file,
+        http_fast_path=http_first,
+        dedupe_near_duplicates=dedupe,
+        output_backend='segments' if segments else 'files',
+        compression=compression,
+        compression_dictionary=compression_dictionary,
+        seen_set=seen_set
     )
     return WebCrawler(config)
 
 
-def _create_docs_crawler(max_pages: int, output_dir: str, allow_external: bool = False, allowed_domains: list = None, exclude_selectors: list = None) -> DocSiteCrawler:
+def _create_docs_crawler(max_pages: int, output_dir: str, allow_external: bool = False, allowed_domains: list = None, exclude_selectors: list = None, force: bool = False, http_first: bool = False, revalidate: bool = False, segments: bool = False, compression: Optional[str] = None, compression_dictionary: bool = False, seen_set: str = 'memory') -> DocSiteCrawler:
     """Create crawler for documentation sites"""
     # Default documentation site exclude selectors
     default_exclude_selectors = [
@@ -226,12 +291,19 @@ def _create_docs_crawler(max_pages: int, output_dir: str, allow_external: bool =
         additional_allowed_domains=allowed_domains,
         exclude_selectors=final_exclude_selectors,
         headless=True,
-        timeout=60
+        timeout=60,
+        overwrite_existing=force,
+        revalidate=revalidate,
+        http_fast_path=http_first,
+        output_backend='segments' if segments else 'files',
+        compression=compression,
+        compression_dictionary=compression_dictionary,
+        seen_set=seen_set
     )
     return DocSiteCrawler(config)
 
 
-def _create_url_file_crawler(max_pages: int, output_dir: str, allow_external: bool = False, allowed_domains: list = None, exclude_selectors: list = None) -> URLFileCrawler:
+def _create_url_file_crawler(max_pages: int, output_dir: str, allow_external: bool = False, allowed_domains: list = None, exclude_selectors: list = None, force: bool = False, http_first: bool = False, revalidate: bool = False, segments: bool = False, compression: Optional[str] = None, compression_dictionary: bool = False, seen_set: str = 'memory') -> URLFileCrawler:
     """Create crawler for URL file processing"""
     config = CrawlConfig(
         max_pages=max_pages,
@@ -241,12 +313,19 @@ def _create_url_file_crawler(max_pages: int, output_dir: str, allow_external: bo
         additional_allowed_domains=allowed_domains,
         exclude_selectors=exclude_selectors,
         headless=True,
-        timeout=30
+        timeout=30,
+        overwrite_existing=force,
+        revalidate=revalidate,
+        http_fast_path=http_first,
+        output_backend='segments' if segments else 'files',
+        compression=compression,
+        compression_dictionary=compression_dictionary,
+        seen_set=seen_set
     )
     return URLFileCrawler(config)
 
 
-def _create_url_list_crawler(max_pages: int, output_dir: str, allow_external: bool = False, allowed_domains: list = None, exclude_selectors: list = None) -> URLListCrawler:
+def _create_url_list_crawler(max_pages: int, output_dir: str, allow_external: bool = False, allowed_domains: list = None, exclude_selectors: list = None, force: bool = False, http_first: bool = False, revalidate: bool = False, segments: bool = False, compression: Optional[str] = None, compression_dictionary: bool = False, seen_set: str = 'memory') -> URLListCrawler:
     """Create crawler for URL list processing"""
     config = CrawlConfig(
         max_pages=max_pages,
@@ -256,7 +335,14 @@ def _create_url_list_crawler(max_pages: int, output_dir: str, allow_external: bo
         additional_allowed_domains=allowed_domains,
         exclude_selectors=exclude_selectors,
         headless=True,
-        timeout=30
+        timeout=30,
+        overwrite_existing=force,
+        revalidate=revalidate,
+        http_fast_path=http_first,
+        output_backend='segments' if segments else 'files',
+        compression=compression,
+        compression_dictionary=compression_dictionary,
+        seen_set=seen_set
     )
     return URLListCrawler(config)
 
@@ -300,68 +386,41 @@ def validate_config(config_file: str):
         sys.exit(1)
 
 
-def _save_crawl_results(results: list, output_dir: str) -> None:
-    """Save crawl results as markdown files"""
-    output_path = Path(output_dir)
-    output_path.mkdir(parents=True, exist_ok=True)
-    
-    # Save individual markdown files
-    for result in results:
-        if not result.get('content'):
-            continue
-            
-        url = result.get('url', '')
-        title = result.get('title', '')
-        content = result.get('content', '')
-        
-        # Create filename from URL
-        filename = create_safe_filename(url)
-        if not filename.endswith('.md'):
-            filename += '.md'
-            
-        filepath = output_path / filename
-        
-        # Create markdown content with metadata
-        markdown_content = f"""# {title}
+@cli.command()
+@click.argument('output_dir')
+@click.argument('export_dir')
+def export_segments(output_dir: str, export_dir: str):
+    """Export a segment-store crawl output to one markdown file per page"""
+    with SegmentStore(os.path.join(output_dir, SEGMENT_DIR_NAME)) as store:
+        count = store.export_directory(export_dir)
+    click.echo(f"[SUCCESS] Exported {count} pages to {export_dir}/")
 
-**URL**: {url}
-**Crawled**: {result.get('crawl_timestamp', '')}
 
----
+@cli.command()
+@click.argument('output_dir')
+def compact_segments(output_dir: str):
+    """Drop replaced pages from a segment-store crawl output"""
+    with SegmentStore(os.path.join(output_dir, SEGMENT_DIR_NAME)) as store:
+        reclaimed = store.compact()
+        stats = store.stats()
+    click.echo(f"[SUCCESS] Reclaimed {format_file_size(reclaimed)}, "
+               f"{stats['pages']} pages in {stats['segments']} segment(s)")
 
-{content}
-"""
-        
-        # Write file
-        try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(markdown_content)
-        except Exception as e:
-            click.echo(f"[WARNING] Failed to save {filename}: {e}")
-    
-    # Save summary
-    summary = {
-        'total_pages': len(results),
-        'successful_pages': len([r for r in results if r.get('success', True)]),
-        'failed_pages': len([r for r in results if not r.get('success', True)]),
-        'crawl_summary': [
-            {
-                'url': r.get('url'),
-                'title': r.get('title', ''),
-                'status_code': r.get('status_code', 200),
-                'content_length': r.get('content_length', 0),
-                'success': r.get('success', True)
-            }
-            for r in results
-        ]
-    }
-    
-    summary_path = output_path / '_crawl_summary.json'
-    try:
-        with open(summary_path, 'w', encoding='utf-8') as f:
-            json.dump(summary, f, indent=2, ensure_ascii=False)
-    except Exception as e:
-        click.echo(f"[WARNING] Failed to save summary: {e}")
+
+@cli.command()
+@click.argument('output_dir')
+@click.option('--workers', default=8, help='Threads reading files (default: 8)')
+def rebuild_manifest(output_dir: str, workers: int):
+    """Recreate the manifest of a crawl output directory from its files"""
+    count = _rebuild_manifest(output_dir, workers=workers)
+    click.echo(f"[SUCCESS] Rebuilt manifest of {output_dir}/ with {count} pages")
+
+
+def _save_crawl_results(results: list, output_dir: str) -> None:
+    """Save crawl results as markdown files"""
+    with MarkdownDirectorySink(output_dir) as sink:
+        for result in results:
+            sink.write(result)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,220 @@
+"""
+Compressed output files (gzip and zstd)
+"""
+
+import gzip
+import logging
+import os
+import threading
+from typing import Dict, List, Optional
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from .config import CrawlConfig
+
+logger = logging.getLogger(__name__)
+
+COMPRESSION_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+ZSTD_DICTIONARY_NAME = "_zstd.dict"
+
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def output_variants(filename: str) -> List[str]:
+    """Names an output file may have on disk: plain, then each compressed form"""
+    return [filename] + [filename + suffix for suffix in COMPRESSION_SUFFIXES.values()]
+
+
+def _require_zstandard() -> None:
+    if zstandard is None:
+        raise ImportError("zstd compression requires the zstandard package: pip install website2md[zstd]")
+
+
+class Compressor:
+    """
+    Compress output files and read back plain or compressed ones
+
+    With ``train_dictionary`` (zstd only), the first ``dictionary_samples``
+    pages are compressed on their own and kept as samples; a dictionary is
+    then trained from them, saved as ``_zstd.dict`` in the output directory
+    and used for every later page. Pages of one site share most of their
+    boilerplate, which the dictionary captures once instead of per file.
+    An existing dictionary is reused, so re-crawls keep a stable format.
+
+    All methods are thread-safe, so compression can run on AsyncFileWriter
+    threads.
+    """
+
+    def __init__(
+        self,
+        compression: Optional[str] = None,
+        level: Optional[int] = None,
+        output_dir: Optional[str] = None,
+        train_dictionary: bool = False,
+        dictionary_samples: int = 200,
+        dictionary_size: int = 112640
+    ):
+        """
+        Args:
+            compression: "gzip", "zstd", or None to write plain files
+            level: Compression level (default 6 for gzip, 3 for zstd)
+            output_dir: Directory holding the zstd dictionary
+            train_dictionary: Train and use a shared zstd dictionary
+            dictionary_samples: Number of pages to train the dictionary on
+            dictionary_size: Maximum dictionary size in bytes
+        """
+        if compression is not None and compression not in COMPRESSION_SUFFIXES:
+            raise ValueError(f"Unsupported compression: {compression}")
+        if compression == "zstd":
+            _require_zstandard()
+
+        self.compression = compression
+        self.suffix = COMPRESSION_SUFFIXES.get(compression, "")
+        self.level = level
+        self.output_dir = output_dir
+        self.train_dictionary = train_dictionary and compression == "zstd" and output_dir is not None
+        self.dictionary_samples = max(1, dictionary_samples)
+        self.dictionary_size = dictionary_size
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._samples: List[bytes] = []
+        self._dictionary = None
+        self._dictionary_checked = False
+        if self.train_dictionary:
+            self._dictionary = self._load_dictionary()
+
+    @property
+    def dictionary_path(self) -> Optional[str]:
+        if self.output_dir is None:
+            return None
+        return os.path.join(self.output_dir, ZSTD_DICTIONARY_NAME)
+
+    def _load_dictionary(self):
+        with self._lock:
+            self._dictionary_checked = True
+            path = self.dictionary_path
+            if path is None or zstandard is None or not os.path.exists(path):
+                return None
+            with open(path, 'rb') as f:
+                return zstandard.ZstdCompressionDict(f.read())
+
+    def _zstd_compressor(self, with_dictionary: bool):
+        # ZstdCompressor objects must not be shared between threads
+        compressors: Optional[Dict[bool, object]] = getattr(self._local, "compressors", None)
+        if compressors is None:
+            compressors = self._local.compressors = {}
+        compressor = compressors.get(with_dictionary)
+        if compressor is None:
+            compressor = zstandard.ZstdCompressor(
+                level=self.level or 3,
+                dict_data=self._dictionary if with_dictionary else None
+            )
+            compressors[with_dictionary] = compressor
+        return compressor
+
+    def _add_sample(self, data: bytes) -> None:
+        with self._lock:
+            if self._dictionary is not None or not self.train_dictionary:
+                return
+            self._samples.append(data)
+            if len(self._samples) < self.dictionary_samples:
+                return
+
+            samples, self._samples = self._samples, []
+            try:
+                dictionary = zstandard.train_dictionary(self.dictionary_size, samples, level=self.level or 3)
+            except zstandard.ZstdError as e:
+                logger.warning(f"Could not train a zstd dictionary, compressing pages without one: {e}")
+                self.train_dictionary = False
+                return
+
+            path = self.dictionary_path
+            tmp_path = path + ".tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(dictionary.as_bytes())
+            os.replace(tmp_path, path)
+            self._dictionary = dictionary
+            logger.info(f"Trained a {len(dictionary)} byte zstd dictionary on {len(samples)} pages: {path}")
+
+    def compress(self, data: bytes, use_dictionary: bool = True) -> bytes:
+        """
+        Compress ``data`` with the configured format
+
+        Args:
+            data: Bytes to compress
+            use_dictionary: Allow the shared zstd dictionary (pass False for
+                files that don't look like pages, such as summaries)
+        """
+        if self.compression is None:
+            return data
+        if self.compression == "gzip":
+            return gzip.compress(data, compresslevel=self.level or 6, mtime=0)
+
+        if use_dictionary and self.train_dictionary and self._dictionary is None:
+            self._add_sample(data)
+        with_dictionary = use_dictionary and self._dictionary is not None
+        return self._zstd_compressor(with_dictionary).compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        """Decompress gzip or zstd data; other data is returned unchanged"""
+        if data[:2] == b"\x1f\x8b":
+            return gzip.decompress(data)
+        if data[:4] != _ZSTD_MAGIC:
+            return data
+
+        _require_zstandard()
+        dictionary = None
+        dict_id = zstandard.get_frame_parameters(data).dict_id
+        if dict_id:
+            if self._dictionary is None and not self._dictionary_checked:
+                self._dictionary = self._load_dictionary()
+            dictionary = self._dictionary
+            if dictionary is None or dictionary.dict_id() != dict_id:
+                raise ValueError(f"Data was compressed with zstd dictionary {dict_id}, "
+                                 f"which is not in {self.dictionary_path}")
+        return zstandard.ZstdDecompressor(dict_data=dictionary).decompress(data)
+
+    def write_file(self, path: str, content: str, use_dictionary: bool = True) -> str:
+        """
+        Blocking write of ``content`` to ``path`` plus the compression suffix
+
+        Returns:
+            Path of the written file
+        """
+        path += self.suffix
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        data = self.compress(content.encode('utf-8'), use_dictionary)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def read_file(self, path: str) -> str:
+        """Read a plain, .gz or .zst output file as text"""
+        with open(path, 'rb') as f:
+            data = f.read()
+        if path.endswith(tuple(COMPRESSION_SUFFIXES.values())):
+            data = self.decompress(data)
+        return data.decode('utf-8')
+
+
+def open_compressor(config: CrawlConfig, output_dir: str) -> Optional[Compressor]:
+    """
+    Create the Compressor selected by config.compression
+
+    Returns:
+        Compressor, or None when output is not compressed
+    """
+    if not config.compression:
+        return None
+    return Compressor(
+        config.compression,
+        level=config.compression_level,
+        output_dir=output_dir,
+        train_dictionary=config.compression_dictionary
+    )
@@ -24,6 +24,7 @@ class CrawlConfig:
     browser_type: str = "chromium"  # chromium, firefox, webkit
     enable_browser_pooling: bool = False
     pool_size: int = 3
+    max_navigations_per_page: int = 50  # Recycle a pooled browser tab after this many page loads
     headless: bool = True
     enable_stealth: bool = False
     
@@ -31,6 +32,7 @@ class CrawlConfig:
     user_agent: str = "Mozilla/5.0 (compatible; Crawl4Website/1.0)"
     max_concurrent_requests: int = 10
     follow_redirects: bool = True
+    http_fast_path: bool = False  # Fetch over plain HTTP first, render in the browser only when needed
     
     # Content settings
     follow_external_links: bool = False
@@ -45,7 +47,44 @@ class CrawlConfig:
     # Output settings
     output_format: str = "json"
     output_file: Optional[str] = None
+    output_backend: str = "files"  # "files" (one .md per page) or "segments" (packed segment store)
+    compression: Optional[str] = None  # Compress output files: "gzip", "zstd" or None
+    compression_level: Optional[int] = None  # Compression level (None for the format's default)
+    compression_dictionary: bool = False  # zstd: train a dictionary shared by the site's pages
     include_metadata: bool = True
+    overwrite_existing: bool = False  # Re-crawl URLs whose output file already exists
+    revalidate: bool = False  # Re-check existing files with ETag / Last-Modified / content hash
+    writer_threads: int = 4  # Threads that write output files off the event loop
+    max_pending_writes: int = 256  # Queued writes before the crawl waits for the disk
+    state_file: Optional[str] = None  # SQLite checkpoint used to resume interrupted site crawls
+    dedupe_near_duplicates: bool = False  # Drop pages whose content SimHash matches a kept page
+    spill_large_fields: bool = False  # Keep large page fields of WebCrawler.results on disk
+    spill_dir: Optional[str] = None  # Spill store location (default: next to state_file, else a temp dir)
+    spill_threshold: int = 8 * 1024  # Links, screenshots, etc. larger than this are spilled
+    max_page_bytes: int = 512 * 1024  # Cap on the in-memory size of one result page
+    near_duplicate_distance: int = 3  # Max differing SimHash bits for a near-duplicate
+    
+    # Seen-URL set: "memory" (exact URL strings), "hashed" (sorted 64-bit
+    # hashes, 8 bytes per URL) or "bloom" (Bloom filter + keys on disk)
+    seen_set: str = "memory"
+    
+    # Distinct URLs kept in memory while deduplicating a URL list before it
+    # continues on disk (None keeps everything in memory)
+    dedupe_memory_urls: Optional[int] = 1_000_000
+    
+    # URL files are read while they are crawled: URLs are processed this many
+    # at a time and at most url_queue_size of them wait for a worker
+    url_chunk_size: int = 1000
+    url_queue_size: int = 10000
+    
+    # Plain-text URL files of at least url_extract_min_bytes are memory-mapped
+    # and scanned by url_extract_workers processes (None: one per CPU)
+    url_extract_workers: Optional[int] = None
+    url_extract_min_bytes: int = 64 * 1024 * 1024
+    
+    # URL canonicalization rule overrides, e.g. {"strip_trailing_slash": False}
+    # (see url_normalizer.CanonicalRules)
+    url_normalization: Optional[Dict[str, bool]] = None
     
     # Advanced settings
     javascript_enabled: bool = True
@@ -80,6 +119,7 @@ class CrawlConfig:
     js_wait_time: float = 3.0  # Time to wait for JS content to load (seconds)
     scroll_for_content: bool = True  # Scroll page to trigger lazy loading
     expand_menus: bool = True  # Try to expand collapsible menus
+    use_sitemap: bool = True  # Discover docs URLs under the start URL's path from robots.txt/sitemap.xml before menu expansion
     
     @classmethod
     def from_env(cls) -> "CrawlConfig":
@@ -119,12 +159,35 @@ class CrawlConfig:
             "user_agent": self.user_agent,
             "max_concurrent_requests": self.max_concurrent_requests,
             "follow_redirects": self.follow_redirects,
+            "http_fast_path": self.http_fast_path,
             "follow_external_links": self.follow_external_links,
             "allowed_domains": self.allowed_domains,
             "blocked_domains": self.blocked_domains,
             "output_format": self.output_format,
             "output_file": self.output_file,
+            "output_backend": self.output_backend,
+            "compression": self.compression,
+            "compression_level": self.compression_level,
+            "compression_dictionary": self.compression_dictionary,
             "include_metadata": self.include_metadata,
+            "overwrite_existing": self.overwrite_existing,
+            "revalidate": self.revalidate,
+            "writer_threads": self.writer_threads,
+            "max_pending_writes": self.max_pending_writes,
+            "state_file": self.state_file,
+            "dedupe_near_duplicates": self.dedupe_near_duplicates,
+            "seen_set": self.seen_set,
+            "dedupe_memory_urls": self.dedupe_memory_urls,
+            "url_chunk_size": self.url_chunk_size,
+            "url_queue_size": self.url_queue_size,
+            "url_extract_workers": self.url_extract_workers,
+            "url_extract_min_bytes": self.url_extract_min_bytes,
+            "url_normalization": self.url_normalization,
+            "spill_large_fields": self.spill_large_fields,
+            "spill_dir": self.spill_dir,
+            "spill_threshold": self.spill_threshold,
+            "max_page_bytes": self.max_page_bytes,
+            "near_duplicate_distance": self.near_duplicate_distance,
             "javascript_enabled": self.javascript_enabled,
             "extract_images": self.extract_images,
             "extract_links": self.extract_links,
@@ -134,6 +197,7 @@ class CrawlConfig:
             "browser_type": self.browser_type,
             "enable_browser_pooling": self.enable_browser_pooling,
             "pool_size": self.pool_size,
+            "max_navigations_per_page": self.max_navigations_per_page,
             "headless": self.headless,
             "enable_stealth": self.enable_stealth,
             "enable_screenshot": self.enable_screenshot,
@@ -145,4 +209,5 @@ class CrawlConfig:
             "timezone": self.timezone,
             "capture_network_traffic": self.capture_network_traffic,
             "capture_console_logs": self.capture_console_logs,
+            "use_sitemap": self.use_sitemap,
         }
\ No newline at end of file
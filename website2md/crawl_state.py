@@ -0,0 +1,168 @@
+"""
+On-disk crawl state so an interrupted crawl can be resumed
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import time
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+DONE = "done"
+FAILED = "failed"
+DUPLICATE = "duplicate"
+
+
+class CrawlState:
+    """
+    SQLite (WAL mode) store for the frontier, visited URLs and finished pages
+
+    Every URL is recorded when it is queued and updated when it finishes, and
+    the data of kept pages is stored alongside. Writes are committed in small
+    batches while the crawl runs, so after a crash, OOM or Ctrl-C the crawl
+    can pick up the queued URLs without refetching finished ones.
+    """
+
+    def __init__(self, path: str, checkpoint_every: int = 50, checkpoint_interval: float = 2.0):
+        self.path = path
+        self.checkpoint_every = checkpoint_every
+        self.checkpoint_interval = checkpoint_interval
+        self._pending_writes = 0
+        self._last_checkpoint = time.monotonic()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+            CREATE TABLE IF NOT EXISTS urls (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                depth INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                updated_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS urls_status ON urls(status);
+            CREATE TABLE IF NOT EXISTS pages (
+                key TEXT PRIMARY KEY,
+                data TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS fingerprints (
+                url TEXT PRIMARY KEY,
+                fingerprint INTEGER NOT NULL
+            );
+            """
+        )
+        self._conn.commit()
+
+    def get_meta(self, key: str) -> Optional[str]:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value)
+        )
+        self._wrote()
+
+    @property
+    def is_empty(self) -> bool:
+        """True if no URL has been recorded yet"""
+        return self._conn.execute("SELECT 1 FROM urls LIMIT 1").fetchone() is None
+
+    def enqueue(self, key: str, url: str, depth: int) -> None:
+        """Record a newly queued URL"""
+        self._conn.execute(
+            "INSERT OR IGNORE INTO urls (key, url, depth, status, updated_at) VALUES (?, ?, ?, ?, ?)",
+            (key, url, depth, QUEUED, time.time())
+        )
+        self._wrote()
+
+    def finish(self, key: str, status: str, page_data: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Record the outcome of a crawled URL
+
+        Args:
+            key: Normalized URL key
+            status: DONE, FAILED or DUPLICATE
+            page_data: Page data to keep for DONE pages
+        """
+        self._conn.execute(
+            "UPDATE urls SET status = ?, updated_at = ? WHERE key = ?",
+            (status, time.time(), key)
+        )
+        if page_data is not None:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (key, data) VALUES (?, ?)",
+                (key, json.dumps(page_data, ensure_ascii=False, default=str))
+            )
+        self._wrote()
+
+    def add_fingerprint(self, url: str, fingerprint: int) -> None:
+        """Store the content fingerprint of a kept page"""
+        # SQLite integers are signed 64-bit
+        if fingerprint >= 1 << 63:
+            fingerprint -= 1 << 64
+        self._conn.execute(
+            "INSERT OR REPLACE INTO fingerprints (url, fingerprint) VALUES (?, ?)", (url, fingerprint)
+        )
+        self._wrote()
+
+    def fingerprints(self) -> Iterator[Tuple[int, str]]:
+        """Yield the stored (fingerprint, url) pairs as unsigned 64-bit ints"""
+        for url, fingerprint in self._conn.execute("SELECT url, fingerprint FROM fingerprints"):
+            yield fingerprint & ((1 << 64) - 1), url
+
+    def seen_keys(self) -> Set[str]:
+        """Keys of every URL ever queued"""
+        return {row[0] for row in self._conn.execute("SELECT key FROM urls")}
+
+    def pending(self) -> List[Tuple[str, int, str]]:
+        """
+        URLs that were queued but never finished, in queue order
+
+        Returns:
+            List of (url, depth, key) tuples
+        """
+        return self._conn.execute(
+            "SELECT url, depth, key FROM urls WHERE status = ? ORDER BY rowid", (QUEUED,)
+        ).fetchall()
+
+    def count(self, status: str) -> int:
+        row = self._conn.execute("SELECT COUNT(*) FROM urls WHERE status = ?", (status,)).fetchone()
+        return row[0]
+
+    def iter_pages(self) -> Iterator[Dict[str, Any]]:
+        """Yield the stored data of finished pages in crawl order"""
+        for (data,) in self._conn.execute("SELECT data FROM pages ORDER BY rowid"):
+            yield json.loads(data)
+
+    def checkpoint(self) -> None:
+        """Commit all pending writes"""
+        self._conn.commit()
+        self._pending_writes = 0
+        self._last_checkpoint = time.monotonic()
+
+    def close(self) -> None:
+        """Commit pending writes and close the database"""
+        try:
+            self.checkpoint()
+        finally:
+            self._conn.close()
+
+    def _wrote(self) -> None:
+        self._pending_writes += 1
+        if (self._pending_writes >= self.checkpoint_every or
+                time.monotonic() - self._last_checkpoint >= self.checkpoint_interval):
+            self.checkpoint()
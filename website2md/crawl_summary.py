@@ -0,0 +1,131 @@
+"""
+Running crawl totals and the per-page event log
+"""
+
+import os
+import time
+from collections import Counter
+from typing import Any, Dict, Optional
+
+from .sinks import JSONLWriter
+from .utils import read_jsonl
+
+EVENT_LOG_NAME = "_crawl_events.jsonl"
+
+
+class CrawlSummary:
+    """
+    Counters for a crawl plus an append-only JSON Lines log of every page
+
+    Memory stays constant however many pages are crawled: per-page details
+    go to ``_crawl_events.jsonl`` as they happen (flushed at least once a
+    second), and only the totals are kept for the final summary. Each run
+    appends a ``start`` event followed by one ``page`` event per page, and
+    a ``correction`` event for each page that later moved to another
+    status, so the log of an interrupted run can still be tallied with
+    summarize_event_log().
+    """
+
+    def __init__(self, output_dir: Optional[str] = None, events_file: str = EVENT_LOG_NAME):
+        """
+        Args:
+            output_dir: Directory of the event log; no log is written if None
+            events_file: Event log filename
+        """
+        self.counts: Counter = Counter()
+        self.content_length = 0
+        self.started_at = time.time()
+        self.events_path = os.path.join(output_dir, events_file) if output_dir else None
+        self._events: Optional[JSONLWriter] = None
+        if self.events_path:
+            self._events = JSONLWriter(self.events_path, append=True)
+            self._events.write({"event": "start", "timestamp": self.started_at})
+
+    def record(self, status: str, entry: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Count a page and log its event
+
+        Args:
+            status: Outcome such as "crawled", "skipped" or "failed"
+            entry: Small per-page result dictionary (no page content)
+        """
+        self.counts[status] += 1
+        entry = entry or {}
+        if status != "failed":
+            self.content_length += entry.get("content_length") or 0
+        if self._events is not None:
+            self._events.write({"event": "page", "status": status, "timestamp": time.time(), **entry})
+
+    def correct(
+        self,
+        old_status: str,
+        new_status: str,
+        entry: Optional[Dict[str, Any]] = None,
+        content_length: int = 0
+    ) -> None:
+        """
+        Move an already counted page to another status, e.g. when its write failed
+
+        Args:
+            old_status: Status the page was recorded with
+            new_status: Status it moves to
+            entry: Small per-page details for the event log
+            content_length: Length counted when the page was recorded
+        """
+        self.counts[old_status] -= 1
+        self.counts[new_status] += 1
+        # Failed pages do not count towards the content total
+        if old_status != "failed":
+            self.content_length -= content_length
+        if new_status != "failed":
+            self.content_length += content_length
+        if self._events is not None:
+            self._events.write({
+                "event": "correction",
+                "from_status": old_status,
+                "status": new_status,
+                "timestamp": time.time(),
+                **(entry or {})
+            })
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    @property
+    def elapsed(self) -> float:
+        return time.time() - self.started_at
+
+    def close(self) -> None:
+        if self._events is not None:
+            self._events.close()
+
+    def __enter__(self) -> "CrawlSummary":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+
+def summarize_event_log(filename: str) -> Dict[str, int]:
+    """
+    Page counts by status for the last run recorded in an event log
+
+    Works on the log of a run that died before writing its summary.
+
+    Args:
+        filename: Path of a _crawl_events.jsonl file
+
+    Returns:
+        Dictionary of status -> page count
+    """
+    counts: Counter = Counter()
+    for event in read_jsonl(filename):
+        if event.get("event") == "start":
+            counts.clear()
+        elif event.get("event") == "page":
+            counts[event.get("status", "unknown")] += 1
+        elif event.get("event") == "correction":
+            counts[event.get("from_status", "unknown")] -= 1
+            counts[event.get("status", "unknown")] += 1
+    return {status: count for status, count in counts.items() if count}
@@ -5,7 +5,6 @@ Main web crawler implementation using crawl4ai
 import asyncio
 import time
 from typing import List, Dict, Any, Optional, Callable
-from urllib.parse import urljoin, urlparse
 import logging
 
 try:
@@ -17,7 +16,17 @@ except ImportError:
     raise
 
 from .config import CrawlConfig
-from .utils import save_results, is_valid_url, normalize_url, should_crawl_url
+from .crawl_state import CrawlState, DONE, DUPLICATE, FAILED
+from .domain_filter import DomainFilter
+from .fingerprint import SimHashIndex, simhash
+from .fetcher import open_fetcher
+from .frontier import CrawlFrontier, FrontierEntry
+from .output_writer import AsyncFileWriter
+from .seen_set import MemorySeenSet, SeenSet, format_seen_set_memory, open_seen_set
+from .sinks import ResultSink
+from .spill_store import PageData, SpillStore, load_pages, spill_page
+from .url_normalizer import URLNormalizer
+from .utils import save_results, is_valid_url
 
 logger = logging.getLogger(__name__)
 
@@ -28,27 +37,46 @@ class WebCrawler:
     def __init__(self, config: Optional[CrawlConfig] = None):
         self.config = config or CrawlConfig()
         self.results: List[Dict[str, Any]] = []
-        self.visited_urls: set = set()
+        self.visited_urls: SeenSet = MemorySeenSet()
         self.filters: Dict[str, Callable] = {}
         self.processors: Dict[str, Callable] = {}
         self.base_url: Optional[str] = None
+        self.domain_filter = DomainFilter()
+        self._state: Optional[CrawlState] = None
+        self._fingerprints: Optional[SimHashIndex] = None
+        self._sink: Optional[ResultSink] = None
+        self._writer: Optional[AsyncFileWriter] = None
+        self.duplicate_urls: Dict[str, str] = {}  # near-duplicate URL -> URL of the kept page
+        self.normalizer = URLNormalizer.for_config(self.config)
+        self.spill_store: Optional[SpillStore] = None
+        self.page_memory: Dict[str, int] = {}
         
-    async def crawl(self, start_url: str) -> List[Dict[str, Any]]:
+    async def crawl(self, start_url: str, sink: Optional[ResultSink] = None) -> List[Dict[str, Any]]:
         """
         Crawl a website starting from the given URL
         
+        If config.state_file is set, progress is checkpointed there and a
+        crawl interrupted earlier resumes from its unfinished URLs.
+        
         Args:
             start_url: The URL to start crawling from
+            sink: Optional sink that receives each page as soon as it is
+                processed; pages are then not kept in ``self.results``
             
         Returns:
-            List of crawled page data
+            List of crawled page data (empty when streaming to a sink)
         """
         if not is_valid_url(start_url):
             raise ValueError(f"Invalid URL: {start_url}")
         
         self.results = []
-        self.visited_urls = set()
+        self.duplicate_urls = {}
+        self.page_memory = {"pages": 0, "inline_bytes": 0, "spilled_bytes": 0, "largest_page_bytes": 0}
+        self._sink = sink
+        if sink is None and self.config.spill_large_fields and self.spill_store is None:
+            self.spill_store = self._open_spill_store()
         self.base_url = start_url  # Store base URL for domain filtering
+        self.domain_filter = DomainFilter.from_config(self.config, start_url)
         
         logger.info(f"Starting crawl from: {start_url}")
         
@@ -70,56 +98,167 @@ class WebCrawler:
             browser_config.locale = self.config.locale
             browser_config.timezone_id = self.config.timezone
         
-        async with AsyncWebCrawler(config=browser_config) as crawler:
-            await self._crawl_recursive(
-                crawler=crawler,
-                url=start_url,
-                depth=0
+        if self.config.state_file:
+            self._state = self._open_state(start_url)
+        
+        try:
+            frontier = CrawlFrontier(
+                max_pages=self.config.max_pages,
+                max_depth=self.config.max_depth,
+                delay=self.config.delay,
+                state=self._state,
+                normalizer=self.normalizer,
+                seen=open_seen_set(self.config)
             )
+            self.visited_urls = frontier.seen
+            
+            if self.config.dedupe_near_duplicates:
+                self._fingerprints = SimHashIndex(self.config.near_duplicate_distance)
+                if self._state is not None:
+                    # Fingerprints of earlier runs against this state file
+                    self._fingerprints.update(self._state.fingerprints())
+            
+            if self._state is not None and not self._state.is_empty:
+                if sink is None:
+                    pages = self._state.iter_pages()
+                    if self.spill_store is not None:
+                        pages = load_pages(pages, self.spill_store)
+                    self.results = list(pages)
+                restored = frontier.restore()
+                logger.info(
+                    f"Resuming crawl from {self.config.state_file}: "
+                    f"{self._state.count(DONE)} pages done, {restored} URLs queued"
+                )
+            elif self._should_crawl_url(start_url):
+                # Check domain restrictions using new filtering logic
+                frontier.add(start_url, depth=0)
+            
+            # Sink writes run on a writer thread so the event loop never waits on the disk
+            self._writer = AsyncFileWriter(workers=1, max_pending=self.config.max_pending_writes)
+            async with self._writer, \
+                    AsyncWebCrawler(config=browser_config) as browser, \
+                    open_fetcher(self.config, browser) as crawler:
+                workers = [
+                    asyncio.create_task(self._worker(crawler, frontier))
+                    for _ in range(max(1, self.config.max_concurrent_requests))
+                ]
+                try:
+                    await frontier.join()
+                finally:
+                    for worker in workers:
+                        worker.cancel()
+                    await asyncio.gather(*workers, return_exceptions=True)
+        finally:
+            self._fingerprints = None
+            self._sink = None
+            self._writer = None
+            if self.spill_store is not None:
+                self.spill_store.flush()
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(format_seen_set_memory(self.visited_urls))
+            if self._state is not None:
+                self._state.close()
+                self._state = None
         
-        logger.info(f"Crawl completed. Found {len(self.results)} pages")
+        if sink is None:
+            logger.info(f"Crawl completed. Found {len(self.results)} pages")
+        else:
+            logger.info("Crawl completed, pages streamed to sink")
+        if self.duplicate_urls:
+            logger.info(f"Skipped {len(self.duplicate_urls)} near-duplicate pages")
+        if self.page_memory["spilled_bytes"]:
+            logger.info(
+                f"Page memory: {self.page_memory['inline_bytes']} bytes in memory, "
+                f"{self.page_memory['spilled_bytes']} bytes spilled to {self.spill_store.path}"
+            )
         return self.results
     
-    async def _crawl_recursive(
+    def _open_spill_store(self) -> SpillStore:
+        """Spill store for this crawler's results, kept next to the state file so resumes find it"""
+        path = self.config.spill_dir
+        if path is None and self.config.state_file:
+            path = f"{self.config.state_file}.spill"
+        return SpillStore(path)
+    
+    async def _measure_page(self, page_data: Dict[str, Any]) -> PageData:
+        """Spill the large fields of a result page and account for its size"""
+        page, inline, spilled = await asyncio.to_thread(
+            spill_page, page_data, self.spill_store, self.config.spill_threshold, self.config.max_page_bytes
+        )
+        stats = self.page_memory
+        stats["pages"] += 1
+        stats["inline_bytes"] += inline
+        stats["spilled_bytes"] += spilled
+        stats["largest_page_bytes"] = max(stats["largest_page_bytes"], inline)
+        return page
+    
+    def _open_state(self, start_url: str) -> CrawlState:
+        """Open the checkpoint database, refusing one recorded for another crawl"""
+        state = CrawlState(self.config.state_file)
+        recorded_url = state.get_meta("start_url")
+        if recorded_url is None:
+            state.set_meta("start_url", start_url)
+            state.checkpoint()
+        elif recorded_url != start_url:
+            state.close()
+            raise ValueError(
+                f"State file {self.config.state_file} belongs to a crawl of {recorded_url}, "
+                f"not {start_url}"
+            )
+        return state
+    
+    def _record(self, entry: FrontierEntry, status: str, page_data: Optional[Dict[str, Any]] = None) -> None:
+        """Checkpoint the outcome of a frontier entry if crawl state is enabled"""
+        if self._state is not None:
+            self._state.finish(entry.key, status, page_data)
+    
+    async def _worker(self, crawler: AsyncWebCrawler, frontier: CrawlFrontier) -> None:
+        """
+        Long-lived worker that crawls frontier entries until cancelled
+        
+        Args:
+            crawler: The AsyncWebCrawler instance
+            frontier: Shared crawl frontier
+        """
+        while True:
+            entry = await frontier.get()
+            try:
+                if not await frontier.reserve():
+                    continue
+                
+                kept = False
+                try:
+                    kept = await self._crawl_entry(crawler, frontier, entry)
+                finally:
+                    if kept:
+                        await frontier.commit()
+                    else:
+                        await frontier.release()
+            finally:
+                frontier.task_done()
+    
+    async def _crawl_entry(
         self, 
         crawler: AsyncWebCrawler, 
-        url: str, 
-        depth: int
-    ) -> None:
+        frontier: CrawlFrontier,
+        entry: FrontierEntry
+    ) -> bool:
         """
-        Recursively crawl pages up to max_depth
+        Crawl a single frontier entry and queue its child links
         
         Args:
             crawler: The AsyncWebCrawler instance
-            url: Current URL to crawl
-            depth: Current crawling depth
+            frontier: Shared crawl frontier
+            entry: URL and depth to crawl
+            
+        Returns:
+            True if a page was added to the results
         """
-        # Check limits
-        if depth > self.config.max_depth:
-            return
-        
-        if len(self.results) >= self.config.max_pages:
-            return
-        
-        # Normalize and check if already visited
-        normalized_url = normalize_url(url)
-        if normalized_url in self.visited_urls:
-            return
-        
-        # Check domain restrictions using new filtering logic
-        if not self._should_crawl_url(url):
-            logger.debug(f"Skipping URL due to domain filtering: {url}")
-            return
-        
-        self.visited_urls.add(normalized_url)
+        url, depth = entry.url, entry.depth
         
         try:
             logger.info(f"Crawling (depth {depth}): {url}")
             
-            # Add delay between requests
-            if self.config.delay > 0:
-                await asyncio.sleep(self.config.delay)
-            
             # Create crawler run configuration with v0.6.x API
             run_config = CrawlerRunConfig(
                 word_count_threshold=self.config.word_count_threshold,
@@ -136,33 +275,81 @@ class WebCrawler:
             
             result = await crawler.arun(url=url, config=run_config)
             
-            if result.success:
-                # Process the crawled data
-                page_data = await self._process_page_data(result, url, depth)
-                if page_data:  # Only add if page_data is not None
-                    self.results.append(page_data)
-                
-                # Extract and crawl child links if not at max depth
-                if depth < self.config.max_depth and self.config.extract_links:
-                    links = self._extract_links(result.links, url)
-                    
-                    # Crawl child pages
-                    tasks = []
-                    for link in links:
-                        if len(self.results) + len(tasks) < self.config.max_pages:
-                            task = self._crawl_recursive(crawler, link, depth + 1)
-                            tasks.append(task)
-                    
-                    # Limit concurrent requests
-                    for i in range(0, len(tasks), self.config.max_concurrent_requests):
-                        batch = tasks[i:i + self.config.max_concurrent_requests]
-                        await asyncio.gather(*batch, return_exceptions=True)
-                        
-            else:
+            if not result.success:
                 logger.warning(f"Failed to crawl {url}: {result.error_message}")
+                self._record(entry, FAILED)
+                return False
+            
+            # Process the crawled data
+            page_data = await self._process_page_data(result, url, depth)
+            if not page_data:
+                self._record(entry, FAILED)
+                return False
+            
+            # Near-duplicates are neither kept nor expanded
+            if await self._is_near_duplicate(url, result):
+                self._record(entry, DUPLICATE)
+                return False
+            
+            if self._sink is not None:
+                # Streaming mode: the page goes to disk now and is not kept
+                await self._writer.submit(self._sink.write, page_data, key="sink")
+            else:
+                if self.spill_store is not None:
+                    # Large fields go to disk; results keep references to them
+                    page_data = await self._measure_page(page_data)
+                self.results.append(page_data)
+            
+            # Queue child links if not at max depth
+            if depth < self.config.max_depth and self.config.extract_links:
+                for link in self._extract_links(result.links, url):
+                    frontier.add(link, depth + 1)
+            
+            # Record the page after its links so a resumed crawl never loses them;
+            # streamed pages are already on disk and need not be stored again
+            if isinstance(page_data, PageData):
+                page_data = page_data.to_storable()
+            self._record(entry, DONE, page_data if self._sink is None else None)
+            return True
                 
         except Exception as e:
             logger.error(f"Error crawling {url}: {str(e)}")
+            self._record(entry, FAILED)
+            return False
+    
+    async def _is_near_duplicate(self, url: str, result) -> bool:
+        """
+        Check the page's content fingerprint against the pages kept so far
+        
+        The fingerprint is computed on a worker thread so long pages do not
+        stall the other crawls; the lookup and insert stay on the event
+        loop, so two similar pages finishing together cannot both be kept.
+        Pages that are not duplicates are added to the index.
+        
+        Args:
+            url: Page URL
+            result: Crawl result with converted markdown
+            
+        Returns:
+            True if a kept page is within config.near_duplicate_distance bits
+        """
+        if self._fingerprints is None or not result.markdown:
+            return False
+        
+        fingerprint = await asyncio.to_thread(simhash, str(result.markdown))
+        if fingerprint is None:
+            return False
+        
+        original = self._fingerprints.find(fingerprint, url)
+        if original is not None:
+            logger.info(f"Skipping near-duplicate {url} (matches {original})")
+            self.duplicate_urls[url] = original
+            return True
+        
+        self._fingerprints.add(fingerprint, url)
+        if self._state is not None:
+            self._state.add_fingerprint(url, fingerprint)
+        return False
     
     async def _process_page_data(self, result, url: str, depth: int) -> Dict[str, Any]:
         """Process crawled page data"""
@@ -259,6 +446,7 @@ class WebCrawler:
         external_links = links.get("external", [])
         
         # Add internal links
+        candidates = []
         for link in internal_links:
             if isinstance(link, dict):
                 href = link.get("href", "")
@@ -266,9 +454,7 @@ class WebCrawler:
                 href = str(link)
                 
             if href:
-                full_url = urljoin(base_url, href)
-                if is_valid_url(full_url) and self._should_crawl_url(full_url):
-                    extracted_links.append(full_url)
+                candidates.append(self.normalizer.resolve(base_url, href))
         
         # Add external links if allowed
         if self.config.follow_external_links:
@@ -278,22 +464,15 @@ class WebCrawler:
                 else:
                     href = str(link)
                     
-                if href and is_valid_url(href) and self._should_crawl_url(href):
-                    extracted_links.append(href)
+                if href:
+                    candidates.append(href)
         
+        extracted_links.extend(self.domain_filter.filter(candidates))
         return extracted_links
     
     def _should_crawl_url(self, url: str) -> bool:
-        """Check if URL should be crawled using new domain filtering logic"""
-        if not self.base_url:
-            return True
-            
-        return should_crawl_url(
-            target_url=url,
-            base_url=self.base_url,
-            allow_external_domains=self.config.allow_external_domains,
-            allowed_domains=self.config.additional_allowed_domains
-        )
+        """Check if URL should be crawled using the crawl's domain filter"""
+        return self.domain_filter.matches(url)
     
     def add_filter(self, name: str, filter_func: Callable) -> None:
         """Add a custom filter function"""
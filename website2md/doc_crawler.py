@@ -6,9 +6,10 @@ import asyncio
 import os
 import re
 import time
+from functools import partial
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Set
-from urllib.parse import urljoin, urlparse, unquote
+from urllib.parse import urlparse, unquote
 import logging
 
 try:
@@ -18,8 +19,19 @@ except ImportError:
     print("crawl4ai not installed. Please install it with: pip install crawl4ai")
     raise
 
+from .browser_pool import BrowserPool
 from .config import CrawlConfig
-from .utils import is_valid_url, normalize_url
+from .crawl_summary import CrawlSummary
+from .domain_filter import DomainFilter, url_host
+from .fetcher import open_fetcher
+from .output_writer import AsyncFileWriter, write_json_file
+from .page_store import open_page_store_async
+from .revalidation import Revalidator, open_revalidator
+from .scheduler import HostScheduler
+from .seen_set import SeenSet, open_seen_set
+from .sitemap import SitemapDiscovery
+from .url_normalizer import CanonicalURLSet, URLNormalizer
+from .utils import is_valid_url
 
 logger = logging.getLogger(__name__)
 
@@ -30,9 +42,20 @@ class DocSiteCrawler:
     def __init__(self, config: Optional[CrawlConfig] = None):
         self.config = config or CrawlConfig()
         self.base_domain = ""
-        self.sitemap_urls: Set[str] = set()
-        self.crawled_urls: Set[str] = set()
+        self.normalizer = URLNormalizer.for_config(self.config)
+        self.sitemap_urls = CanonicalURLSet(normalizer=self.normalizer)  # URLs as discovered, one per canonical form
+        self.crawled_urls: SeenSet = open_seen_set(self.config)
         self.failed_urls: Set[str] = set()
+        self.sitemap_lastmod: Dict[str, Optional[str]] = {}
+        self.discovery_method = ""
+        self._domain_filters: Dict[str, DomainFilter] = {}  # Keyed by base URL host
+        self._fetcher = None  # Shared page fetcher while crawl_documentation_site runs
+        self._scheduler: Optional[HostScheduler] = None  # Per-host spacing while crawl_documentation_site runs
+        self._revalidator: Optional[Revalidator] = None  # Set while a revalidating crawl runs
+        self._writer: Optional[AsyncFileWriter] = None  # Off-loop file writes while crawl_documentation_site runs
+        self._pages = None  # Output backend while crawl_documentation_site runs
+        self._failed_writes: Dict[str, int] = {}  # File path -> content length of pages whose write failed
+        self._single_pages: Dict[str, Any] = {}  # Output backends of standalone crawl_single_url calls
         
         # Set default exclude selectors for common documentation site elements
         if self.config.exclude_selectors is None:
@@ -112,7 +135,90 @@ class DocSiteCrawler:
         # Add .md extension
         return f"{filename}.md"
     
-    async def extract_sitemap_from_page(self, url: str) -> Set[str]:
+    async def discover_urls(self, start_url: str) -> CanonicalURLSet:
+        """
+        Discover documentation URLs, preferring published sitemaps
+        
+        robots.txt and sitemap.xml are tried first; the browser-based menu
+        expansion only runs when they yield no usable URLs.
+        
+        Args:
+            start_url: Starting URL of the documentation site
+            
+        Returns:
+            Set of discovered URLs
+        """
+        if self.config.use_sitemap:
+            urls = await self.extract_sitemap_from_xml(start_url)
+            if urls:
+                self.discovery_method = "sitemap"
+                return urls
+            logger.info("No usable sitemap found, falling back to menu expansion")
+        
+        self.discovery_method = "navigation"
+        return await self.extract_sitemap_from_page(start_url)
+    
+    async def extract_sitemap_from_xml(self, start_url: str) -> CanonicalURLSet:
+        """
+        Extract documentation links from the site's robots.txt / sitemap.xml
+        
+        Site-wide sitemaps also list blog posts, pricing pages and the like,
+        so only entries under start_url's directory are kept (everything for
+        a start_url at the site root). The <lastmod> of each kept URL is
+        stored in self.sitemap_lastmod.
+        
+        Args:
+            start_url: Starting URL of the documentation site
+            
+        Returns:
+            Set of discovered URLs
+        """
+        discovery = SitemapDiscovery(
+            user_agent=self.config.user_agent,
+            timeout=self.config.timeout,
+            concurrency=self.config.max_concurrent_requests
+        )
+        
+        discovered_urls = CanonicalURLSet(normalizer=self.normalizer)
+        try:
+            entries = await discovery.discover(start_url)
+        except Exception as e:
+            logger.warning(f"Sitemap discovery failed for {start_url}: {str(e)}")
+            return discovered_urls
+        
+        scope = self._sitemap_scope(start_url)
+        out_of_scope = 0
+        page_urls = list(entries)
+        allowed = self._domain_filter(start_url).match_many(page_urls)
+        for page_url, is_allowed in zip(page_urls, allowed):
+            if is_allowed and self._is_documentation_url(page_url):
+                path = urlparse(self.normalizer.canonicalize(page_url)).path
+                if scope and path != scope and not path.startswith(scope + '/'):
+                    out_of_scope += 1
+                    continue
+                if page_url not in discovered_urls:
+                    discovered_urls.add(page_url)
+                    self.sitemap_lastmod[page_url] = entries[page_url]
+        
+        if out_of_scope:
+            logger.info(f"Ignored {out_of_scope} sitemap URLs outside {scope or '/'}")
+        logger.info(f"Found {len(discovered_urls)} documentation URLs in sitemaps")
+        return discovered_urls
+    
+    def _sitemap_scope(self, start_url: str) -> str:
+        """
+        Path prefix that sitemap URLs must fall under
+        
+        The start page's directory: /docs for /docs/ and /docs/intro.html,
+        and an empty prefix (the whole site) for the root.
+        """
+        path = urlparse(self.normalizer.canonicalize(start_url)).path
+        last_segment = path.rsplit('/', 1)[-1]
+        if '.' in last_segment:
+            path = path[:-len(last_segment)]
+        return path.rstrip('/')
+    
+    async def extract_sitemap_from_page(self, url: str) -> CanonicalURLSet:
         """
         Extract all documentation links from a page with dynamic menu expansion
         
@@ -134,7 +240,7 @@ class DocSiteCrawler:
         # Use session to maintain state across multiple interactions
         session_id = f"sitemap_extraction_{int(time.time())}"
         
-        discovered_urls = set()
+        discovered_urls = CanonicalURLSet(normalizer=self.normalizer)
         
         try:
             async with AsyncWebCrawler(config=browser_config) as crawler:
@@ -308,11 +414,11 @@ class DocSiteCrawler:
                                 href = str(link)
                                 
                             if href:
-                                full_url = urljoin(url, href)
+                                full_url = self.normalizer.resolve(url, href)
                                 if (is_valid_url(full_url) and 
                                     self._is_documentation_url(full_url) and
                                     self._should_crawl_url(full_url, url)):
-                                    discovered_urls.add(normalize_url(full_url))
+                                    discovered_urls.add(full_url)
                     
                     logger.info(f"Found {len(discovered_urls)} total documentation URLs after comprehensive extraction")
                 else:
@@ -329,7 +435,7 @@ class DocSiteCrawler:
             
         return discovered_urls
     
-    def _extract_urls_from_navigation_json(self, html: str, base_url: str) -> Set[str]:
+    def _extract_urls_from_navigation_json(self, html: str, base_url: str) -> CanonicalURLSet:
         """
         Extract URLs from JSON navigation data structures embedded in HTML
         
@@ -342,7 +448,7 @@ class DocSiteCrawler:
         """
         import re
         
-        discovered_urls = set()
+        discovered_urls = CanonicalURLSet(normalizer=self.normalizer)
         parsed_base = urlparse(base_url)
         base_url_clean = f"{parsed_base.scheme}://{parsed_base.netloc}"
         
@@ -363,7 +469,7 @@ class DocSiteCrawler:
                         if clean_page:
                             full_url = f"{base_url_clean}/{clean_page}"
                             if self._is_documentation_url(full_url):
-                                discovered_urls.add(normalize_url(full_url))
+                                discovered_urls.add(full_url)
             
             # Pattern 2: Extract standalone page references
             # Look for URL-like patterns that could be navigation paths
@@ -392,7 +498,7 @@ class DocSiteCrawler:
                         full_url = f"{base_url_clean}/{path}"
                         if (self._is_documentation_url(full_url) and
                             self._should_crawl_url(full_url, base_url)):
-                            discovered_urls.add(normalize_url(full_url))
+                            discovered_urls.add(full_url)
             
             logger.info(f"JSON extraction found {len(discovered_urls)} unique URLs")
             
@@ -412,13 +518,16 @@ class DocSiteCrawler:
         Returns:
             True if URL should be crawled, False otherwise
         """
-        from .utils import should_crawl_url
-        return should_crawl_url(
-            target_url=target_url,
-            base_url=base_url,
-            allow_external_domains=self.config.allow_external_domains,
-            allowed_domains=self.config.additional_allowed_domains
-        )
+        return self._domain_filter(base_url).matches(target_url)
+    
+    def _domain_filter(self, base_url: str) -> DomainFilter:
+        """DomainFilter for links found under ``base_url``, built once per host"""
+        host = url_host(base_url)
+        domain_filter = self._domain_filters.get(host)
+        if domain_filter is None:
+            domain_filter = DomainFilter.from_config(self.config, base_url)
+            self._domain_filters[host] = domain_filter
+        return domain_filter
     
     def _is_documentation_url(self, url: str) -> bool:
         """
@@ -460,6 +569,31 @@ class DocSiteCrawler:
                 
         return True
     
+    def _browser_config(self) -> BrowserConfig:
+        """Browser configuration used for page crawls"""
+        return BrowserConfig(
+            headless=self.config.headless,
+            browser_type=self.config.browser_type,
+            verbose=False  # Less verbose for individual crawls
+        )
+    
+    def _create_browser_pool(self) -> BrowserPool:
+        """
+        Create the browser pool shared by all page crawls of a run
+        
+        One browser is used unless enable_browser_pooling is set, in which case
+        pool_size browsers split the concurrent workers between them.
+        """
+        size = self.config.pool_size if self.config.enable_browser_pooling else 1
+        size = max(1, size)
+        workers = max(1, self.config.max_concurrent_requests)
+        return BrowserPool(
+            self._browser_config(),
+            size=size,
+            pages_per_browser=-(-workers // size),
+            max_navigations_per_page=self.config.max_navigations_per_page
+        )
+    
     async def crawl_single_url(self, url: str, output_dir: str) -> Optional[Dict[str, Any]]:
         """
         Crawl a single URL and save as individual MD file
@@ -471,12 +605,30 @@ class DocSiteCrawler:
         Returns:
             Dictionary with crawl results or None if failed
         """
-        browser_config = BrowserConfig(
-            headless=self.config.headless,
-            browser_type=self.config.browser_type,
-            verbose=False  # Less verbose for individual crawls
-        )
-        
+        if self._pages is not None:
+            return await self._crawl_page(url, output_dir, self._pages)
+        
+        # Standalone calls share one store per output directory until close()
+        pages = self._single_pages.get(output_dir)
+        if pages is None:
+            opened = await open_page_store_async(self.config, output_dir)
+            # A concurrent call may have opened one meanwhile
+            pages = self._single_pages.setdefault(output_dir, opened)
+            if pages is not opened:
+                opened.close()
+        try:
+            return await self._crawl_page(url, output_dir, pages)
+        finally:
+            pages.flush()
+    
+    def close(self) -> None:
+        """Close the output backends opened by standalone crawl_single_url calls"""
+        while self._single_pages:
+            _, pages = self._single_pages.popitem()
+            pages.close()
+    
+    async def _crawl_page(self, url: str, output_dir: str, pages) -> Optional[Dict[str, Any]]:
+        """Crawl a single URL and save it to the ``pages`` output backend"""
         # Prepare content selection parameters
         css_selector = self.config.content_selector if self.config.content_selector else None
         excluded_selector = None
@@ -531,77 +683,100 @@ class DocSiteCrawler:
         
         # Check if file already exists and skip if so
         filename = self.url_to_filename(url)
-        file_path = os.path.join(output_dir, filename)
-        
-        if os.path.exists(file_path):
-            logger.info(f"Skipping {url} - file already exists: {filename}")
-            # Return success info for existing file
-            try:
-                file_size = os.path.getsize(file_path)
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    # Estimate content length (markdown content after metadata header)
-                    content_lines = content.split('\n')
-                    content_start = 0
-                    if content_lines and content_lines[0].strip() == '---':
-                        # Find end of metadata header
-                        for i in range(1, len(content_lines)):
-                            if content_lines[i].strip() == '---':
-                                content_start = i + 1
-                                break
-                    markdown_content = '\n'.join(content_lines[content_start:])
-                    
+        file_path = os.path.join(output_dir, pages.stored_name(filename))
+        
+        file_exists = pages.exists(url, filename)
+        revalidator = self._revalidator
+        
+        if file_exists and not self.config.overwrite_existing:
+            if revalidator is None:
+                logger.info(f"Skipping {url} - file already exists: {filename}")
+                existing = self._existing_file_result(pages, url, filename, file_path)
+                if existing is not None:
+                    return existing
+                # Continue with crawling if we can't read existing file
+            elif revalidator.can_probe(url):
+                if await revalidator.not_modified(url):
+                    logger.info(f"Not modified: {url}")
+                    existing = self._existing_file_result(pages, url, filename, file_path)
+                    if existing is not None:
+                        existing["unchanged"] = True
+                        return existing
+                # The render is a second request to the host, spaced like any other
+                if self._scheduler is not None:
+                    await self._scheduler.wait_for_host(url)
+                elif self.config.delay:
+                    await asyncio.sleep(self.config.delay)
+        
+        try:
+            logger.info(f"Crawling: {url}")
+            if self._fetcher is not None:
+                # Reuse the long-lived browser opened by crawl_documentation_site
+                result = await self._fetcher.arun(url=url, config=run_config)
+            else:
+                async with AsyncWebCrawler(config=self._browser_config()) as browser, \
+                        open_fetcher(self.config, browser) as crawler:
+                    result = await crawler.arun(url=url, config=run_config)
+            
+            if result.success and hasattr(result, 'markdown') and result.markdown:
+                markdown = str(result.markdown)
+                headers = getattr(result, 'response_headers', None)
+                if revalidator is not None:
+                    content_unchanged = revalidator.is_unchanged(url, markdown)
+                    if content_unchanged and file_exists and not self.config.overwrite_existing:
+                        # Same content as the last crawl: keep the file as it is
+                        logger.info(f"Unchanged: {url}")
+                        existing = self._existing_file_result(pages, url, filename, file_path)
+                        if existing is not None:
+                            revalidator.record(url, markdown, headers)
+                            existing["unchanged"] = True
+                            return existing
+                
+                # Prepare markdown content with metadata
+                content = self._prepare_markdown_content(result, url)
+                
+                # Save to file; validators are only recorded once it is written
+                if self._writer is not None and pages is self._pages:
+                    await self._writer.submit(
+                        pages.put, url, filename, content, key=file_path,
+                        on_done=partial(revalidator.record, url, markdown, headers) if revalidator else None,
+                        on_error=partial(self._write_failed, revalidator, url, file_path, len(result.markdown))
+                    )
+                else:
+                    # Standalone calls flush the store on return, so write before that
+                    try:
+                        await asyncio.to_thread(pages.put, url, filename, content)
+                    except Exception:
+                        if revalidator is not None:
+                            revalidator.forget(url)
+                        raise
+                    if revalidator is not None:
+                        revalidator.record(url, markdown, headers)
+                
+                logger.info(f"Saved: {filename}")
+                
+                # Return success info
                 return {
                     "url": url,
                     "filename": filename,
                     "file_path": file_path,
-                    "title": "Existing file",
-                    "content_length": len(markdown_content),
+                    "title": result.metadata.get("title", "") if hasattr(result, 'metadata') and result.metadata else "",
+                    "content_length": len(result.markdown),
                     "success": True,
-                    "skipped": True,
+                    "updated": file_exists,
+                    "timestamp": time.time()
+                }
+            else:
+                error_msg = result.error_message if hasattr(result, 'error_message') else "Unknown error"
+                logger.warning(f"Failed to crawl {url}: {error_msg}")
+                self.failed_urls.add(url)
+                return {
+                    "url": url,
+                    "success": False,
+                    "error": error_msg,
                     "timestamp": time.time()
                 }
-            except Exception as e:
-                logger.warning(f"Error reading existing file {file_path}: {str(e)}")
-                # Continue with crawling if we can't read existing file
-        
-        try:
-            async with AsyncWebCrawler(config=browser_config) as crawler:
-                logger.info(f"Crawling: {url}")
-                result = await crawler.arun(url=url, config=run_config)
                 
-                if result.success and hasattr(result, 'markdown') and result.markdown:
-                    # Prepare markdown content with metadata
-                    content = self._prepare_markdown_content(result, url)
-                    
-                    # Save to file
-                    os.makedirs(output_dir, exist_ok=True)
-                    with open(file_path, 'w', encoding='utf-8') as f:
-                        f.write(content)
-                    
-                    logger.info(f"Saved: {filename}")
-                    
-                    # Return success info
-                    return {
-                        "url": url,
-                        "filename": filename,
-                        "file_path": file_path,
-                        "title": result.metadata.get("title", "") if hasattr(result, 'metadata') and result.metadata else "",
-                        "content_length": len(result.markdown),
-                        "success": True,
-                        "timestamp": time.time()
-                    }
-                else:
-                    error_msg = result.error_message if hasattr(result, 'error_message') else "Unknown error"
-                    logger.warning(f"Failed to crawl {url}: {error_msg}")
-                    self.failed_urls.add(url)
-                    return {
-                        "url": url,
-                        "success": False,
-                        "error": error_msg,
-                        "timestamp": time.time()
-                    }
-                    
         except Exception as e:
             logger.error(f"Error crawling {url}: {str(e)}")
             self.failed_urls.add(url)
@@ -612,6 +787,40 @@ class DocSiteCrawler:
                 "timestamp": time.time()
             }
     
+    def _write_failed(self, revalidator: Optional[Revalidator], url: str, file_path: str, content_length: int) -> None:
+        """Remember a page whose queued write failed, so the summary can uncount it"""
+        self._failed_writes[file_path] = content_length
+        if revalidator is not None:
+            revalidator.forget(url)
+    
+    def _existing_file_result(self, pages, url: str, filename: str, file_path: str) -> Optional[Dict[str, Any]]:
+        """
+        Build the result entry for a page whose output file is kept
+        
+        Returns:
+            Result dictionary, or None if the page is not in the output
+        """
+        try:
+            # Length and hash come from the manifest, the file is not read
+            info = pages.info(url, filename)
+            if info is None:
+                raise FileNotFoundError(file_path)
+            
+            return {
+                "url": url,
+                "filename": filename,
+                "file_path": os.path.join(os.path.dirname(file_path), info["stored_name"]),
+                "title": "Existing file",
+                "content_length": info["content_length"],
+                "content_hash": info["content_hash"],
+                "success": True,
+                "skipped": True,
+                "timestamp": time.time()
+            }
+        except Exception as e:
+            logger.warning(f"Error reading existing file {file_path}: {str(e)}")
+            return None
+    
     def _prepare_markdown_content(self, result, url: str) -> str:
         """
         Prepare markdown content with metadata header
@@ -665,87 +874,140 @@ class DocSiteCrawler:
         
         # Step 1: Extract sitemap/navigation
         logger.info("Step 1: Extracting sitemap...")
-        self.sitemap_urls = await self.extract_sitemap_from_page(start_url)
+        self.sitemap_urls = await self.discover_urls(start_url)
         
         # Add start URL to sitemap if not already there
-        self.sitemap_urls.add(normalize_url(start_url))
+        self.sitemap_urls.add(start_url)
         
         logger.info(f"Found {len(self.sitemap_urls)} unique URLs to crawl")
         
         # Step 2: Crawl each URL and save as MD
         logger.info("Step 2: Crawling individual pages...")
         
-        successful_crawls = []
-        failed_crawls = []
-        skipped_crawls = []
-        
-        # Limit concurrent requests to avoid overwhelming the server
-        semaphore = asyncio.Semaphore(self.config.max_concurrent_requests)
-        
-        async def crawl_with_semaphore(url):
-            async with semaphore:
-                # Add delay between requests
-                if self.config.delay > 0:
-                    await asyncio.sleep(self.config.delay)
-                return await self.crawl_single_url(url, output_dir)
+        # Only totals are kept in memory; each page goes to the event log
+        os.makedirs(output_dir, exist_ok=True)
+        crawl_summary = CrawlSummary(output_dir)
         
-        # Process URLs in batches
-        batch_size = 5
+        # Requests to the same host are spaced by config.delay; workers only
+        # take a URL once its host is eligible
         url_list = list(self.sitemap_urls)
-        
-        for i in range(0, len(url_list), batch_size):
-            batch = url_list[i:i + batch_size]
-            
-            # Process batch
-            tasks = [crawl_with_semaphore(url) for url in batch]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            # Collect results
-            for result in results:
-                if isinstance(result, Exception):
-                    logger.error(f"Exception in crawl: {result}")
-                    failed_crawls.append({"error": str(result)})
-                elif result and result.get("success"):
-                    if result.get("skipped"):
-                        skipped_crawls.append(result)
-                    else:
-                        successful_crawls.append(result)
-                    self.crawled_urls.add(result["url"])
+        scheduler = HostScheduler(self.config.delay)
+        for url in url_list:
+            scheduler.put_nowait(url, url)
+        
+        processed = 0
+        
+        def collect(result) -> None:
+            if isinstance(result, Exception):
+                logger.error(f"Exception in crawl: {result}")
+                crawl_summary.record("failed", {"error": str(result)})
+            elif result and result.get("success"):
+                if result.get("skipped"):
+                    crawl_summary.record("skipped", result)
+                    if result.get("unchanged"):
+                        crawl_summary.counts["unchanged"] += 1
                 else:
-                    failed_crawls.append(result)
+                    crawl_summary.record("crawled", result)
+                    if result.get("updated"):
+                        crawl_summary.counts["updated"] += 1
+                self.crawled_urls.add(result["url"])
+            else:
+                crawl_summary.record("failed", result)
+        
+        async def worker() -> None:
+            nonlocal processed
+            while True:
+                url = await scheduler.get()
+                try:
+                    result = await self.crawl_single_url(url, output_dir)
+                    if result and self.sitemap_lastmod.get(url):
+                        result["lastmod"] = self.sitemap_lastmod[url]
+                    collect(result)
+                except Exception as e:
+                    collect(e)
+                finally:
+                    scheduler.task_done()
+                
+                processed += 1
+                if processed % 10 == 0 or processed == len(url_list):
+                    logger.info(f"Processed {processed}/{len(url_list)} pages")
+        
+        # All page crawls of this run share one long-lived browser pool
+        writer = AsyncFileWriter(self.config.writer_threads, self.config.max_pending_writes)
+        self._pages = await open_page_store_async(self.config, output_dir)
+        self._failed_writes.clear()
+        compressor = self._pages.compressor
+        try:
+            async with writer, \
+                    self._create_browser_pool() as pool, \
+                    open_fetcher(self.config, pool) as fetcher, \
+                    open_revalidator(self.config, output_dir) as revalidator:
+                self._fetcher = fetcher
+                self._scheduler = scheduler
+                self._revalidator = revalidator
+                self._writer = writer
+                workers = [
+                    asyncio.create_task(worker())
+                    for _ in range(max(1, self.config.max_concurrent_requests))
+                ]
+                try:
+                    await scheduler.join()
+                finally:
+                    for task in workers:
+                        task.cancel()
+                    await asyncio.gather(*workers, return_exceptions=True)
+                    self._fetcher = None
+                    self._scheduler = None
+                    self._revalidator = None
+                    self._writer = None
             
-            logger.info(f"Processed batch {i//batch_size + 1}/{(len(url_list) + batch_size - 1)//batch_size}")
+            # Pages whose file could not be written count as failed
+            for file_path, error in writer.errors:
+                crawl_summary.correct("crawled", "failed", {
+                    "file_path": file_path,
+                    "success": False,
+                    "error": f"Write failed: {error}"
+                }, content_length=self._failed_writes.pop(file_path, 0))
+        finally:
+            self._pages.close()
+            self._pages = None
+            # Flush the event log even if the crawl was interrupted
+            crawl_summary.close()
+        
+        counts = crawl_summary.counts
         
         # Step 3: Generate summary
         summary = {
             "start_url": start_url,
             "base_domain": self.base_domain,
+            "discovery_method": self.discovery_method,
             "urls_discovered": len(self.sitemap_urls),
-            "urls_crawled_successfully": len(successful_crawls),
-            "urls_skipped": len(skipped_crawls),
-            "urls_failed": len(failed_crawls),
-            "total_processed": len(successful_crawls) + len(skipped_crawls) + len(failed_crawls),
+            "urls_crawled_successfully": counts["crawled"],
+            "urls_skipped": counts["skipped"],
+            "urls_unchanged": counts["unchanged"],
+            "urls_updated": counts["updated"],
+            "urls_failed": counts["failed"],
+            "total_processed": counts["crawled"] + counts["skipped"] + counts["failed"],
+            "content_length_total": crawl_summary.content_length,
+            "elapsed_seconds": round(crawl_summary.elapsed, 2),
             "output_directory": output_dir,
             "crawl_timestamp": time.strftime('%Y-%m-%d %H:%M:%S'),
-            "successful_crawls": successful_crawls,
-            "skipped_crawls": skipped_crawls,
-            "failed_crawls": failed_crawls
+            "events_file": crawl_summary.events_path
         }
         
         # Save summary
         summary_file = os.path.join(output_dir, "_crawl_summary.json")
-        os.makedirs(output_dir, exist_ok=True)
-        
-        import json
-        with open(summary_file, 'w', encoding='utf-8') as f:
-            json.dump(summary, f, indent=2, ensure_ascii=False)
+        summary_file = await asyncio.to_thread(write_json_file, summary_file, summary, compressor)
         
         logger.info(f"Crawl completed!")
-        logger.info(f"Successfully crawled: {len(successful_crawls)} pages")
-        logger.info(f"Skipped existing: {len(skipped_crawls)} pages")
-        logger.info(f"Failed: {len(failed_crawls)} pages")
-        logger.info(f"Total processed: {len(successful_crawls) + len(skipped_crawls) + len(failed_crawls)} pages")
+        logger.info(f"Successfully crawled: {counts['crawled']} pages")
+        logger.info(f"Skipped existing: {counts['skipped']} pages")
+        if self.config.revalidate:
+            logger.info(f"Revalidated: {counts['unchanged']} unchanged, {counts['updated']} updated")
+        logger.info(f"Failed: {counts['failed']} pages")
+        logger.info(f"Total processed: {summary['total_processed']} pages")
         logger.info(f"Output saved to: {output_dir}")
         logger.info(f"Summary saved to: {summary_file}")
+        logger.info(f"Per-page events logged to: {crawl_summary.events_path}")
         
         return summary
\ No newline at end of file
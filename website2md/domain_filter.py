@@ -0,0 +1,155 @@
+"""
+Precompiled domain filter for deciding which links a crawl follows
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
+from .config import CrawlConfig
+
+_URL_NETLOC = re.compile(r"^[A-Za-z][A-Za-z0-9+.-]*://([^/?#]*)")
+
+# Trie markers: the rule's domain itself / any subdomain of it
+_SELF = "\0self"
+_SUBDOMAINS = "\0sub"
+
+
+def url_host(url: str) -> str:
+    """Lowercase ``host[:port]`` of an absolute URL, or "" if it has none"""
+    match = _URL_NETLOC.match(url)
+    if not match:
+        return ""
+    netloc = match.group(1)
+    if '@' in netloc:
+        netloc = netloc.rsplit('@', 1)[1]
+    return netloc.lower()
+
+
+def _strip_port(host: str) -> str:
+    if host.startswith('['):
+        return host.split(']', 1)[0] + ']'
+    return host.split(':', 1)[0]
+
+
+class DomainFilter:
+    """
+    Decide whether URLs fall inside a crawl's allowed domains
+
+    Built once per crawl. Hosts matching exactly (the start URL's host and
+    plain entries of ``allowed_domains``) are kept in a set; wildcard
+    entries (``*.example.com``) and, with ``include_subdomains``, every
+    entry are compiled into a trie of reversed host labels. Decisions are
+    cached per host, so the links of a page cost one regex match and one
+    dictionary lookup each.
+
+    With neither a base URL nor allowed domains, every valid URL passes.
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        allowed_domains: Optional[Iterable[str]] = None,
+        allow_external: bool = False,
+        include_subdomains: bool = False,
+        ignore_www: bool = False,
+        cache_size: int = 16384
+    ):
+        """
+        Args:
+            base_url: URL whose exact host is always allowed (the crawl's start URL)
+            allowed_domains: Additional hosts; ``*.example.com`` allows subdomains
+            allow_external: Allow every host
+            include_subdomains: Plain entries also allow their subdomains
+            ignore_www: Ignore a leading ``www.`` on hosts and entries
+            cache_size: Number of per-host decisions to cache
+        """
+        self.allow_external = allow_external
+        self.include_subdomains = include_subdomains
+        self.ignore_www = ignore_www
+        self.base_host = url_host(base_url) if base_url else None
+        self._exact = set()
+        self._trie: Dict[str, dict] = {}
+
+        if self.base_host:
+            self._exact.add(self._www(self.base_host))
+        for domain in allowed_domains or ():
+            self._add_rule(domain)
+        self.unrestricted = allow_external or not (self._exact or self._trie)
+        self._host_allowed = lru_cache(maxsize=cache_size)(self._check_host)
+
+    @classmethod
+    def from_config(cls, config: CrawlConfig, base_url: Optional[str]) -> "DomainFilter":
+        """Filter for a crawl that starts at ``base_url``"""
+        return cls(
+            base_url=base_url,
+            allowed_domains=config.additional_allowed_domains,
+            allow_external=config.allow_external_domains
+        )
+
+    def _www(self, host: str) -> str:
+        if self.ignore_www and host.startswith('www.'):
+            return host[4:]
+        return host
+
+    def _add_rule(self, domain: str) -> None:
+        domain = domain.strip().lower().rstrip('.')
+        if not domain:
+            return
+        if domain.startswith('*.'):
+            marker, domain = _SUBDOMAINS, domain[2:]
+        elif self.include_subdomains:
+            marker = _SELF
+            self._exact.add(self._www(domain))
+        else:
+            self._exact.add(self._www(domain))
+            return
+
+        node = self._trie
+        for label in reversed(_strip_port(self._www(domain)).split('.')):
+            node = node.setdefault(label, {})
+        node[_SUBDOMAINS] = True
+        if marker == _SELF:
+            node[_SELF] = True
+
+    def _check_host(self, host: str) -> bool:
+        host = self._www(host)
+        if host in self._exact:
+            return True
+        if not self._trie:
+            return False
+
+        labels = _strip_port(host).split('.')
+        node = self._trie
+        for remaining in range(len(labels) - 1, -1, -1):
+            node = node.get(labels[remaining])
+            if node is None:
+                return False
+            if remaining == 0:
+                return _SELF in node
+            if _SUBDOMAINS in node:
+                return True
+        return False
+
+    def matches(self, url: str) -> bool:
+        """Whether ``url`` is an absolute URL inside the allowed domains"""
+        host = url_host(url)
+        if not host:
+            return False
+        return self.unrestricted or self._host_allowed(host)
+
+    def match_many(self, urls: Iterable[str]) -> List[bool]:
+        """matches() for each URL, in order"""
+        if self.unrestricted:
+            return [bool(url_host(url)) for url in urls]
+        allowed = self._host_allowed
+        results = []
+        for url in urls:
+            host = url_host(url)
+            results.append(bool(host) and allowed(host))
+        return results
+
+    def filter(self, urls: Iterable[str]) -> List[str]:
+        """URLs that pass the filter, in order"""
+        urls = list(urls)
+        return [url for url, ok in zip(urls, self.match_many(urls)) if ok]
@@ -0,0 +1,174 @@
+"""
+HTTP-first page fetching with a browser fallback for JavaScript-rendered pages
+"""
+
+import logging
+import re
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Optional
+
+try:
+    from crawl4ai import AsyncWebCrawler, CacheMode
+    from crawl4ai.async_configs import CrawlerRunConfig, HTTPCrawlerConfig
+    from crawl4ai.async_crawler_strategy import AsyncHTTPCrawlerStrategy
+except ImportError:
+    print("crawl4ai not installed. Please install it with: pip install crawl4ai")
+    raise
+
+from .config import CrawlConfig
+
+logger = logging.getLogger(__name__)
+
+# Pages with less visible text than this are assumed to be rendered client-side
+MIN_TEXT_CHARS = 200
+
+_INVISIBLE_BLOCKS = re.compile(r'<(script|style|noscript|template)\b[^>]*>.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+_TAGS = re.compile(r'<[^>]+>')
+_BODY = re.compile(r'<body\b[^>]*>(.*)</body\s*>', re.IGNORECASE | re.DOTALL)
+_NOSCRIPT = re.compile(r'<noscript\b[^>]*>(.*?)</noscript\s*>', re.IGNORECASE | re.DOTALL)
+_EMPTY_SPA_ROOT = re.compile(
+    r'<div\b[^>]*\bid=["\'](?:root|app|__next|__nuxt|___gatsby|svelte)["\'][^>]*>\s*</div>',
+    re.IGNORECASE
+)
+
+
+def needs_javascript(result: Any, word_count_threshold: int = 10) -> bool:
+    """
+    Decide whether a page fetched over plain HTTP must be rendered in a browser
+
+    Args:
+        result: crawl4ai CrawlResult from the HTTP strategy
+        word_count_threshold: Minimum number of markdown words for a usable page
+
+    Returns:
+        True if the browser should fetch the page instead
+    """
+    if not result.success:
+        return True
+
+    # Bot walls and rate limits often answer plain clients differently
+    status_code = getattr(result, 'status_code', None) or 200
+    if status_code >= 400 and status_code not in (404, 410):
+        return True
+
+    html = result.html or ""
+    body_match = _BODY.search(html)
+    body = body_match.group(1) if body_match else html
+
+    if _EMPTY_SPA_ROOT.search(body):
+        return True
+
+    for noscript in _NOSCRIPT.findall(body):
+        if 'javascript' in noscript.lower():
+            return True
+
+    text = _TAGS.sub(' ', _INVISIBLE_BLOCKS.sub(' ', body))
+    if len(' '.join(text.split())) < MIN_TEXT_CHARS:
+        return True
+
+    markdown = str(result.markdown) if result.markdown else ""
+    if len(markdown.split()) < word_count_threshold:
+        return True
+
+    return False
+
+
+class HybridFetcher:
+    """
+    Fetch pages with a pooled HTTP client and fall back to the browser
+
+    Exposes the same ``arun(url=..., config=...)`` call as AsyncWebCrawler and
+    BrowserPool and returns the same CrawlResult, so crawlers can use it in
+    place of the browser. Pages that look JavaScript-rendered according to
+    needs_javascript() are re-fetched through ``browser``.
+    """
+
+    def __init__(self, config: CrawlConfig, browser: Any):
+        self.config = config
+        self.browser = browser
+        self.http_pages = 0
+        self.browser_pages = 0
+        self._http: Optional[AsyncWebCrawler] = None
+
+    async def start(self) -> "HybridFetcher":
+        if self._http is None:
+            headers = {"User-Agent": self.config.user_agent}
+            if self.config.headers:
+                headers.update(self.config.headers)
+
+            strategy = AsyncHTTPCrawlerStrategy(
+                browser_config=HTTPCrawlerConfig(
+                    headers=headers,
+                    follow_redirects=self.config.follow_redirects
+                ),
+                max_connections=max(1, self.config.max_concurrent_requests) * 2
+            )
+            self._http = AsyncWebCrawler(crawler_strategy=strategy)
+            await self._http.start()
+        return self
+
+    async def close(self) -> None:
+        if self._http is not None:
+            await self._http.close()
+            self._http = None
+            logger.info(
+                f"HTTP fast path served {self.http_pages} pages, "
+                f"browser fallback {self.browser_pages} pages"
+            )
+
+    async def __aenter__(self) -> "HybridFetcher":
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
+
+    async def arun(self, url: str, config: CrawlerRunConfig):
+        """
+        Fetch a URL over HTTP, rendering it in the browser only if needed
+
+        Args:
+            url: URL to fetch
+            config: Run configuration for the browser; browser-only options
+                are dropped for the HTTP attempt
+
+        Returns:
+            crawl4ai CrawlResult
+        """
+        if self._http is None:
+            raise RuntimeError("HybridFetcher is not started")
+
+        try:
+            # Never cache the HTTP response: under the same URL it would be
+            # served back to the browser fallback as the unrendered page
+            http_config = config.clone(
+                cache_mode=CacheMode.BYPASS,
+                js_code=None,
+                wait_for=None,
+                session_id=None,
+                screenshot=False,
+                delay_before_return_html=0
+            )
+            result = await self._http.arun(url=url, config=http_config)
+            if not needs_javascript(result, self.config.word_count_threshold):
+                self.http_pages += 1
+                return result
+            logger.debug(f"Falling back to browser for {url}")
+        except Exception as e:
+            logger.debug(f"HTTP fetch failed for {url}, falling back to browser: {e}")
+
+        self.browser_pages += 1
+        return await self.browser.arun(url=url, config=config)
+
+
+@asynccontextmanager
+async def open_fetcher(config: CrawlConfig, browser: Any) -> AsyncIterator[Any]:
+    """
+    Yield a HybridFetcher around ``browser`` if config.http_fast_path is set,
+    otherwise the browser itself
+    """
+    if not config.http_fast_path:
+        yield browser
+        return
+
+    async with HybridFetcher(config, browser) as fetcher:
+        yield fetcher
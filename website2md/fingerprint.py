@@ -0,0 +1,128 @@
+"""
+Content fingerprints for near-duplicate page detection
+"""
+
+import hashlib
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+FINGERPRINT_BITS = 64
+
+# Pages with fewer shingles than this are too short to compare reliably
+MIN_SHINGLES = 8
+
+_WORD = re.compile(r'\w+', re.UNICODE)
+_MASK = (1 << FINGERPRINT_BITS) - 1
+_HASH_BYTES = FINGERPRINT_BITS // 8
+# Byte values that have each of the 8 bits set
+_BYTES_WITH_BIT = [[value for value in range(256) if value >> bit & 1] for bit in range(8)]
+
+
+def _shingles(text: str, size: int = 3) -> Counter:
+    """Count the word n-grams of ``text``"""
+    words = _WORD.findall(text.lower())
+    if len(words) < size:
+        return Counter([' '.join(words)]) if words else Counter()
+    return Counter(' '.join(words[i:i + size]) for i in range(len(words) - size + 1))
+
+
+def simhash(text: str) -> Optional[int]:
+    """
+    Compute the 64-bit SimHash of a text from its word 3-shingles
+
+    Args:
+        text: Page content, usually markdown
+
+    Returns:
+        Fingerprint as an unsigned 64-bit int, or None for texts too short
+        to fingerprint
+    """
+    shingles = _shingles(text)
+    if sum(shingles.values()) < MIN_SHINGLES:
+        return None
+
+    # Shingle counts tallied per byte position and byte value of the hash;
+    # each fingerprint bit then sums 128 tallies instead of every shingle
+    # touching all 64 bits
+    tallies = [[0] * 256 for _ in range(_HASH_BYTES)]
+    total = 0
+    for shingle, count in shingles.items():
+        digest = hashlib.blake2b(shingle.encode('utf-8'), digest_size=_HASH_BYTES).digest()
+        for tally, value in zip(tallies, digest):
+            tally[value] += count
+        total += count
+
+    # A bit is set when the shingles with that hash bit outweigh the others
+    fingerprint = 0
+    for position, tally in enumerate(tallies):
+        shift = (_HASH_BYTES - 1 - position) * 8  # The digest is read big-endian
+        for bit, values in enumerate(_BYTES_WITH_BIT):
+            if 2 * sum(tally[value] for value in values) > total:
+                fingerprint |= 1 << (shift + bit)
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two fingerprints"""
+    return bin((a ^ b) & _MASK).count('1')
+
+
+class SimHashIndex:
+    """
+    Banded lookup table of SimHash fingerprints
+
+    The 64 bits are split into ``max_distance + 1`` bands. Two fingerprints
+    within ``max_distance`` bits of each other must agree exactly on at least
+    one band, so only fingerprints sharing a band are compared.
+    """
+
+    def __init__(self, max_distance: int = 3):
+        if not 0 <= max_distance < FINGERPRINT_BITS:
+            raise ValueError(f"max_distance must be between 0 and {FINGERPRINT_BITS - 1}")
+        self.max_distance = max_distance
+
+        bands = max_distance + 1
+        base, extra = divmod(FINGERPRINT_BITS, bands)
+        self._bands: List[Tuple[int, int]] = []
+        shift = 0
+        for i in range(bands):
+            width = base + (1 if i < extra else 0)
+            self._bands.append((shift, (1 << width) - 1))
+            shift += width
+
+        self._tables: List[Dict[int, List[Tuple[int, str]]]] = [{} for _ in self._bands]
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, fingerprint: int, url: str) -> None:
+        """Index the fingerprint of a kept page"""
+        for table, (shift, mask) in zip(self._tables, self._bands):
+            table.setdefault(fingerprint >> shift & mask, []).append((fingerprint, url))
+        self._size += 1
+
+    def update(self, entries: Iterable[Tuple[int, str]]) -> None:
+        """Index many (fingerprint, url) pairs"""
+        for fingerprint, url in entries:
+            self.add(fingerprint, url)
+
+    def find(self, fingerprint: int, url: Optional[str] = None) -> Optional[str]:
+        """
+        Look up a page close to ``fingerprint``
+
+        Args:
+            fingerprint: Fingerprint to look up
+            url: URL of the page being checked; its own earlier entry is ignored
+
+        Returns:
+            URL of an indexed page within max_distance bits, or None
+        """
+        for table, (shift, mask) in zip(self._tables, self._bands):
+            for candidate, candidate_url in table.get(fingerprint >> shift & mask, ()):
+                if candidate_url == url:
+                    continue
+                if hamming_distance(fingerprint, candidate) <= self.max_distance:
+                    return candidate_url
+        return None
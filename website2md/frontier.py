@@ -0,0 +1,164 @@
+"""
+Crawl frontier: a work queue of URLs shared by long-lived crawl workers
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Optional
+
+from .crawl_state import CrawlState, DONE
+from .scheduler import HostScheduler
+from .seen_set import MemorySeenSet, SeenSet
+from .url_normalizer import URLNormalizer, default_normalizer
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FrontierEntry:
+    """A URL waiting to be crawled and the depth it was discovered at"""
+    url: str
+    depth: int
+    key: str = ""
+
+
+class CrawlFrontier:
+    """
+    Queue of URLs to crawl with dedupe-on-insert and an exact page budget
+
+    URLs are deduplicated by their canonical form when they are added, so a
+    link seen on many pages, under any spelling, is queued once. Workers
+    reserve a slot of the page budget before fetching and either commit it
+    (page kept) or release it (fetch failed), which makes the number of kept
+    pages stop exactly at ``max_pages``.
+
+    Entries are handed out through a HostScheduler, so ``delay`` is enforced
+    per host without holding a worker while it waits. When a CrawlState is
+    given, every queued URL is also recorded on disk. The set of seen keys
+    can be any seen_set backend, e.g. a HashedSeenSet for very large crawls.
+    """
+
+    def __init__(
+        self,
+        max_pages: int,
+        max_depth: int,
+        delay: float = 0.0,
+        state: Optional[CrawlState] = None,
+        normalizer: Optional[URLNormalizer] = None,
+        seen: Optional[SeenSet] = None
+    ):
+        self.max_pages = max_pages
+        self.max_depth = max_depth
+        self.seen = seen if seen is not None else MemorySeenSet()
+        self.committed = 0
+        self.in_flight = 0
+        self._queue = HostScheduler(delay)
+        self._budget = asyncio.Condition()
+        self._closed = False
+        self.state = state
+        self.normalizer = normalizer or default_normalizer
+
+    @property
+    def exhausted(self) -> bool:
+        """True once the page budget has been used up"""
+        return self.committed >= self.max_pages
+
+    def add(self, url: str, depth: int) -> bool:
+        """
+        Queue a URL unless it is too deep, already seen or the crawl is over
+
+        Args:
+            url: URL to queue
+            depth: Depth at which the URL was discovered
+
+        Returns:
+            True if the URL was queued
+        """
+        if self._closed or depth > self.max_depth:
+            return False
+
+        key = self.normalizer.canonicalize(url)
+        if key in self.seen:
+            return False
+
+        self.seen.add(key)
+        if self.state is not None:
+            self.state.enqueue(key, url, depth)
+        self._queue.put_nowait(FrontierEntry(url=url, depth=depth, key=key), url)
+        return True
+
+    def restore(self) -> int:
+        """
+        Load visited URLs, finished page count and unfinished entries from state
+
+        Returns:
+            Number of re-queued entries
+        """
+        if self.state is None:
+            return 0
+
+        self.seen.update(self.state.seen_keys())
+        self.committed = self.state.count(DONE)
+
+        if self.exhausted:
+            self._closed = True
+            return 0
+
+        restored = 0
+        for url, depth, key in self.state.pending():
+            self._queue.put_nowait(FrontierEntry(url=url, depth=depth, key=key), url)
+            restored += 1
+        return restored
+
+    async def get(self) -> FrontierEntry:
+        """Wait for the next URL whose host may be crawled now"""
+        return await self._queue.get()
+
+    def task_done(self) -> None:
+        """Mark an entry returned by get() as fully processed"""
+        self._queue.task_done()
+
+    async def reserve(self) -> bool:
+        """
+        Reserve one page of the budget before fetching
+
+        Waits while every remaining slot is held by an in-flight fetch, since
+        one of them may still fail and hand its slot back.
+
+        Returns:
+            False if the budget is exhausted and the entry should be dropped
+        """
+        async with self._budget:
+            while self.committed + self.in_flight >= self.max_pages:
+                if self.exhausted:
+                    return False
+                await self._budget.wait()
+            self.in_flight += 1
+            return True
+
+    async def commit(self) -> None:
+        """Count a reserved page as kept"""
+        async with self._budget:
+            self.in_flight -= 1
+            self.committed += 1
+            if self.exhausted:
+                self._close()
+            self._budget.notify_all()
+
+    async def release(self) -> None:
+        """Return a reserved slot after a fetch that produced no page"""
+        async with self._budget:
+            self.in_flight -= 1
+            self._budget.notify_all()
+
+    async def join(self) -> None:
+        """Wait until the queue is drained and no entry is being processed"""
+        await self._queue.join()
+
+    def _close(self) -> None:
+        """Stop accepting URLs and drop everything still queued"""
+        self._closed = True
+        dropped = self._queue.clear()
+        if dropped:
+            logger.debug(f"Page limit reached, dropped {dropped} queued URLs")
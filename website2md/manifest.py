@@ -0,0 +1,279 @@
+"""
+Manifest of the pages in a crawl output directory
+"""
+
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .compression import COMPRESSION_SUFFIXES, Compressor
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "_manifest.sqlite"
+
+_URL_LINE = re.compile(r"^(?:url:\s*|\*\*URL\*\*:\s*)(\S+)\s*$")
+_HEADER_LINES = 10
+
+_COLUMNS = "url, filename, stored_name, size, content_hash, content_length, crawled_at"
+_COLUMN_NAMES = tuple(_COLUMNS.split(", "))
+
+
+def page_body(content: str) -> str:
+    """Markdown of a saved page without its ``---`` metadata header"""
+    if not content.startswith('---'):
+        return content
+    lines = content.split('\n')
+    if lines[0].strip() != '---':
+        return content
+    for i in range(1, len(lines)):
+        if lines[i].strip() == '---':
+            return '\n'.join(lines[i + 1:])
+    return content
+
+
+def page_url(content: str) -> Optional[str]:
+    """URL recorded in the header of a saved page, if any"""
+    for line in content.split('\n', _HEADER_LINES)[:_HEADER_LINES]:
+        match = _URL_LINE.match(line.strip())
+        if match:
+            return match.group(1)
+    return None
+
+
+def page_entry(url: str, filename: str, stored_name: str, content: str, size: int,
+               crawled_at: Optional[float] = None) -> Dict[str, Any]:
+    """Manifest entry for a page saved with ``content``"""
+    body = page_body(content)
+    return {
+        "url": url,
+        "filename": filename,
+        "stored_name": stored_name,
+        "size": size,
+        "content_hash": hashlib.sha256(body.encode('utf-8')).hexdigest(),
+        "content_length": len(body),
+        "crawled_at": crawled_at if crawled_at is not None else time.time(),
+    }
+
+
+class Manifest:
+    """
+    SQLite index of the pages saved in an output directory
+
+    Maps each URL to its filename, the name of the file on disk (which may
+    carry a .gz/.zst suffix), its size, the hash and length of its markdown
+    and the crawl time. Skip decisions and summaries of re-runs read the
+    manifest instead of the output files. Entries are committed in batches
+    of ``commit_every``; a crash loses at most one uncommitted batch, whose
+    pages are then simply crawled again. Thread-safe, so pages can be
+    recorded from AsyncFileWriter threads.
+    """
+
+    def __init__(self, output_dir: str, commit_every: int = 100):
+        self.output_dir = output_dir
+        self.path = os.path.join(output_dir, MANIFEST_NAME)
+        self.commit_every = commit_every
+        self._lock = threading.RLock()
+        self._pending = 0
+
+        os.makedirs(output_dir, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                filename TEXT NOT NULL,
+                stored_name TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                content_hash TEXT NOT NULL,
+                content_length INTEGER NOT NULL,
+                crawled_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS pages_filename ON pages(filename);
+            """
+        )
+        self._conn.commit()
+
+    def _row(self, row: Optional[Tuple]) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        return dict(zip(_COLUMN_NAMES, row))
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """Entry recorded for ``url``, or None"""
+        with self._lock:
+            row = self._conn.execute(f"SELECT {_COLUMNS} FROM pages WHERE url = ?", (url,)).fetchone()
+        return self._row(row)
+
+    def find(self, filename: str) -> Optional[Dict[str, Any]]:
+        """Entry of the page saved as ``filename``, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM pages WHERE filename = ? LIMIT 1", (filename,)
+            ).fetchone()
+        return self._row(row)
+
+    def record(self, entry: Dict[str, Any]) -> None:
+        """
+        Add or replace the entry for a saved page
+
+        Other URLs previously saved under the same filename are dropped,
+        since their file has just been overwritten.
+        """
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM pages WHERE filename = ? AND url != ?", (entry["filename"], entry["url"])
+            )
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO pages ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                tuple(entry[column] for column in _COLUMN_NAMES)
+            )
+            self._pending += 1
+            if self._pending >= self.commit_every:
+                self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._conn.commit()
+            self._pending = 0
+
+    def replace_all(self, entries: List[Dict[str, Any]]) -> None:
+        """Replace every entry in one transaction"""
+        with self._lock:
+            try:
+                self._conn.execute("DELETE FROM pages")
+                self._conn.executemany(
+                    f"INSERT OR REPLACE INTO pages ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (tuple(entry[column] for column in _COLUMN_NAMES) for entry in entries)
+                )
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+            self._pending = 0
+
+    def reconcile(self, stored_names: Iterable[str]) -> int:
+        """
+        Drop the entries whose file is not among ``stored_names``
+
+        The names go through a temporary table, so a directory of any size
+        is matched in SQLite rather than in memory.
+
+        Args:
+            stored_names: Names of the page files present in the directory
+
+        Returns:
+            Number of entries dropped
+        """
+        with self._lock:
+            try:
+                self._conn.execute("CREATE TEMP TABLE IF NOT EXISTS present (name TEXT PRIMARY KEY)")
+                self._conn.execute("DELETE FROM present")
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO present (name) VALUES (?)", ((name,) for name in stored_names)
+                )
+                dropped = self._conn.execute(
+                    "DELETE FROM pages WHERE stored_name NOT IN (SELECT name FROM present)"
+                ).rowcount
+                self._conn.execute("DROP TABLE present")
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+            self._pending = 0
+        return dropped
+
+    def entries(self) -> Iterator[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(f"SELECT {_COLUMNS} FROM pages ORDER BY rowid").fetchall()
+        for row in rows:
+            yield self._row(row)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is None:
+                return
+            self.flush()
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self) -> "Manifest":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+
+def is_page_file(name: str) -> bool:
+    """Whether ``name`` is a page file (plain or compressed markdown) of an output directory"""
+    for suffix in COMPRESSION_SUFFIXES.values():
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+            break
+    return name.endswith('.md') and not name.startswith('_')
+
+
+def _scan_page(output_dir: str, stored_name: str, compressor: Compressor) -> Optional[Dict[str, Any]]:
+    path = os.path.join(output_dir, stored_name)
+    try:
+        stat = os.stat(path)
+        content = compressor.read_file(path)
+    except Exception as e:
+        logger.warning(f"Could not read {path}: {e}")
+        return None
+
+    url = page_url(content)
+    if url is None:
+        logger.warning(f"No URL in the header of {path}, leaving it out of the manifest")
+        return None
+
+    filename = stored_name
+    for suffix in COMPRESSION_SUFFIXES.values():
+        if filename.endswith(suffix):
+            filename = filename[:-len(suffix)]
+            break
+    return page_entry(url, filename, stored_name, content, stat.st_size, crawled_at=stat.st_mtime)
+
+
+def rebuild_manifest(output_dir: str, workers: int = 8) -> int:
+    """
+    Recreate the manifest of ``output_dir`` from the page files in it
+
+    Files are read and hashed on a thread pool; the URL of each page comes
+    from its metadata header. The new manifest replaces the old one
+    atomically.
+
+    Args:
+        output_dir: Crawl output directory
+        workers: Number of threads reading files
+
+    Returns:
+        Number of pages in the rebuilt manifest
+    """
+    names = [name for name in os.listdir(output_dir) if is_page_file(name)]
+    compressor = Compressor(output_dir=output_dir)
+
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        entries = [
+            entry for entry in pool.map(lambda name: _scan_page(output_dir, name, compressor), names,
+                                        chunksize=64)
+            if entry is not None
+        ]
+
+    with Manifest(output_dir) as manifest:
+        manifest.replace_all(entries)
+    logger.info(f"Rebuilt manifest of {output_dir}: {len(entries)} pages from "
+                f"{len(names)} files in {time.time() - started:.1f}s")
+    return len(entries)
@@ -0,0 +1,273 @@
+"""
+Non-blocking file output for the async crawlers
+"""
+
+import asyncio
+import json
+import logging
+import os
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from .compression import Compressor
+
+logger = logging.getLogger(__name__)
+
+
+def write_text_file(path: str, content: str) -> None:
+    """Blocking write of a UTF-8 text file, creating its directory"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+def write_json_file(path: str, data: Any, compressor: Optional[Compressor] = None) -> str:
+    """
+    Blocking write of an indented JSON file
+
+    Args:
+        path: Output path
+        data: JSON-serializable data
+        compressor: Compress the file, adding the compressor's suffix to ``path``
+
+    Returns:
+        Path of the written file
+    """
+    content = json.dumps(data, indent=2, ensure_ascii=False, default=str)
+    if compressor is not None:
+        return compressor.write_file(path, content, use_dictionary=False)
+    write_text_file(path, content)
+    return path
+
+
+class AsyncFileWriter:
+    """
+    Run blocking file writes on a small thread pool
+
+    Jobs are spread over ``workers`` lanes by key (the file path by default);
+    each lane runs its jobs in order, so writes to the same file or sink never
+    reorder. Each lane has a bounded queue: when it is full, the awaiting
+    crawler pauses until the disk catches up. Failed writes are logged and
+    collected in ``errors`` instead of aborting the crawl.
+    """
+
+    def __init__(self, workers: int = 4, max_pending: int = 256):
+        self.workers = max(1, workers)
+        self.max_pending = max(self.workers, max_pending)
+        self.errors: List[Tuple[str, str]] = []
+        self.jobs_done = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lanes: List[asyncio.Queue] = []
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self) -> "AsyncFileWriter":
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="website2md-writer")
+            per_lane = max(1, self.max_pending // self.workers)
+            self._lanes = [asyncio.Queue(maxsize=per_lane) for _ in range(self.workers)]
+            self._tasks = [asyncio.create_task(self._drain(lane)) for lane in self._lanes]
+        return self
+
+    async def close(self) -> None:
+        """Wait for every queued write to finish, then stop the threads"""
+        if self._executor is None:
+            return
+        try:
+            await self.join()
+        finally:
+            for task in self._tasks:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            self._executor.shutdown(wait=True)
+            self._executor = None
+            self._lanes = []
+            self._tasks = []
+            if self.errors:
+                logger.error(f"{len(self.errors)} file writes failed")
+
+    async def __aenter__(self) -> "AsyncFileWriter":
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
+
+    async def submit(
+        self,
+        func: Callable[..., Any],
+        *args: Any,
+        key: str = "",
+        on_done: Optional[Callable[[], Any]] = None,
+        on_error: Optional[Callable[[], Any]] = None
+    ) -> None:
+        """
+        Queue a blocking call, waiting if its lane is full
+
+        Args:
+            func: Blocking function to run on the writer threads
+            *args: Arguments for ``func``
+            key: Jobs with the same key run in submission order
+            on_done: Called on the event loop once ``func`` has succeeded
+            on_error: Called on the event loop if ``func`` raised
+        """
+        if self._executor is None:
+            raise RuntimeError("AsyncFileWriter is not started")
+        lane = self._lanes[zlib.crc32(key.encode('utf-8')) % self.workers]
+        await lane.put((func, args, key, on_done, on_error))
+
+    async def write_text(self, path: str, content: str) -> None:
+        """Queue a text file write"""
+        await self.submit(write_text_file, path, content, key=path)
+
+    async def join(self) -> None:
+        """Wait until every queued job has run"""
+        for lane in self._lanes:
+            await lane.join()
+
+    async def _drain(self, lane: asyncio.Queue) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            func, args, key, on_done, on_error = await lane.get()
+            try:
+                await loop.run_in_executor(self._executor, func, *args)
+                self.jobs_done += 1
+                callback = on_done
+            except Exception as e:
+                logger.error(f"Write failed for {key or func.__name__}: {e}")
+                self.errors.append((key, str(e)))
+                callback = on_error
+            try:
+                if callback is not None:
+                    callback()
+            except Exception as e:
+                logger.error(f"Write callback failed for {key or func.__name__}: {e}")
+            finally:
+                lane.task_done()
+
+
+class PageSaver:
+    """
+    Save the pages of the URL list and file crawlers as results arrive
+
+    Skips pages whose file already exists, keeps unchanged pages when
+    revalidating, queues the rest on an AsyncFileWriter and keeps the
+    crawl summary counts. Only files whose write is still queued are
+    tracked here; written ones are found through the page store, so memory
+    stays bounded by the writer's queue however many pages are saved.
+    """
+
+    def __init__(
+        self,
+        writer: AsyncFileWriter,
+        pages: Any,
+        output_dir: str,
+        summary: Dict[str, Any],
+        revalidator: Any = None,
+        revalidating: Optional[Set[str]] = None,
+        overwrite_existing: bool = False
+    ):
+        """
+        Args:
+            writer: Started writer the pages are queued on
+            pages: Output backend (see page_store.open_page_store)
+            output_dir: Crawl output directory
+            summary: Crawl summary dictionary updated in place
+            revalidator: Revalidator of the run, if it revalidates
+            revalidating: URLs with an existing file that are crawled again
+                to re-check it; each is removed once its result is handled
+            overwrite_existing: Save pages even if their file exists
+        """
+        self.writer = writer
+        self.pages = pages
+        self.output_dir = output_dir
+        self.summary = summary
+        self.revalidator = revalidator
+        self.revalidating = revalidating if revalidating is not None else set()
+        self.overwrite_existing = overwrite_existing
+        self._queued: Dict[str, int] = {}  # File path -> writes still queued
+
+    async def save(self, result: Any, filename: str, crawled_at: str) -> None:
+        """
+        Handle one crawl result
+
+        Args:
+            result: crawl4ai CrawlResult
+            filename: Output filename of the page
+            crawled_at: Timestamp for the page's metadata header
+        """
+        summary = self.summary
+        summary['pages_crawled'] += 1
+        url = result.url
+        if not result.success:
+            summary['errors'] += 1
+            error_msg = f"{url}: {result.error_message}"
+            summary['error_details'].append(error_msg)
+            print(f"[ERROR] {error_msg}")
+            return
+
+        file_path = os.path.join(self.output_dir, self.pages.stored_name(filename))
+        file_exists = file_path in self._queued or self.pages.exists(url, filename)
+        rechecking = url in self.revalidating
+        self.revalidating.discard(url)
+
+        # Another URL of this run may have produced the same filename
+        if not self.overwrite_existing and file_exists and not rechecking:
+            summary['files_skipped'] += 1
+            print(f"[SKIP] {url} -> {filename} (exists)")
+            return
+
+        markdown = str(result.markdown)
+        headers = getattr(result, 'response_headers', None)
+        revalidator = self.revalidator
+        if revalidator is not None:
+            content_unchanged = revalidator.is_unchanged(url, markdown)
+            if content_unchanged and file_exists and not self.overwrite_existing:
+                revalidator.record(url, markdown, headers)
+                summary['files_skipped'] += 1
+                summary['files_unchanged'] += 1
+                print(f"[UNCHANGED] {url} -> {filename}")
+                return
+
+        content = f"---\nurl: {url}\ncrawled_at: {crawled_at}\n---\n{result.markdown}"
+
+        # Validators are only recorded once the file is written
+        self._queued[file_path] = self._queued.get(file_path, 0) + 1
+        await self.writer.submit(
+            self.pages.put, url, filename, content, key=file_path,
+            on_done=partial(self._written, file_path, url, markdown, headers),
+            on_error=partial(self._failed, file_path, url)
+        )
+
+        summary['files_saved'] += 1
+        if file_exists:
+            summary['files_updated'] += 1
+            print(f"[UPDATE] {url} -> {filename}")
+        else:
+            print(f"[SAVE] {url} -> {filename}")
+
+    def _dequeue(self, file_path: str) -> None:
+        remaining = self._queued.pop(file_path, 1) - 1
+        if remaining > 0:
+            self._queued[file_path] = remaining
+
+    def _written(self, file_path: str, url: str, markdown: str, headers: Any) -> None:
+        self._dequeue(file_path)
+        if self.revalidator is not None:
+            self.revalidator.record(url, markdown, headers)
+
+    def _failed(self, file_path: str, url: str) -> None:
+        self._dequeue(file_path)
+        if self.revalidator is not None:
+            self.revalidator.forget(url)
+
+    def count_write_errors(self) -> None:
+        """Move pages whose write failed from saved to errors; call once the writer is closed"""
+        summary = self.summary
+        for file_path, error in self.writer.errors:
+            summary['files_saved'] -= 1
+            summary['errors'] += 1
+            summary['error_details'].append(f"{file_path}: write failed: {error}")
+            print(f"[ERROR] Could not write {file_path}: {error}")
@@ -0,0 +1,172 @@
+"""
+Output backends for the docs and list crawlers
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any, Dict, Iterator, Optional
+
+from .compression import Compressor, open_compressor
+from .config import CrawlConfig
+from .manifest import MANIFEST_NAME, Manifest, is_page_file, page_entry, rebuild_manifest
+from .segment_store import SEGMENT_DIR_NAME, SegmentStore
+
+logger = logging.getLogger(__name__)
+
+
+class _PageStoreContext:
+    """Close the store when leaving a ``with`` or ``async with`` block"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+
+class DirectoryPageStore(_PageStoreContext):
+    """
+    One markdown file per page in a flat output directory
+
+    Every saved page is recorded in the directory's Manifest, and existence
+    checks, reads of page info and skip decisions go through it instead of
+    the filesystem. An output directory without a manifest (written by an
+    older version) gets one rebuilt from its files on first open, and an
+    existing manifest is reconciled with one listing of the directory, so
+    pages whose file was deleted by hand are crawled again. Open it with
+    open_page_store_async from async code, since both walk the directory. Pages are written through ``compressor`` (plain files by default);
+    existing pages are found in any of their plain or compressed forms.
+    """
+
+    def __init__(self, output_dir: str, compressor: Optional[Compressor] = None):
+        self.output_dir = output_dir
+        self.compressor = compressor or Compressor(output_dir=output_dir)
+        os.makedirs(output_dir, exist_ok=True)
+        if not os.path.exists(os.path.join(output_dir, MANIFEST_NAME)) and _has_page_files(output_dir):
+            logger.info(f"No manifest in {output_dir}, rebuilding it from the existing files")
+            rebuild_manifest(output_dir)
+            self.manifest = Manifest(output_dir)
+        else:
+            self.manifest = Manifest(output_dir)
+            dropped = self.manifest.reconcile(_page_file_names(output_dir))
+            if dropped:
+                logger.info(f"Dropped {dropped} manifest entries whose file is gone from {output_dir}")
+
+    def stored_name(self, filename: str) -> str:
+        """Name a page written now gets on disk"""
+        return filename + self.compressor.suffix
+
+    def exists(self, url: str, filename: str) -> bool:
+        return self.manifest.find(filename) is not None
+
+    def info(self, url: str, filename: str) -> Optional[Dict[str, Any]]:
+        """Manifest entry of the page saved as ``filename``, or None"""
+        return self.manifest.find(filename)
+
+    def put(self, url: str, filename: str, content: str) -> None:
+        """Blocking write of a page file"""
+        previous = self.manifest.find(filename)
+        path = self.compressor.write_file(os.path.join(self.output_dir, filename), content)
+        stored = os.path.basename(path)
+        if previous is not None and previous["stored_name"] != stored:
+            # Drop the copy of the page left in another format by an earlier crawl
+            try:
+                os.remove(os.path.join(self.output_dir, previous["stored_name"]))
+            except FileNotFoundError:
+                pass
+        self.manifest.record(page_entry(url, filename, stored, content, os.path.getsize(path)))
+
+    def read(self, url: str, filename: str) -> Optional[str]:
+        entry = self.manifest.find(filename)
+        if entry is None:
+            return None
+        try:
+            return self.compressor.read_file(os.path.join(self.output_dir, entry["stored_name"]))
+        except FileNotFoundError:
+            return None
+
+    def flush(self) -> None:
+        """Commit recorded pages to the manifest"""
+        self.manifest.flush()
+
+    def close(self) -> None:
+        self.manifest.close()
+
+
+def _has_page_files(output_dir: str) -> bool:
+    with os.scandir(output_dir) as entries:
+        return any(is_page_file(entry.name) for entry in entries)
+
+
+def _page_file_names(output_dir: str) -> Iterator[str]:
+    with os.scandir(output_dir) as entries:
+        for entry in entries:
+            if is_page_file(entry.name):
+                yield entry.name
+
+
+class SegmentPageStore(_PageStoreContext, SegmentStore):
+    """SegmentStore under ``<output_dir>/_segments`` with the page-store interface"""
+
+    compressor = None
+
+    def __init__(self, output_dir: str, **kwargs):
+        super().__init__(os.path.join(output_dir, SEGMENT_DIR_NAME), **kwargs)
+
+    def stored_name(self, filename: str) -> str:
+        return filename
+
+    def exists(self, url: str, filename: str) -> bool:
+        # By filename, like the directory backend: another URL may have
+        # produced the same one
+        return self.has_filename(filename)
+
+    def info(self, url: str, filename: str) -> Optional[Dict[str, Any]]:
+        content = self.get(url)
+        if content is None:
+            return None
+        return page_entry(url, filename, filename, content, len(content.encode('utf-8')))
+
+    def read(self, url: str, filename: str) -> Optional[str]:
+        return self.get(url)
+
+
+def open_page_store(config: CrawlConfig, output_dir: str):
+    """
+    Create the output backend selected by config.output_backend
+
+    Args:
+        config: Crawl configuration
+        output_dir: Crawl output directory
+
+    Pages of the directory backend are compressed as set by
+    config.compression; segment stores are written uncompressed.
+
+    Returns:
+        DirectoryPageStore or SegmentPageStore
+    """
+    if config.output_backend == "segments":
+        if config.compression:
+            logger.warning("Compression applies to the files output backend, segments are stored uncompressed")
+        return SegmentPageStore(output_dir)
+    if config.output_backend != "files":
+        raise ValueError(f"Unsupported output backend: {config.output_backend}")
+    return DirectoryPageStore(output_dir, compressor=open_compressor(config, output_dir))
+
+
+async def open_page_store_async(config: CrawlConfig, output_dir: str):
+    """
+    open_page_store on a worker thread
+
+    Opening may rebuild a missing manifest or recover a segment index,
+    both of which read the whole output, so async callers use this to keep
+    the event loop responsive.
+    """
+    return await asyncio.to_thread(open_page_store, config, output_dir)
@@ -0,0 +1,171 @@
+"""
+Public Suffix List lookups for registrable (base) domains
+"""
+
+import ipaddress
+import logging
+import threading
+from functools import lru_cache
+from importlib import resources
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PUBLIC_SUFFIX_LIST = "public_suffix_list.dat"
+
+# Marks a trie node where a rule ends
+_RULE = "\0"
+
+
+def _rule_labels(label: str) -> List[str]:
+    """A rule label plus its punycode spelling, which is how hosts appear in URLs"""
+    labels = [label]
+    if not label.isascii():
+        try:
+            labels.append(label.encode('idna').decode('ascii'))
+        except UnicodeError:
+            pass
+    return labels
+
+
+class PublicSuffixList:
+    """
+    Public Suffix List compiled into a trie of reversed domain labels
+
+    ``com -> example`` style paths end in a rule marker; wildcard rules
+    (``*.ck``) are stored as a ``*`` child and exception rules
+    (``!www.ck``) as a ``!www`` child. A lookup walks one trie node per
+    host label, so its cost depends on the depth of the host, not on the
+    ~10k rules. Both the ICANN and the private section are loaded, so
+    hosting suffixes such as github.io count as public suffixes.
+    """
+
+    def __init__(self, rules: Iterable[str]):
+        """
+        Args:
+            rules: Lines of a public_suffix_list.dat file
+        """
+        self._root: Dict[str, dict] = {}
+        self.rule_count = 0
+        for line in rules:
+            rule = line.strip()
+            if not rule or rule.startswith('//'):
+                continue
+            self._add(rule.split()[0].lower())
+
+    def _add(self, rule: str) -> None:
+        exception = rule.startswith('!')
+        labels = rule.lstrip('!').split('.')[::-1]
+
+        nodes = [self._root]
+        for depth, label in enumerate(labels):
+            prefix = '!' if exception and depth == len(labels) - 1 else ''
+            nodes = [node.setdefault(prefix + spelling, {}) for node in nodes for spelling in _rule_labels(label)]
+        for node in nodes:
+            node[_RULE] = True
+        self.rule_count += 1
+
+    @classmethod
+    def from_file(cls, path: str) -> "PublicSuffixList":
+        """Compile a public_suffix_list.dat file, e.g. a newer copy than the bundled one"""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(f)
+
+    @classmethod
+    def bundled(cls) -> "PublicSuffixList":
+        """Compile the copy of the list shipped in website2md/data"""
+        source = resources.files("website2md").joinpath("data", PUBLIC_SUFFIX_LIST)
+        with source.open('r', encoding='utf-8') as f:
+            return cls(f)
+
+    def suffix_length(self, labels: List[str]) -> int:
+        """
+        Number of trailing labels that form the public suffix
+
+        Hosts under an unknown TLD get a one-label suffix (the implicit
+        ``*`` rule).
+
+        Args:
+            labels: Host labels, e.g. ["docs", "example", "co", "uk"]
+        """
+        length = 1
+        node = self._root
+        for depth, label in enumerate(reversed(labels)):
+            if '!' + label in node:
+                return depth
+            if '*' in node:
+                length = depth + 1
+            node = node.get(label)
+            if node is None:
+                break
+            if _RULE in node:
+                length = depth + 1
+        return length
+
+    def public_suffix(self, host: str) -> str:
+        """Public suffix of ``host``, e.g. "co.uk" for "docs.example.co.uk" """
+        labels = host.lower().rstrip('.').split('.')
+        return '.'.join(labels[-self.suffix_length(labels):])
+
+    def registrable_domain(self, host: str) -> Optional[str]:
+        """
+        Public suffix plus one label, e.g. "example.co.uk" for "docs.example.co.uk"
+
+        Returns:
+            Registrable domain, or None when ``host`` is itself a public suffix
+        """
+        labels = host.lower().rstrip('.').split('.')
+        length = self.suffix_length(labels)
+        if len(labels) <= length:
+            return None
+        return '.'.join(labels[-(length + 1):])
+
+
+_default_list: Optional[PublicSuffixList] = None
+_default_lock = threading.Lock()
+
+
+def get_public_suffix_list() -> PublicSuffixList:
+    """Bundled list, compiled on first use"""
+    global _default_list
+    if _default_list is None:
+        with _default_lock:
+            if _default_list is None:
+                _default_list = PublicSuffixList.bundled()
+                logger.debug(f"Compiled {_default_list.rule_count} public suffix rules")
+    return _default_list
+
+
+def _is_ip_address(host: str) -> bool:
+    if not host or not (host[-1].isdigit() or ':' in host):
+        return False
+    try:
+        ipaddress.ip_address(host.strip('[]'))
+        return True
+    except ValueError:
+        return False
+
+
+@lru_cache(maxsize=65536)
+def base_domain(host: str) -> str:
+    """
+    Registrable domain of a host under the bundled list
+
+    IP addresses, single-label hosts and hosts that are themselves a
+    public suffix are returned unchanged.
+
+    Examples:
+        docs.anthropic.com -> anthropic.com
+        news.bbc.co.uk -> bbc.co.uk
+        user.github.io -> user.github.io
+
+    Args:
+        host: Lowercase hostname without port
+
+    Returns:
+        Base domain string, or "" for an empty host
+    """
+    host = host.rstrip('.')
+    if not host or '.' not in host or _is_ip_address(host):
+        return host
+    return get_public_suffix_list().registrable_domain(host) or host
@@ -0,0 +1,286 @@
+"""
+Conditional revalidation of previously crawled pages (ETag / Last-Modified / content hash)
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+import aiohttp
+
+from .config import CrawlConfig
+from .scheduler import HostScheduler
+
+logger = logging.getLogger(__name__)
+
+VALIDATOR_DB_NAME = "_validators.sqlite"
+
+
+def content_hash(markdown: str) -> str:
+    """Stable hash of page markdown used to detect unchanged content"""
+    return hashlib.sha256(markdown.encode('utf-8')).hexdigest()
+
+
+def _header(headers: Optional[Dict[str, str]], name: str) -> Optional[str]:
+    """Case-insensitive header lookup"""
+    if not headers:
+        return None
+    name = name.lower()
+    for key, value in headers.items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+class ValidatorStore:
+    """
+    SQLite table of per-URL ETag, Last-Modified and content hash
+
+    Writes are committed every ``commit_every`` changes and on close, so
+    recording a page does not cost a disk sync on the event loop. Rows lost
+    to a crash only make those pages render again on the next run.
+    """
+
+    def __init__(self, path: str, commit_every: int = 256):
+        self.path = path
+        self.commit_every = max(1, commit_every)
+        self._uncommitted = 0
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS validators (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                content_hash TEXT,
+                checked_at REAL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, url: str) -> Optional[Tuple[Optional[str], Optional[str], Optional[str]]]:
+        """
+        Returns:
+            (etag, last_modified, content_hash) or None if the URL is unknown
+        """
+        return self._conn.execute(
+            "SELECT etag, last_modified, content_hash FROM validators WHERE url = ?", (url,)
+        ).fetchone()
+
+    def put(self, url: str, etag: Optional[str], last_modified: Optional[str], digest: str) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO validators (url, etag, last_modified, content_hash, checked_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (url, etag, last_modified, digest, time.time())
+        )
+        self._changed()
+
+    def delete(self, url: str) -> None:
+        self._conn.execute("DELETE FROM validators WHERE url = ?", (url,))
+        self._changed()
+
+    def _changed(self) -> None:
+        self._uncommitted += 1
+        if self._uncommitted >= self.commit_every:
+            self.flush()
+
+    def flush(self) -> None:
+        """Commit pending changes"""
+        if self._uncommitted:
+            self._conn.commit()
+            self._uncommitted = 0
+
+    def close(self) -> None:
+        self.flush()
+        self._conn.close()
+
+
+class Revalidator:
+    """
+    Decide whether an already-saved page needs to be rendered and rewritten
+
+    Pages with a stored ETag or Last-Modified are first checked with a
+    conditional GET; a 304 answer means the page is unchanged and is not
+    rendered at all. Rendered pages are compared by content hash so identical
+    content is not rewritten.
+
+    Validators describe the file on disk, so a page is only recorded once
+    its file is written (see AsyncFileWriter.submit's on_done) and is
+    forgotten when the write fails.
+    """
+
+    def __init__(
+        self,
+        output_dir: str,
+        user_agent: str = "Mozilla/5.0 (compatible; Crawl4Website/1.0)",
+        timeout: int = 30,
+        concurrency: int = 10,
+        delay: float = 0.0
+    ):
+        self.output_dir = output_dir
+        self.user_agent = user_agent
+        self.timeout = timeout
+        self.concurrency = max(1, concurrency)
+        self.delay = delay
+        self.unchanged = 0
+        self.updated = 0
+        self._store: Optional[ValidatorStore] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def start(self) -> "Revalidator":
+        if self._store is None:
+            os.makedirs(self.output_dir, exist_ok=True)
+            self._store = ValidatorStore(os.path.join(self.output_dir, VALIDATOR_DB_NAME))
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={"User-Agent": self.user_agent}
+            )
+        return self
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        if self._store is not None:
+            self._store.close()
+            self._store = None
+
+    async def __aenter__(self) -> "Revalidator":
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
+
+    async def not_modified(self, url: str) -> bool:
+        """
+        Send a conditional request for a previously crawled URL
+
+        Returns:
+            True if the server answered 304 Not Modified
+        """
+        headers = self._conditional_headers(url)
+        if not headers:
+            return False
+
+        try:
+            async with self._session.get(url, headers=headers, allow_redirects=True) as response:
+                if response.status == 304:
+                    self.unchanged += 1
+                    return True
+        except Exception as e:
+            logger.debug(f"Conditional request failed for {url}: {e}")
+        return False
+
+    def can_probe(self, url: str) -> bool:
+        """Whether not_modified() would send a request for ``url``"""
+        return bool(self._conditional_headers(url))
+
+    def _conditional_headers(self, url: str) -> Optional[Dict[str, str]]:
+        validators = self._store.get(url)
+        if not validators:
+            return None
+
+        etag, last_modified, _ = validators
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    async def filter_not_modified(self, urls: Iterable[str]) -> Tuple[List[str], List[str]]:
+        """
+        Probe many URLs concurrently, ``delay`` seconds apart per host
+
+        Only URLs with stored validators are requested.
+
+        Returns:
+            Tuple of (URLs to render, URLs the server reported as not modified)
+        """
+        urls = list(urls)
+        flags = [False] * len(urls)
+        scheduler = HostScheduler(self.delay)
+        for index, url in enumerate(urls):
+            if self._conditional_headers(url):
+                scheduler.put_nowait(index, url)
+
+        async def worker() -> None:
+            while True:
+                index = await scheduler.get()
+                try:
+                    flags[index] = await self.not_modified(urls[index])
+                finally:
+                    scheduler.task_done()
+
+        workers = [asyncio.create_task(worker()) for _ in range(min(self.concurrency, scheduler.qsize()))]
+        try:
+            await scheduler.join()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        to_render = [url for url, unchanged in zip(urls, flags) if not unchanged]
+        not_modified = [url for url, unchanged in zip(urls, flags) if unchanged]
+        return to_render, not_modified
+
+    def is_unchanged(self, url: str, markdown: str) -> bool:
+        """
+        Compare a freshly rendered page with the recorded one
+
+        Args:
+            url: Page URL
+            markdown: Rendered markdown
+
+        Returns:
+            True if the content hash matches the previous crawl
+        """
+        previous = self._store.get(url)
+        unchanged = previous is not None and previous[2] == content_hash(markdown)
+        if unchanged:
+            self.unchanged += 1
+        else:
+            self.updated += 1
+        return unchanged
+
+    def record(self, url: str, markdown: str, headers: Optional[Dict[str, str]] = None) -> None:
+        """
+        Store validators for a page whose file now holds ``markdown``
+
+        Args:
+            url: Page URL
+            markdown: Rendered markdown
+            headers: Response headers of the render, for ETag / Last-Modified
+        """
+        self._store.put(url, _header(headers, "ETag"), _header(headers, "Last-Modified"), content_hash(markdown))
+
+    def forget(self, url: str) -> None:
+        """Drop the validators of a page whose file could not be written"""
+        self._store.delete(url)
+
+
+@asynccontextmanager
+async def open_revalidator(config: CrawlConfig, output_dir: str) -> AsyncIterator[Optional[Revalidator]]:
+    """
+    Yield a started Revalidator for ``output_dir`` if config.revalidate is set,
+    otherwise None
+    """
+    if not config.revalidate:
+        yield None
+        return
+
+    async with Revalidator(
+        output_dir,
+        user_agent=config.user_agent,
+        timeout=config.timeout,
+        concurrency=config.max_concurrent_requests,
+        delay=config.delay
+    ) as revalidator:
+        yield revalidator
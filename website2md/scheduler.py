@@ -0,0 +1,250 @@
+"""
+Per-host politeness scheduling for concurrent crawl workers
+"""
+
+import asyncio
+import logging
+from collections import deque
+from typing import Any, AsyncIterable, AsyncIterator, Deque, Dict, Iterable, Optional, Union
+from urllib.parse import urlparse
+
+try:
+    from crawl4ai import AsyncWebCrawler
+    from crawl4ai.async_configs import CrawlerRunConfig
+    from crawl4ai.models import CrawlResult
+except ImportError:
+    print("crawl4ai not installed. Please install it with: pip install crawl4ai")
+    raise
+
+logger = logging.getLogger(__name__)
+
+
+def _host_key(url: str) -> str:
+    try:
+        return urlparse(url).netloc.lower()
+    except Exception:
+        return ""
+
+
+class HostScheduler:
+    """
+    Work queue that spaces out requests to the same host
+
+    Items are kept in one FIFO per host and handed out round-robin across
+    hosts. A host becomes eligible again ``delay`` seconds after its last item
+    was handed out, so a worker only takes an item once its host may be hit,
+    and a slow or heavily throttled host never blocks the others.
+
+    The interface mirrors asyncio.Queue: put_nowait/get/task_done/join.
+    """
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = max(0.0, delay)
+        self._pending: Dict[str, Deque[Any]] = {}
+        self._hosts: Deque[str] = deque()  # Round-robin order of hosts with pending items
+        self._next_allowed: Dict[str, float] = {}
+        self._size = 0
+        self._unfinished = 0
+        self._changed = asyncio.Event()
+        self._finished = asyncio.Event()
+        self._finished.set()
+
+    def qsize(self) -> int:
+        """Number of items waiting to be handed out"""
+        return self._size
+
+    def empty(self) -> bool:
+        return self._size == 0
+
+    def put_nowait(self, item: Any, url: str) -> None:
+        """
+        Queue an item under the host of ``url``
+
+        Args:
+            item: Item to hand out to a worker
+            url: URL whose host the item is scheduled against
+        """
+        host = _host_key(url)
+        queue = self._pending.get(host)
+        if queue is None:
+            queue = self._pending[host] = deque()
+            self._hosts.append(host)
+
+        queue.append(item)
+        self._size += 1
+        self._unfinished += 1
+        self._finished.clear()
+        self._changed.set()
+
+    async def get(self) -> Any:
+        """Wait until some host with pending items is eligible and take one"""
+        loop = asyncio.get_running_loop()
+
+        while True:
+            now = loop.time()
+            wait = None
+
+            for _ in range(len(self._hosts)):
+                host = self._hosts[0]
+                self._hosts.rotate(-1)
+                ready_at = self._next_allowed.get(host, 0.0)
+                if ready_at <= now:
+                    return self._take(host, now)
+                wait = ready_at - now if wait is None else min(wait, ready_at - now)
+
+            # Nothing eligible: sleep until the earliest host frees up or new work arrives
+            self._changed.clear()
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+
+    async def wait_for_host(self, url: str) -> None:
+        """
+        Wait until the host of ``url`` may be hit again and claim that slot
+
+        For a further request made while handling an item, e.g. the render
+        that follows a conditional probe, so it is spaced like any other.
+        """
+        host = _host_key(url)
+        loop = asyncio.get_running_loop()
+        while True:
+            now = loop.time()
+            ready_at = self._next_allowed.get(host, 0.0)
+            if ready_at <= now:
+                self._next_allowed[host] = now + self.delay
+                return
+            await asyncio.sleep(ready_at - now)
+
+    def _take(self, host: str, now: float) -> Any:
+        queue = self._pending[host]
+        item = queue.popleft()
+        if not queue:
+            del self._pending[host]
+            self._hosts.remove(host)
+
+        self._next_allowed[host] = now + self.delay
+        self._size -= 1
+        return item
+
+    def task_done(self) -> None:
+        """Mark an item returned by get() as fully processed"""
+        if self._unfinished <= 0:
+            raise ValueError("task_done() called too many times")
+        self._unfinished -= 1
+        if self._unfinished == 0:
+            self._finished.set()
+
+    async def join(self) -> None:
+        """Wait until every queued item has been processed"""
+        await self._finished.wait()
+
+    def clear(self) -> int:
+        """
+        Drop every item that has not been handed out yet
+
+        Returns:
+            Number of dropped items
+        """
+        dropped = self._size
+        self._pending.clear()
+        self._hosts.clear()
+        self._size = 0
+        for _ in range(dropped):
+            self.task_done()
+        return dropped
+
+
+async def arun_many_politely(
+    crawler: AsyncWebCrawler,
+    urls: Union[Iterable[str], AsyncIterable[str]],
+    config: CrawlerRunConfig,
+    max_concurrent: int,
+    delay: float,
+    max_queued: Optional[int] = None
+) -> AsyncIterator[CrawlResult]:
+    """
+    Crawl URLs with a fixed worker pool and per-host politeness
+
+    Drop-in replacement for ``crawler.arun_many(..., stream=True)`` that yields
+    results as they complete. Failed fetches are yielded as unsuccessful
+    results rather than raised.
+
+    ``urls`` may be an async iterable, e.g. URLs still being read from a
+    file: it is consumed while the crawl runs, and at most ``max_queued``
+    URLs are read ahead of the workers.
+
+    Args:
+        crawler: Started AsyncWebCrawler instance
+        urls: URLs to crawl
+        config: Run configuration used for every URL
+        max_concurrent: Number of concurrent workers
+        delay: Minimum seconds between requests to the same host
+        max_queued: URLs of an async ``urls`` queued ahead of the workers
+            (None for no limit)
+
+    Yields:
+        crawl4ai CrawlResult per URL
+    """
+    scheduler = HostScheduler(delay)
+    space = asyncio.Event()
+    feeder = None
+
+    async def feed() -> None:
+        async for url in urls:
+            while max_queued is not None and scheduler.qsize() >= max_queued:
+                space.clear()
+                await space.wait()
+            scheduler.put_nowait(url, url)
+
+    if hasattr(urls, "__aiter__"):
+        feeder = asyncio.create_task(feed())
+    else:
+        for url in urls:
+            scheduler.put_nowait(url, url)
+
+    # Bounded so workers stop fetching while the consumer is busy (e.g. waiting
+    # on the file writer) instead of piling up finished pages in memory
+    workers = max(1, max_concurrent)
+    results: asyncio.Queue = asyncio.Queue(maxsize=workers)
+    done = object()
+
+    async def worker() -> None:
+        while True:
+            url = await scheduler.get()
+            space.set()
+            try:
+                result = await crawler.arun(url=url, config=config)
+            except Exception as e:
+                logger.error(f"Error crawling {url}: {str(e)}")
+                result = CrawlResult(url=url, html="", success=False, error_message=str(e))
+            # Publish before task_done so the completion marker is always last
+            await results.put(result)
+            scheduler.task_done()
+
+    async def mark_done() -> None:
+        try:
+            if feeder is not None:
+                # A failed read stops the crawl; it is raised to the caller below
+                await feeder
+            await scheduler.join()
+        finally:
+            await results.put(done)
+
+    tasks = [asyncio.create_task(worker()) for _ in range(workers)]
+    tasks.append(asyncio.create_task(mark_done()))
+    if feeder is not None:
+        tasks.append(feeder)
+
+    try:
+        while True:
+            result = await results.get()
+            if result is done:
+                break
+            yield result
+        if feeder is not None and not feeder.cancelled() and feeder.exception() is not None:
+            raise feeder.exception()
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,278 @@
+"""
+Seen-URL sets for large crawls: exact strings, 64-bit hashes or a Bloom filter
+"""
+
+import hashlib
+import logging
+import math
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import weakref
+from array import array
+from bisect import bisect_left
+from typing import Iterable, List, Optional, Union
+
+from .config import CrawlConfig
+
+logger = logging.getLogger(__name__)
+
+SEEN_SET_BACKENDS = ("memory", "hashed", "bloom")
+
+
+def _hash64(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+class MemorySeenSet(set):
+    """Python set of the full URL strings: exact, iterable, ~150 bytes per URL"""
+
+    backend = "memory"
+
+    def memory_bytes(self) -> int:
+        """Approximate memory held by the set and its strings"""
+        return sys.getsizeof(self) + sum(sys.getsizeof(key) for key in self)
+
+    def close(self) -> None:
+        pass
+
+
+class HashedSeenSet:
+    """
+    Sorted ``array('Q')`` of 64-bit URL hashes plus a buffer of recent inserts
+
+    New hashes go to a small set and are merged into the sorted array once
+    the buffer reaches 1/16 of the array (at least ``buffer_size``), so
+    merges are rare and the array costs 8 bytes per URL. Lookups are a set
+    probe plus a binary search. Two different URLs share a hash with
+    probability ~n²/2⁶⁵ (about 3e-6 at ten million URLs); such a URL would
+    be treated as already seen. Keys cannot be listed back.
+    """
+
+    backend = "hashed"
+
+    def __init__(self, buffer_size: int = 65536):
+        self.buffer_size = buffer_size
+        self._hashes = array('Q')
+        self._recent = set()
+
+    def _contains_hash(self, value: int) -> bool:
+        if value in self._recent:
+            return True
+        hashes = self._hashes
+        index = bisect_left(hashes, value)
+        return index < len(hashes) and hashes[index] == value
+
+    def __contains__(self, key: str) -> bool:
+        return self._contains_hash(_hash64(key))
+
+    def add(self, key: str) -> None:
+        value = _hash64(key)
+        if self._contains_hash(value):
+            return
+        self._recent.add(value)
+        if len(self._recent) >= max(self.buffer_size, len(self._hashes) >> 4):
+            self._merge()
+
+    def update(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            self.add(key)
+
+    def _merge(self) -> None:
+        # Copy runs of the old array between insertion points, so the work
+        # per merge is one C-level pass plus one bisect per buffered hash
+        old = self._hashes
+        merged = array('Q')
+        start = 0
+        for value in sorted(self._recent):
+            index = bisect_left(old, value, start)
+            merged.extend(old[start:index])
+            merged.append(value)
+            start = index
+        merged.extend(old[start:])
+        self._hashes = merged
+        self._recent = set()
+
+    def __len__(self) -> int:
+        return len(self._hashes) + len(self._recent)
+
+    def memory_bytes(self) -> int:
+        recent = sys.getsizeof(self._recent) + 32 * len(self._recent)
+        return sys.getsizeof(self._hashes) + recent
+
+    def close(self) -> None:
+        pass
+
+
+class _BloomFilter:
+    """Fixed-capacity Bloom filter over a bytearray"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self.array = bytearray((self.bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, h1: int, h2: int) -> List[int]:
+        bits = self.bits
+        return [(h1 + i * h2) % bits for i in range(self.hashes)]
+
+    def __contains__(self, hashes) -> bool:
+        data = self.array
+        return all(data[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(*hashes))
+
+    def add(self, hashes) -> None:
+        data = self.array
+        for pos in self._positions(*hashes):
+            data[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+
+class BloomSeenSet:
+    """
+    Scalable Bloom filter in memory, with the exact keys in SQLite on disk
+
+    The filter answers "definitely not seen" for almost every new URL
+    without touching the disk. A positive answer (a real duplicate, or a
+    false positive at ``error_rate``) is confirmed against the on-disk key
+    table, so membership is exact. The filter grows as a series of filters,
+    each ``growth`` times larger with half the error rate of the previous
+    one, so no capacity has to be known up front. Memory is about 1.2 bytes
+    per URL at a 1% error rate, plus SQLite's page cache.
+    """
+
+    backend = "bloom"
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        initial_capacity: int = 1_000_000,
+        error_rate: float = 0.01,
+        growth: int = 2,
+        commit_every: int = 10000
+    ):
+        """
+        Args:
+            path: SQLite file of the exact keys (default: a temporary file
+                removed with the set)
+            initial_capacity: URLs held by the first filter
+            error_rate: False-positive rate of the first filter
+            growth: Capacity factor of each next filter
+            commit_every: Inserts per SQLite transaction
+        """
+        if path is None:
+            directory = tempfile.mkdtemp(prefix="website2md-seen-")
+            self._cleanup = weakref.finalize(self, shutil.rmtree, directory, True)
+            path = os.path.join(directory, "seen.sqlite")
+        else:
+            self._cleanup = None
+        self.path = path
+        self.error_rate = error_rate
+        self.growth = growth
+        self.commit_every = commit_every
+        self.disk_checks = 0
+        self._pending = 0
+        self._filters = [_BloomFilter(initial_capacity, error_rate / 2)]
+
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=OFF")
+        self._conn.execute("PRAGMA synchronous=OFF")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS seen (key TEXT PRIMARY KEY) WITHOUT ROWID")
+        self._count = self._conn.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+        if self._count:
+            # Reopened an existing key table: rebuild the filters from it
+            for (key,) in self._conn.execute("SELECT key FROM seen"):
+                self._add_to_filters(self._hashes(key))
+
+    @staticmethod
+    def _hashes(key: str):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        return int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+
+    def _maybe_contains(self, hashes) -> bool:
+        return any(hashes in bloom for bloom in self._filters)
+
+    def _on_disk(self, key: str) -> bool:
+        self.disk_checks += 1
+        return self._conn.execute("SELECT 1 FROM seen WHERE key = ?", (key,)).fetchone() is not None
+
+    def __contains__(self, key: str) -> bool:
+        return self._maybe_contains(self._hashes(key)) and self._on_disk(key)
+
+    def _add_to_filters(self, hashes) -> None:
+        bloom = self._filters[-1]
+        if bloom.count >= bloom.capacity:
+            next_error = self.error_rate / 2 ** (len(self._filters) + 1)
+            bloom = _BloomFilter(bloom.capacity * self.growth, next_error)
+            self._filters.append(bloom)
+        bloom.add(hashes)
+
+    def add(self, key: str) -> None:
+        hashes = self._hashes(key)
+        if self._maybe_contains(hashes) and self._on_disk(key):
+            return
+        self._conn.execute("INSERT OR IGNORE INTO seen (key) VALUES (?)", (key,))
+        self._add_to_filters(hashes)
+        self._count += 1
+        self._pending += 1
+        if self._pending >= self.commit_every:
+            self._conn.commit()
+            self._pending = 0
+
+    def update(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            self.add(key)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def memory_bytes(self) -> int:
+        """Memory of the filters; SQLite's page cache comes on top (2 MB by default)"""
+        return sum(sys.getsizeof(bloom.array) for bloom in self._filters)
+
+    def disk_bytes(self) -> int:
+        self._conn.commit()
+        return os.path.getsize(self.path)
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.commit()
+            self._conn.close()
+            self._conn = None
+        if self._cleanup is not None:
+            self._cleanup()
+
+
+SeenSet = Union[MemorySeenSet, HashedSeenSet, BloomSeenSet]
+
+
+def open_seen_set(config: Union[CrawlConfig, str], path: Optional[str] = None) -> SeenSet:
+    """
+    Create the seen-URL set selected by config.seen_set
+
+    Args:
+        config: Crawl configuration, or a backend name from SEEN_SET_BACKENDS
+        path: Key table of the bloom backend (default: a temporary file)
+
+    Returns:
+        Empty set with ``in``, ``add``, ``update`` and ``len``
+    """
+    backend = config if isinstance(config, str) else config.seen_set
+    if backend == "memory":
+        return MemorySeenSet()
+    if backend == "hashed":
+        return HashedSeenSet()
+    if backend == "bloom":
+        return BloomSeenSet(path)
+    raise ValueError(f"Unknown seen set backend: {backend} (choose from {', '.join(SEEN_SET_BACKENDS)})")
+
+
+def format_seen_set_memory(seen: SeenSet) -> str:
+    """One-line memory report, e.g. for the end of a crawl"""
+    count = len(seen)
+    size = seen.memory_bytes()
+    per_million = size / count * 1_000_000 / (1024 * 1024) if count else 0.0
+    return f"{getattr(seen, 'backend', 'memory')} seen set: {count} URLs, {size / (1024 * 1024):.1f} MB ({per_million:.1f} MB per million URLs)"
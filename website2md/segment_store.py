@@ -0,0 +1,374 @@
+"""
+Packed segment store: many pages appended to a few large files
+"""
+
+import logging
+import mmap
+import os
+import sqlite3
+import struct
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_DIR_NAME = "_segments"
+DEFAULT_SEGMENT_SIZE = 256 * 1024 * 1024
+
+# Record layout: magic, url length, filename length, body length, then the
+# three UTF-8 strings. The index can be rebuilt from the records alone.
+_RECORD_MAGIC = b"W2S1"
+_RECORD_HEADER = struct.Struct("<4sIII")
+
+
+def _segment_name(number: int) -> str:
+    return f"seg-{number:05d}.dat"
+
+
+class SegmentReader:
+    """
+    Read pages from a segment store through memory-mapped segment files
+
+    Safe to use while a SegmentStore is appending to the same directory.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(
+            f"file:{os.path.join(path, 'index.sqlite')}?mode=ro", uri=True, check_same_thread=False
+        )
+        self._maps: Dict[int, Tuple[object, mmap.mmap]] = {}
+        self._lock = threading.Lock()
+
+    def locate(self, url: str) -> Optional[Tuple[str, int, int, int]]:
+        """
+        Returns:
+            (filename, segment, offset, length) of the page body, or None
+        """
+        return self._conn.execute(
+            "SELECT filename, segment, offset, length FROM pages WHERE url = ?", (url,)
+        ).fetchone()
+
+    def get_bytes(self, url: str) -> Optional[bytes]:
+        location = self.locate(url)
+        if location is None:
+            return None
+        _, segment, offset, length = location
+        return self.read_at(segment, offset, length)
+
+    def get(self, url: str) -> Optional[str]:
+        """Content of the page stored for ``url``, or None"""
+        data = self.get_bytes(url)
+        return data.decode('utf-8') if data is not None else None
+
+    def read_at(self, segment: int, offset: int, length: int) -> bytes:
+        """Read a body by its index location"""
+        with self._lock:
+            view = self._map(segment, offset + length)
+            return view[offset:offset + length]
+
+    def _map(self, segment: int, needed: int) -> mmap.mmap:
+        cached = self._maps.get(segment)
+        if cached is not None and len(cached[1]) >= needed:
+            return cached[1]
+        if cached is not None:
+            # The segment grew since it was mapped
+            cached[1].close()
+            cached[0].close()
+        f = open(os.path.join(self.path, _segment_name(segment)), 'rb')
+        view = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps[segment] = (f, view)
+        return view
+
+    def invalidate(self) -> None:
+        """Drop all mappings, e.g. after compaction replaced the segments"""
+        with self._lock:
+            for f, view in self._maps.values():
+                view.close()
+                f.close()
+            self._maps.clear()
+
+    def close(self) -> None:
+        self.invalidate()
+        self._conn.close()
+
+    def __enter__(self) -> "SegmentReader":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+
+class SegmentStore:
+    """
+    Append-only page store made of large segment files plus a SQLite index
+
+    Pages are appended to the current segment until it reaches
+    ``segment_size`` bytes; the index maps each URL to its output filename
+    and the offset and length of its body. Rewriting a URL appends a new
+    record and leaves the old one as garbage until compact() runs. All
+    methods are thread-safe, so writes can run on AsyncFileWriter threads.
+    """
+
+    def __init__(self, path: str, segment_size: int = DEFAULT_SEGMENT_SIZE, commit_every: int = 100):
+        self.path = path
+        self.segment_size = segment_size
+        self.commit_every = commit_every
+        self._lock = threading.RLock()
+        self._pending = 0
+
+        os.makedirs(path, exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(path, "index.sqlite"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                filename TEXT NOT NULL,
+                segment INTEGER NOT NULL,
+                offset INTEGER NOT NULL,
+                length INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS pages_filename ON pages(filename);
+            """
+        )
+        self._conn.commit()
+
+        segments = self._segment_numbers()
+        self._segment = segments[-1] if segments else 0
+        self._file = open(os.path.join(path, _segment_name(self._segment)), 'ab')
+        self._recover()
+        self._reader: Optional[SegmentReader] = None
+
+    def _segment_numbers(self) -> List[int]:
+        numbers = []
+        for name in os.listdir(self.path):
+            if name.startswith("seg-") and name.endswith(".dat"):
+                numbers.append(int(name[4:-4]))
+        return sorted(numbers)
+
+    def _recover(self) -> None:
+        """
+        Index records that were written but never committed
+
+        The index is committed whenever a segment fills up, so only the
+        segment of the last committed record and the ones after it can hold
+        unindexed records; each is scanned from its last indexed byte on.
+        """
+        row = self._conn.execute(
+            "SELECT segment, MAX(offset + length) FROM pages GROUP BY segment ORDER BY segment DESC LIMIT 1"
+        ).fetchone()
+        first_segment, position = row if row else (None, 0)
+
+        recovered = 0
+        for number in self._segment_numbers():
+            if first_segment is not None and number < first_segment:
+                continue
+            start = position if number == first_segment else 0
+            recovered += self._recover_segment(number, start)
+        self._conn.commit()
+        if recovered:
+            logger.info(f"Recovered {recovered} unindexed pages in {self.path}")
+
+    def _recover_segment(self, number: int, position: int) -> int:
+        path = os.path.join(self.path, _segment_name(number))
+        end = os.path.getsize(path)
+        recovered = 0
+        with open(path, 'rb') as f:
+            f.seek(position)
+            while position + _RECORD_HEADER.size <= end:
+                header = f.read(_RECORD_HEADER.size)
+                magic, url_len, name_len, body_len = _RECORD_HEADER.unpack(header)
+                record_end = position + _RECORD_HEADER.size + url_len + name_len + body_len
+                if magic != _RECORD_MAGIC or record_end > end:
+                    break
+                url = f.read(url_len).decode('utf-8')
+                filename = f.read(name_len).decode('utf-8')
+                body_offset = position + _RECORD_HEADER.size + url_len + name_len
+                f.seek(body_len, os.SEEK_CUR)
+                self._index(url, filename, number, body_offset, body_len)
+                recovered += 1
+                position = record_end
+
+        if position < end:
+            if number == self._segment:
+                # Drop a torn record left by a crash
+                self._file.truncate(position)
+                self._file.seek(position)
+            else:
+                logger.warning(f"Ignoring {end - position} unreadable bytes at the end of {path}")
+        return recovered
+
+    def _index(self, url: str, filename: str, segment: int, offset: int, length: int) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO pages (url, filename, segment, offset, length) VALUES (?, ?, ?, ?, ?)",
+            (url, filename, segment, offset, length)
+        )
+
+    def _append(self, url: str, filename: str, body: bytes) -> None:
+        url_bytes = url.encode('utf-8')
+        name_bytes = filename.encode('utf-8')
+        if self._file.tell() >= self.segment_size:
+            # Commit before rolling over, so recovery only has to look at
+            # the segments from the last committed record on
+            self._file.flush()
+            self._conn.commit()
+            self._pending = 0
+            self._file.close()
+            self._segment += 1
+            self._file = open(os.path.join(self.path, _segment_name(self._segment)), 'ab')
+
+        position = self._file.tell()
+        self._file.write(_RECORD_HEADER.pack(_RECORD_MAGIC, len(url_bytes), len(name_bytes), len(body)))
+        self._file.write(url_bytes)
+        self._file.write(name_bytes)
+        self._file.write(body)
+        body_offset = position + _RECORD_HEADER.size + len(url_bytes) + len(name_bytes)
+        self._index(url, filename, self._segment, body_offset, len(body))
+
+    def put(self, url: str, filename: str, content: str) -> None:
+        """
+        Store a page
+
+        Args:
+            url: Page URL, the lookup key
+            filename: Filename the page gets when exported to a directory
+            content: Page content
+        """
+        with self._lock:
+            self._append(url, filename, content.encode('utf-8'))
+            self._pending += 1
+            if self._pending >= self.commit_every:
+                self.flush()
+
+    def flush(self) -> None:
+        """Make appended pages durable and visible to readers"""
+        with self._lock:
+            self._file.flush()
+            self._conn.commit()
+            self._pending = 0
+
+    def contains(self, url: str) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM pages WHERE url = ?", (url,)).fetchone() is not None
+
+    def has_filename(self, filename: str) -> bool:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM pages WHERE filename = ? LIMIT 1", (filename,)
+            ).fetchone() is not None
+
+    def urls(self) -> Iterator[str]:
+        with self._lock:
+            rows = self._conn.execute("SELECT url FROM pages ORDER BY rowid").fetchall()
+        for (url,) in rows:
+            yield url
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def get(self, url: str) -> Optional[str]:
+        """Content of the page stored for ``url``, or None"""
+        with self._lock:
+            # Located through the writer's connection, which sees uncommitted
+            # pages, so reads never force a commit
+            location = self._conn.execute(
+                "SELECT segment, offset, length FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+            if location is None:
+                return None
+            if location[0] == self._segment:
+                self._file.flush()
+            if self._reader is None:
+                self._reader = SegmentReader(self.path)
+        return self._reader.read_at(*location).decode('utf-8')
+
+    def stats(self) -> Dict[str, int]:
+        """Page count, segment count, and live versus total bytes"""
+        with self._lock:
+            self._file.flush()
+            pages, live = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(length), 0) FROM pages").fetchone()
+            segments = self._segment_numbers()
+            total = sum(os.path.getsize(os.path.join(self.path, _segment_name(n))) for n in segments)
+        return {"pages": pages, "segments": len(segments), "live_bytes": live, "total_bytes": total}
+
+    def compact(self) -> int:
+        """
+        Rewrite the live pages into fresh segments, dropping replaced records
+
+        Returns:
+            Number of bytes reclaimed
+        """
+        with self._lock:
+            self.flush()
+            before = self.stats()["total_bytes"]
+            old_segments = self._segment_numbers()
+            self._file.close()
+            if self._reader is not None:
+                self._reader.invalidate()
+
+            rows = self._conn.execute(
+                "SELECT url, filename, segment, offset, length FROM pages ORDER BY segment, offset"
+            ).fetchall()
+
+            reader = SegmentReader(self.path)
+            self._segment = (old_segments[-1] + 1) if old_segments else 0
+            self._file = open(os.path.join(self.path, _segment_name(self._segment)), 'ab')
+            try:
+                for url, filename, segment, offset, length in rows:
+                    self._append(url, filename, reader.read_at(segment, offset, length))
+                self._file.flush()
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+            finally:
+                reader.close()
+
+            for number in old_segments:
+                os.remove(os.path.join(self.path, _segment_name(number)))
+            self._pending = 0
+
+            reclaimed = before - self.stats()["total_bytes"]
+            logger.info(f"Compacted {self.path}: reclaimed {reclaimed} bytes")
+            return reclaimed
+
+    def export_directory(self, output_dir: str) -> int:
+        """
+        Write every stored page to ``output_dir`` under its filename
+
+        Returns:
+            Number of files written
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        with self._lock:
+            self.flush()
+            rows = self._conn.execute(
+                "SELECT filename, segment, offset, length FROM pages ORDER BY rowid"
+            ).fetchall()
+
+        count = 0
+        with SegmentReader(self.path) as reader:
+            for filename, segment, offset, length in rows:
+                with open(os.path.join(output_dir, filename), 'wb') as f:
+                    f.write(reader.read_at(segment, offset, length))
+                count += 1
+        return count
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file.closed:
+                return
+            self.flush()
+            self._file.close()
+            if self._reader is not None:
+                self._reader.close()
+                self._reader = None
+            self._conn.close()
+
+    def __enter__(self) -> "SegmentStore":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
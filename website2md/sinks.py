@@ -0,0 +1,393 @@
+"""
+Result sinks that write crawled pages to disk as soon as they are processed
+"""
+
+import csv
+import json
+import logging
+import os
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Any, Dict, List, Optional, TextIO
+
+from .output_writer import write_json_file
+from .utils import create_safe_filename
+
+logger = logging.getLogger(__name__)
+
+
+def _open_output(filename: str, append: bool = False, newline: Optional[str] = '\n') -> TextIO:
+    """Open an output file for writing, creating its directory"""
+    directory = os.path.dirname(os.path.abspath(filename))
+    os.makedirs(directory, exist_ok=True)
+    return open(filename, 'a' if append else 'w', encoding='utf-8', newline=newline)
+
+
+def _field_text(value: Any) -> str:
+    """Flatten a page field to text the way the CSV and XML exports do"""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value) if value is not None else ""
+
+
+class ResultSink:
+    """
+    Destination for crawled pages
+
+    WebCrawler.crawl(start_url, sink=...) hands every kept page to
+    ``write`` instead of holding it in memory; ``close`` is called once the
+    crawl is over (or interrupted).
+    """
+
+    pages_received = 0
+
+    def write(self, page_data: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "ResultSink":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+
+class MarkdownDirectorySink(ResultSink):
+    """
+    Write one markdown file per page plus a _crawl_summary.json
+
+    A few scalar fields of each page are appended to _crawl_events.jsonl
+    and only totals are kept for the summary, so memory does not grow with
+    the number of pages. If ``pages`` is given (for
+    example a SegmentPageStore), the markdown goes there instead of to
+    individual files, and the sink closes it.
+    """
+
+    def __init__(self, output_dir: str, pages=None):
+        self.output_path = Path(output_dir)
+        self.output_path.mkdir(parents=True, exist_ok=True)
+        self.pages = pages
+        self.pages_received = 0
+        self.pages_written = 0
+        self.successful_pages = 0
+        self.failed_pages = 0
+        self._closed = False
+
+        from .crawl_summary import CrawlSummary  # imports this module
+        self._crawl_summary = CrawlSummary(output_dir)
+
+    def write(self, page_data: Dict[str, Any]) -> None:
+        """
+        Save a page's markdown file and record it in the summary
+
+        Args:
+            page_data: Page data produced by WebCrawler
+        """
+        self.pages_received += 1
+        success = page_data.get('success', True)
+        self._crawl_summary.record('crawled' if success else 'failed', {
+            'url': page_data.get('url'),
+            'title': page_data.get('title', ''),
+            'status_code': page_data.get('status_code', 200),
+            'content_length': page_data.get('content_length', 0),
+            'success': success
+        })
+        if success:
+            self.successful_pages += 1
+        else:
+            self.failed_pages += 1
+
+        if not page_data.get('content'):
+            return
+
+        url = page_data.get('url', '')
+        title = page_data.get('title', '')
+        content = page_data.get('content', '')
+
+        # Create filename from URL
+        filename = create_safe_filename(url)
+        if not filename.endswith('.md'):
+            filename += '.md'
+
+        # Create markdown content with metadata
+        markdown_content = f"""# {title}
+
+**URL**: {url}
+**Crawled**: {page_data.get('crawl_timestamp', '')}
+
+---
+
+{content}
+"""
+
+        try:
+            if self.pages is not None:
+                self.pages.put(url, filename, markdown_content)
+            else:
+                with open(self.output_path / filename, 'w', encoding='utf-8') as f:
+                    f.write(markdown_content)
+            self.pages_written += 1
+        except Exception as e:
+            logger.warning(f"Failed to save {filename}: {e}")
+
+    def summary(self) -> Dict[str, Any]:
+        """Totals of the pages written so far"""
+        return {
+            'total_pages': self.pages_received,
+            'successful_pages': self.successful_pages,
+            'failed_pages': self.failed_pages,
+            'content_length_total': self._crawl_summary.content_length,
+            'elapsed_seconds': round(self._crawl_summary.elapsed, 2),
+            'events_file': self._crawl_summary.events_path
+        }
+
+    def close(self) -> None:
+        """Write _crawl_summary.json"""
+        if self._closed:
+            return
+        self._closed = True
+
+        if self.pages is not None:
+            self.pages.close()
+        self._crawl_summary.close()
+
+        summary_path = self.output_path / '_crawl_summary.json'
+        try:
+            # Compressed like the pages when the store compresses them
+            write_json_file(str(summary_path), self.summary(), getattr(self.pages, 'compressor', None))
+        except Exception as e:
+            logger.warning(f"Failed to save summary: {e}")
+
+
+class JSONLWriter(ResultSink):
+    """
+    Append one compact JSON record per page to a JSON Lines file
+
+    Records are buffered and written in batches; a batch is also flushed
+    once ``flush_interval`` seconds have passed so the file can be tailed
+    during a slow crawl. Read it back with utils.read_jsonl().
+    """
+
+    def __init__(self, filename: str, batch_size: int = 100, flush_interval: float = 1.0, append: bool = False):
+        self.filename = filename
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.pages_received = 0
+        self.records_written = 0
+        self._buffer: List[str] = []
+        self._last_flush = time.monotonic()
+        self._file = _open_output(filename, append)
+
+    def write(self, page_data: Dict[str, Any]) -> None:
+        """Queue one record, flushing when the batch is full or old enough"""
+        self.pages_received += 1
+        self._buffer.append(json.dumps(page_data, ensure_ascii=False, default=str, separators=(',', ':')))
+        if (len(self._buffer) >= self.batch_size or
+                time.monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
+
+    def flush(self) -> None:
+        """Write buffered records to disk"""
+        if self._buffer:
+            self._file.write('\n'.join(self._buffer) + '\n')
+            self._file.flush()
+            self.records_written += len(self._buffer)
+            self._buffer.clear()
+        self._last_flush = time.monotonic()
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        try:
+            self.flush()
+        finally:
+            self._file.close()
+
+
+class JSONArrayWriter(ResultSink):
+    """
+    Write pages as an indented JSON array, one element at a time
+
+    The output is the same as ``json.dump(pages, indent=2)``.
+    """
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.pages_received = 0
+        self._file = _open_output(filename)
+
+    def write(self, page_data: Dict[str, Any]) -> None:
+        element = json.dumps(page_data, indent=2, ensure_ascii=False, default=str)
+        self._file.write("[\n  " if self.pages_received == 0 else ",\n  ")
+        self._file.write(element.replace("\n", "\n  "))
+        self.pages_received += 1
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        try:
+            self._file.write("\n]" if self.pages_received else "[]")
+        finally:
+            self._file.close()
+
+
+class XMLStreamWriter(ResultSink):
+    """
+    Write pages as <page> elements of a <crawl_results> document
+
+    Each page element is serialized as soon as it arrives, so no tree of
+    the whole crawl is built.
+    """
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.pages_received = 0
+        self._file = _open_output(filename)
+        self._file.write("<?xml version='1.0' encoding='utf-8'?>\n<crawl_results>")
+
+    def write(self, page_data: Dict[str, Any]) -> None:
+        page = ET.Element("page")
+        for key, value in page_data.items():
+            ET.SubElement(page, key).text = _field_text(value)
+        self._file.write(ET.tostring(page, encoding="unicode"))
+        self.pages_received += 1
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        try:
+            self._file.write("</crawl_results>")
+        finally:
+            self._file.close()
+
+
+class CSVStreamWriter(ResultSink):
+    """
+    Write pages as CSV rows with a fixed set of columns
+
+    The columns are either declared up front or taken from the keys of the
+    first ``sample_size`` pages. Keys outside the columns are kept as a JSON
+    object in the ``spill_column``, so later pages never change the header.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        fieldnames: Optional[List[str]] = None,
+        sample_size: int = 100,
+        spill_column: str = "_extra"
+    ):
+        self.filename = filename
+        self.sample_size = max(1, sample_size)
+        self.spill_column = spill_column
+        self.pages_received = 0
+        self._fieldnames: Optional[List[str]] = None
+        self._sample: List[Dict[str, Any]] = []
+        self._file = _open_output(filename, newline='')
+        self._writer: Optional[csv.DictWriter] = None
+
+        if fieldnames is not None:
+            self._start(list(fieldnames))
+
+    def _start(self, fieldnames: List[str]) -> None:
+        self._fieldnames = [name for name in fieldnames if name != self.spill_column]
+        self._writer = csv.DictWriter(self._file, fieldnames=self._fieldnames + [self.spill_column])
+        self._writer.writeheader()
+
+    def _write_row(self, page_data: Dict[str, Any]) -> None:
+        row = {}
+        extra = {}
+        columns = set(self._fieldnames)
+        for key, value in page_data.items():
+            if key in columns:
+                row[key] = _field_text(value)
+            else:
+                extra[key] = value
+        if extra:
+            row[self.spill_column] = json.dumps(extra, ensure_ascii=False, default=str)
+        self._writer.writerow(row)
+
+    def _flush_sample(self) -> None:
+        keys = set()
+        for page_data in self._sample:
+            keys.update(page_data.keys())
+        self._start(sorted(keys))
+        for page_data in self._sample:
+            self._write_row(page_data)
+        self._sample = []
+
+    def write(self, page_data: Dict[str, Any]) -> None:
+        self.pages_received += 1
+        if self._writer is not None:
+            self._write_row(page_data)
+            return
+
+        self._sample.append(page_data)
+        if len(self._sample) >= self.sample_size:
+            self._flush_sample()
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        try:
+            if self._writer is None and self._sample:
+                self._flush_sample()
+        finally:
+            self._file.close()
+
+
+class TextWriter(ResultSink):
+    """Write pages as a plain-text report"""
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.pages_received = 0
+        self._file = _open_output(filename)
+
+    def write(self, page_data: Dict[str, Any]) -> None:
+        self.pages_received += 1
+        f = self._file
+        f.write(f"=== Page {self.pages_received} ===\n")
+        f.write(f"URL: {page_data.get('url', 'N/A')}\n")
+        f.write(f"Title: {page_data.get('title', 'N/A')}\n")
+        f.write(f"Depth: {page_data.get('depth', 'N/A')}\n")
+        f.write(f"Status: {page_data.get('status_code', 'N/A')}\n")
+
+        content = page_data.get('content', '')
+        if content:
+            # Truncate very long content
+            if len(content) > 1000:
+                content = content[:1000] + "... [truncated]"
+            f.write(f"Content:\n{content}\n")
+
+        f.write("\n" + "="*50 + "\n\n")
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def create_writer(filename: str, format: str = "json") -> ResultSink:
+    """
+    Create a streaming writer for one of the save_results formats
+
+    Args:
+        filename: Output filename
+        format: Output format (json, jsonl, csv, xml, txt)
+
+    Returns:
+        Sink that writes each page as it is passed to ``write``
+    """
+    format = format.lower()
+    writers = {
+        "json": JSONArrayWriter,
+        "jsonl": JSONLWriter,
+        "csv": CSVStreamWriter,
+        "xml": XMLStreamWriter,
+        "txt": TextWriter,
+    }
+    if format not in writers:
+        raise ValueError(f"Unsupported format: {format}")
+    return writers[format](filename)
@@ -0,0 +1,188 @@
+"""
+URL discovery from robots.txt and sitemap.xml files
+"""
+
+import asyncio
+import logging
+import xml.etree.ElementTree as ET
+import zlib
+from typing import Dict, List, Optional, Set
+from urllib.parse import urljoin, urlparse
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SITEMAP_PATHS = ["/sitemap.xml", "/sitemap_index.xml"]
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_CHUNK_SIZE = 64 * 1024
+
+
+def _local_name(tag: str) -> str:
+    """Strip the XML namespace from a tag name"""
+    return tag.rsplit('}', 1)[-1]
+
+
+class SitemapDiscovery:
+    """
+    Discover page URLs from a site's sitemaps without a browser
+
+    Sitemaps listed in robots.txt are used, falling back to the conventional
+    /sitemap.xml locations. Sitemap indexes are followed and their child
+    sitemaps (plain or gzipped) are fetched concurrently. Every sitemap is
+    parsed incrementally while it downloads, and each URL's <lastmod> is kept.
+    """
+
+    def __init__(
+        self,
+        user_agent: str = "Mozilla/5.0 (compatible; Crawl4Website/1.0)",
+        timeout: int = 30,
+        concurrency: int = 8,
+        max_sitemaps: int = 1000
+    ):
+        self.user_agent = user_agent
+        self.timeout = timeout
+        self.concurrency = max(1, concurrency)
+        self.max_sitemaps = max_sitemaps
+        self.sitemaps_fetched = 0
+
+    async def discover(self, start_url: str) -> Dict[str, Optional[str]]:
+        """
+        Collect the URLs listed in the site's sitemaps
+
+        Args:
+            start_url: Any URL of the site
+
+        Returns:
+            Dictionary mapping page URL to its <lastmod> value (or None)
+        """
+        parsed = urlparse(start_url)
+        origin = f"{parsed.scheme}://{parsed.netloc}"
+        pages: Dict[str, Optional[str]] = {}
+
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        headers = {"User-Agent": self.user_agent}
+        async with aiohttp.ClientSession(timeout=timeout, headers=headers) as session:
+            sitemaps = await self._sitemaps_from_robots(session, origin)
+            if not sitemaps:
+                sitemaps = [origin + path for path in DEFAULT_SITEMAP_PATHS]
+
+            queue: asyncio.Queue = asyncio.Queue()
+            queued: Set[str] = set()
+
+            def enqueue(sitemap_url: str) -> None:
+                if sitemap_url not in queued and len(queued) < self.max_sitemaps:
+                    queued.add(sitemap_url)
+                    queue.put_nowait(sitemap_url)
+
+            for sitemap_url in sitemaps:
+                enqueue(sitemap_url)
+
+            async def worker() -> None:
+                while True:
+                    sitemap_url = await queue.get()
+                    try:
+                        children = await self._parse_sitemap(session, sitemap_url, pages)
+                        for child in children:
+                            enqueue(urljoin(sitemap_url, child))
+                    except Exception as e:
+                        logger.debug(f"Could not read sitemap {sitemap_url}: {e}")
+                    finally:
+                        queue.task_done()
+
+            workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+            try:
+                await queue.join()
+            finally:
+                for task in workers:
+                    task.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+
+        logger.info(f"Sitemap discovery: {len(pages)} URLs from {self.sitemaps_fetched} sitemap(s)")
+        return pages
+
+    async def _sitemaps_from_robots(self, session: aiohttp.ClientSession, origin: str) -> List[str]:
+        """Read the Sitemap: directives from robots.txt"""
+        try:
+            async with session.get(origin + "/robots.txt") as response:
+                if response.status != 200:
+                    return []
+                text = await response.text(errors="replace")
+        except Exception as e:
+            logger.debug(f"Could not read robots.txt for {origin}: {e}")
+            return []
+
+        sitemaps = []
+        for line in text.splitlines():
+            key, _, value = line.partition(':')
+            if key.strip().lower() == 'sitemap' and value.strip():
+                sitemaps.append(urljoin(origin, value.strip()))
+        return sitemaps
+
+    async def _parse_sitemap(
+        self,
+        session: aiohttp.ClientSession,
+        sitemap_url: str,
+        pages: Dict[str, Optional[str]]
+    ) -> List[str]:
+        """
+        Stream one sitemap, adding its page URLs to ``pages``
+
+        Returns:
+            Child sitemap URLs if the sitemap is an index
+        """
+        children: List[str] = []
+        parser = ET.XMLPullParser(events=("end",))
+        decompressor = None
+        first_chunk = True
+
+        async with session.get(sitemap_url) as response:
+            if response.status != 200:
+                return children
+            self.sitemaps_fetched += 1
+
+            async for chunk in response.content.iter_chunked(_CHUNK_SIZE):
+                if first_chunk:
+                    first_chunk = False
+                    if chunk.startswith(_GZIP_MAGIC):
+                        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                if decompressor is not None:
+                    chunk = decompressor.decompress(chunk)
+
+                parser.feed(chunk)
+                self._collect(parser, pages, children)
+
+        if decompressor is not None:
+            parser.feed(decompressor.flush())
+        parser.close()
+        self._collect(parser, pages, children)
+        return children
+
+    def _collect(
+        self,
+        parser: ET.XMLPullParser,
+        pages: Dict[str, Optional[str]],
+        children: List[str]
+    ) -> None:
+        """Consume parsed <url> and <sitemap> elements, freeing them as we go"""
+        for _, elem in parser.read_events():
+            kind = _local_name(elem.tag)
+            if kind not in ("url", "sitemap"):
+                continue
+
+            loc = None
+            lastmod = None
+            for child in elem:
+                name = _local_name(child.tag)
+                if name == "loc" and child.text:
+                    loc = child.text.strip()
+                elif name == "lastmod" and child.text:
+                    lastmod = child.text.strip()
+
+            if loc:
+                if kind == "sitemap":
+                    children.append(loc)
+                else:
+                    pages[loc] = lastmod
+            elem.clear()
@@ -0,0 +1,207 @@
+"""
+Spill store for large page fields kept out of WebCrawler.results
+"""
+
+import copy
+import hashlib
+import json
+import logging
+import shutil
+import tempfile
+import weakref
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .segment_store import SegmentStore
+
+logger = logging.getLogger(__name__)
+
+# Fields that are spilled once they exceed the spill threshold
+SPILL_FIELDS = (
+    "links", "images", "screenshot", "metadata", "extracted_content",
+    "fit_markdown", "network_traffic", "console_logs",
+)
+
+_REF_KEY = "$spill"
+
+
+def field_size(value: Any) -> int:
+    """Approximate in-memory size of a page field, measured as its encoded length"""
+    if value is None or isinstance(value, (bool, int, float)):
+        return 0
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    return len(json.dumps(value, ensure_ascii=False, default=str))
+
+
+class SpillRef:
+    """Reference to a page field stored in a SpillStore"""
+
+    __slots__ = ("key", "size")
+
+    def __init__(self, key: str, size: int):
+        self.key = key
+        self.size = size
+
+    def __repr__(self) -> str:
+        return f"<SpillRef {self.key} ({self.size} bytes)>"
+
+
+class SpillStore:
+    """
+    Blob store for large page fields, keyed by field and URL hash
+
+    Values are JSON-encoded into a SegmentStore. Without a path, the store
+    lives in a temporary directory that is removed once the store is
+    garbage collected or the interpreter exits.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        if path is None:
+            path = tempfile.mkdtemp(prefix="website2md-spill-")
+            self._cleanup = weakref.finalize(self, shutil.rmtree, path, True)
+        else:
+            self._cleanup = None
+        self.path = path
+        self._store = SegmentStore(path)
+        self.bytes_spilled = 0
+
+    def put(self, url: str, field: str, value: Any) -> SpillRef:
+        """Store one field of a page and return a reference to it"""
+        data = json.dumps(value, ensure_ascii=False, default=str)
+        url_hash = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        key = f"{field}:{url_hash}"
+        self._store.put(key, f"{url_hash}.{field}.json", data)
+        self.bytes_spilled += len(data)
+        return SpillRef(key, len(data))
+
+    def load(self, ref: SpillRef) -> Any:
+        data = self._store.get(ref.key)
+        if data is None:
+            raise KeyError(f"Spilled field {ref.key} is missing from {self.path}")
+        return json.loads(data)
+
+    def flush(self) -> None:
+        """Make spilled fields durable, e.g. for a later resume"""
+        self._store.flush()
+
+    def close(self) -> None:
+        self._store.close()
+        if self._cleanup is not None:
+            self._cleanup()
+
+
+class PageData(dict):
+    """
+    Page dictionary whose spilled fields are loaded when accessed
+
+    Item access, ``get``, ``items`` and ``values`` load spilled fields from
+    the store on every call without caching them, so the dictionary itself
+    stays small. ``json.dumps`` goes through ``items`` and therefore writes
+    the full values. Overriding ``__iter__`` and ``keys`` also sends
+    ``dict(page)`` and ``{**page}`` through item access, so they return
+    plain dictionaries with the full values; copies and pickles do too.
+    """
+
+    def __init__(self, data: Dict[str, Any], store: SpillStore):
+        super().__init__(data)
+        self.store = store
+
+    def _resolve(self, value: Any) -> Any:
+        return self.store.load(value) if isinstance(value, SpillRef) else value
+
+    def __getitem__(self, key: str) -> Any:
+        return self._resolve(super().__getitem__(key))
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self:
+            return self[key]
+        return default
+
+    def __iter__(self) -> Iterator[str]:
+        # Not dict's own iterator, so dict() and ** unpacking use keys() and
+        # __getitem__ instead of copying the stored references
+        return dict.__iter__(self)
+
+    def keys(self) -> List[str]:
+        return list(dict.keys(self))
+
+    def items(self) -> List[Tuple[str, Any]]:
+        return [(key, self[key]) for key in self]
+
+    def values(self) -> List[Any]:
+        return [self[key] for key in self]
+
+    def copy(self) -> Dict[str, Any]:
+        return dict(self)
+
+    def __copy__(self) -> Dict[str, Any]:
+        return dict(self)
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> Dict[str, Any]:
+        return copy.deepcopy(dict(self), memo)
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return dict, (dict(self),)
+
+    def is_spilled(self, key: str) -> bool:
+        return isinstance(super().get(key), SpillRef)
+
+    def to_storable(self) -> Dict[str, Any]:
+        """Plain dictionary with spilled fields replaced by reference markers, for checkpoints"""
+        return {
+            key: {_REF_KEY: value.key, "size": value.size} if isinstance(value, SpillRef) else value
+            for key, value in dict.items(self)
+        }
+
+    @classmethod
+    def from_storable(cls, data: Dict[str, Any], store: SpillStore) -> "PageData":
+        """Inverse of to_storable()"""
+        page = {}
+        for key, value in data.items():
+            if isinstance(value, dict) and _REF_KEY in value:
+                value = SpillRef(value[_REF_KEY], value.get("size", 0))
+            page[key] = value
+        return cls(page, store)
+
+
+def spill_page(
+    page_data: Dict[str, Any],
+    store: SpillStore,
+    threshold: int,
+    max_page_bytes: int
+) -> Tuple[PageData, int, int]:
+    """
+    Move the large fields of a page into the spill store
+
+    Fields in SPILL_FIELDS larger than ``threshold`` bytes are always
+    spilled; then, while the page is still larger than ``max_page_bytes``,
+    its largest remaining field (page content included) is spilled too.
+
+    Returns:
+        (page with references, bytes kept in memory, bytes spilled)
+    """
+    url = page_data.get("url", "")
+    sizes = {key: field_size(value) for key, value in page_data.items()}
+    page = dict(page_data)
+    spilled = 0
+
+    for key in SPILL_FIELDS:
+        if sizes.get(key, 0) > threshold:
+            page[key] = store.put(url, key, page[key])
+            spilled += sizes.pop(key)
+
+    inline = sum(sizes.values())
+    for key, size in sorted(sizes.items(), key=lambda item: item[1], reverse=True):
+        if inline <= max_page_bytes or size <= threshold:
+            break
+        page[key] = store.put(url, key, page[key])
+        spilled += size
+        inline -= size
+
+    return PageData(page, store), inline, spilled
+
+
+def load_pages(pages: Iterator[Dict[str, Any]], store: SpillStore) -> Iterator[PageData]:
+    """Wrap checkpointed pages so their spilled fields load from ``store``"""
+    for page in pages:
+        yield PageData.from_storable(page, store)
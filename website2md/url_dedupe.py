@@ -0,0 +1,186 @@
+"""
+Order-preserving URL deduplication with an on-disk mode for huge inputs
+"""
+
+import heapq
+import json
+import logging
+import os
+import shutil
+import tempfile
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from .seen_set import SeenSet
+
+logger = logging.getLogger(__name__)
+
+# Index recorded for keys that were already emitted before the spill
+_EMITTED = -1
+
+
+class URLDeduplicator:
+    """
+    Single-pass dedupe that keeps the first occurrence of every key, in input order
+
+    URLs are keyed by ``key`` (identity by default, e.g. for URLs that are
+    already canonical) and streamed out as soon as their key is first seen.
+    Up to ``max_in_memory`` distinct keys are held in a set. Past that, the
+    set is written to ``partitions`` hash-partitioned files together with the
+    rest of the input (tagged with its position), each partition is deduped
+    on its own, and the survivors are merged back in input order. Memory then
+    stays around ``max_in_memory / partitions`` keys plus one line per
+    partition, whatever the input size.
+
+    A seen_set backend can be passed as ``seen`` instead (e.g. a
+    HashedSeenSet at 8 bytes per key); it is used as is and never spills.
+    """
+
+    def __init__(
+        self,
+        key: Optional[Callable[[str], str]] = None,
+        max_in_memory: Optional[int] = 1_000_000,
+        partitions: int = 64,
+        tmp_dir: Optional[str] = None,
+        seen: Optional[SeenSet] = None
+    ):
+        """
+        Args:
+            key: Function mapping a URL to its dedupe key (default: the URL itself)
+            max_in_memory: Distinct keys kept in memory before spilling to disk
+                (None never spills)
+            partitions: Number of partition files used once spilled
+            tmp_dir: Parent directory of the partition files (default: system temp)
+            seen: Seen-key set to use instead of an in-memory set
+        """
+        self.key = key
+        self.max_in_memory = max_in_memory
+        self.partitions = max(1, partitions)
+        self.tmp_dir = tmp_dir
+        self._seen = seen
+        self.seen = 0
+        self.unique = 0
+        self.spilled = False
+
+    def dedupe(self, urls: Iterable[str]) -> Iterator[str]:
+        """
+        Yield each URL whose key has not been seen before
+
+        Args:
+            urls: URLs in input order; consumed once
+
+        Yields:
+            First URL of every key, in input order
+        """
+        key = self.key
+        return self.dedupe_keyed((url, key(url) if key else url) for url in urls)
+
+    def dedupe_keyed(self, keyed_urls: Iterable[Tuple[str, str]]) -> Iterator[str]:
+        """
+        Like dedupe(), for URLs whose key was computed beforehand
+
+        Args:
+            keyed_urls: (URL, key) pairs in input order; consumed once
+
+        Yields:
+            First URL of every key, in input order
+        """
+        seen = self._seen if self._seen is not None else set()
+        max_in_memory = self.max_in_memory if self._seen is None else None
+        iterator = iter(keyed_urls)
+        for url, url_key in iterator:
+            self.seen += 1
+            if url_key in seen:
+                continue
+            if max_in_memory is not None and len(seen) >= max_in_memory:
+                yield from self._dedupe_on_disk(seen, url, url_key, iterator)
+                return
+            seen.add(url_key)
+            self.unique += 1
+            yield url
+
+    def _dedupe_on_disk(self, emitted: set, url: str, url_key: str,
+                        rest: Iterator[Tuple[str, str]]) -> Iterator[str]:
+        self.spilled = True
+        logger.info(f"URL dedupe passed {self.max_in_memory} distinct URLs, continuing on disk")
+        work_dir = tempfile.mkdtemp(prefix="website2md-dedupe-", dir=self.tmp_dir)
+        try:
+            paths = [os.path.join(work_dir, f"part-{i}.jsonl") for i in range(self.partitions)]
+            files = [open(path, 'w', encoding='utf-8') for path in paths]
+            try:
+                for emitted_key in emitted:
+                    self._write(files, _EMITTED, emitted_key, None)
+                emitted.clear()
+
+                index = 0
+                self._write(files, index, url_key, url)
+                for url, url_key in rest:
+                    self.seen += 1
+                    index += 1
+                    self._write(files, index, url_key, url)
+            finally:
+                for f in files:
+                    f.close()
+
+            survivor_paths = [self._dedupe_partition(path) for path in paths]
+            yield from self._merge(survivor_paths)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def _write(self, files, index: int, url_key: str, url: Optional[str]) -> None:
+        # json keeps the line format safe for URLs with tabs or newlines
+        record = [index, url_key] if url is None or url == url_key else [index, url_key, url]
+        files[hash(url_key) % self.partitions].write(json.dumps(record) + '\n')
+
+    def _dedupe_partition(self, path: str) -> str:
+        """Keep the first record of each key; records stay in input order"""
+        seen = set()
+        survivors = path + ".out"
+        with open(path, 'r', encoding='utf-8') as src, open(survivors, 'w', encoding='utf-8') as dst:
+            for line in src:
+                record = json.loads(line)
+                url_key = record[1]
+                if url_key in seen:
+                    continue
+                seen.add(url_key)
+                if record[0] != _EMITTED:
+                    dst.write(line)
+        os.remove(path)
+        return survivors
+
+    def _merge(self, paths: List[str]) -> Iterator[str]:
+        files = [open(path, 'r', encoding='utf-8') for path in paths]
+        try:
+            streams = [self._records(f) for f in files]
+            for _, url in heapq.merge(*streams):
+                self.unique += 1
+                yield url
+        finally:
+            for f in files:
+                f.close()
+
+    @staticmethod
+    def _records(lines: Iterable[str]) -> Iterator[Tuple[int, str]]:
+        for line in lines:
+            record = json.loads(line)
+            yield record[0], record[-1]
+
+
+def dedupe_urls(
+    urls: Iterable[str],
+    key: Optional[Callable[[str], str]] = None,
+    max_in_memory: Optional[int] = 1_000_000,
+    seen: Optional[SeenSet] = None
+) -> List[str]:
+    """
+    First URL of every key, in input order
+
+    Args:
+        urls: URLs to deduplicate
+        key: Function mapping a URL to its dedupe key (default: the URL itself)
+        max_in_memory: Distinct keys kept in memory before spilling to disk
+        seen: Seen-key set to use instead of an in-memory set
+
+    Returns:
+        List of unique URLs
+    """
+    return list(URLDeduplicator(key, max_in_memory, seen=seen).dedupe(urls))
@@ -0,0 +1,213 @@
+"""
+URL extraction from free-text lines, with a process pool for huge files
+"""
+
+import mmap
+import multiprocessing
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Deque, Iterator, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlparse
+
+from .url_normalizer import CanonicalRules, URLNormalizer
+
+URL_PATTERN = re.compile(r'https?://[^\s<>"]+[^\s<>"\.]')
+
+_SKIPPED_SCHEMES = ('mailto:', 'tel:', 'ftp:', 'file:')
+_NETLOC = re.compile(r'[^/?#]*')
+# Netlocs urlparse may rewrite or reject; these take the slow path
+_SPECIAL_NETLOC = re.compile(r'[\[\]\t\r\n]|[^\x00-\x7f]')
+
+# Invalid lines returned per chunk for the caller's warnings
+MAX_INVALID_SAMPLES = 20
+
+# Universal newlines, as the streaming reader's TextIOWrapper splits lines
+_LINE_BREAK = re.compile(r'\r\n|\r|\n')
+_LINE_BREAK_BYTES = re.compile(rb'\r\n?|\n')
+
+
+def _has_host(url: str) -> bool:
+    """Same answer as urlparse for an http(s):// URL, without parsing it in the common case"""
+    netloc = _NETLOC.match(url, url.index('://') + 3).group()
+    if not netloc:
+        return False
+    if _SPECIAL_NETLOC.search(netloc) is None:
+        return True
+    try:
+        result = urlparse(url)
+        return bool(result.netloc) and result.scheme in ('http', 'https')
+    except Exception:
+        return False
+
+
+def extract_url(line: str) -> Optional[str]:
+    """
+    Extract an HTTP/HTTPS URL from a stripped line of text
+
+    A line that is itself a URL is kept whole; otherwise the first URL in
+    the line is used. mailto:, tel:, ftp: and file: lines have none.
+
+    Args:
+        line: Stripped line of text that may contain a URL
+
+    Returns:
+        URL as written, or None
+    """
+    if line.startswith(_SKIPPED_SCHEMES):
+        return None
+
+    if line.startswith(('http://', 'https://')) and _has_host(line):
+        return line
+
+    match = URL_PATTERN.search(line)
+    if match:
+        url = match.group()
+        if _has_host(url):
+            return url
+
+    return None
+
+
+class ExtractedChunk(NamedTuple):
+    """URLs of one newline-aligned byte range of a file"""
+    urls: List[str]  # URLs as written, in line order
+    keys: List[str]  # Canonical form of each URL, the dedupe key
+    line_count: int
+    invalid: int  # Non-comment lines without a URL
+    invalid_lines: List[Tuple[int, str]]  # First MAX_INVALID_SAMPLES (line number in chunk, line)
+
+
+_worker_normalizer: Optional[URLNormalizer] = None
+
+
+def _init_worker(rules: CanonicalRules) -> None:
+    global _worker_normalizer
+    _worker_normalizer = URLNormalizer(rules)
+
+
+def _extract_range(path: str, start: int, end: int) -> ExtractedChunk:
+    """Extract the URLs of bytes [start, end) of a file; runs in a pool worker"""
+    canonicalize = _worker_normalizer.canonicalize
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        # Decoded straight from the mapping, without copying the range to bytes first
+        with memoryview(mm)[start:end] as view:
+            text = str(view, 'utf-8', 'replace')
+
+    lines = _LINE_BREAK.split(text)
+    if lines and not lines[-1]:
+        lines.pop()
+
+    urls = []
+    keys = []
+    invalid = 0
+    invalid_lines = []
+    for line_num, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        url = extract_url(line)
+        if url:
+            urls.append(url)
+            keys.append(canonicalize(url))
+            continue
+        invalid += 1
+        if invalid <= MAX_INVALID_SAMPLES:
+            invalid_lines.append((line_num, line[:200]))
+
+    return ExtractedChunk(urls, keys, len(lines), invalid, invalid_lines)
+
+
+def _default_workers() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+class ParallelURLExtractor:
+    """
+    Extract URLs from a large text file on every core
+
+    The file is memory-mapped and cut into byte ranges of about
+    ``chunk_bytes`` that end on a line break. Each range is decoded, split
+    into lines, matched with extract_url and canonicalized (for dedupe keys)
+    by a pool process that maps the file itself, so only chunk boundaries
+    and results cross process boundaries. Chunks are handed back in file order, with at most
+    two per worker in flight, so the caller can stream the results.
+
+    Workers are started with the ``spawn`` method, so a script driving the
+    extractor needs the usual ``if __name__ == "__main__":`` guard.
+    """
+
+    def __init__(
+        self,
+        rules: Optional[CanonicalRules] = None,
+        workers: Optional[int] = None,
+        chunk_bytes: int = 4 * 1024 * 1024
+    ):
+        """
+        Args:
+            rules: Canonicalization rules (see url_normalizer.CanonicalRules)
+            workers: Pool processes (default: one per available CPU); with one
+                worker the file is processed in this process
+            chunk_bytes: Approximate size of each byte range
+        """
+        self.rules = rules or CanonicalRules()
+        self.workers = max(1, workers or _default_workers())
+        self.chunk_bytes = max(1, chunk_bytes)
+
+    def chunk_ranges(self, path: str) -> Iterator[Tuple[int, int]]:
+        """
+        Split a file into byte ranges that end just after a line break
+
+        A ``\r\n`` pair is never split across two ranges.
+
+        Yields:
+            (start, end) offsets covering the whole file
+        """
+        size = os.path.getsize(path)
+        if size == 0:
+            return
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            start = 0
+            while start < size:
+                end = min(start + self.chunk_bytes, size)
+                if end < size:
+                    newline = _LINE_BREAK_BYTES.search(mm, end - 1)
+                    end = size if newline is None else newline.end()
+                yield start, end
+                start = end
+
+    def extract_chunks(self, path: str) -> Iterator[ExtractedChunk]:
+        """
+        Extract the URLs of every chunk of a file, in file order
+
+        Args:
+            path: Uncompressed text file
+
+        Yields:
+            ExtractedChunk per byte range
+        """
+        if self.workers == 1:
+            _init_worker(self.rules)
+            for start, end in self.chunk_ranges(path):
+                yield _extract_range(path, start, end)
+            return
+
+        # spawn: the caller may be a threaded asyncio process, which fork does not copy safely
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(self.workers, mp_context=context,
+                                 initializer=_init_worker, initargs=(self.rules,)) as pool:
+            pending: Deque = deque()
+            try:
+                for start, end in self.chunk_ranges(path):
+                    if len(pending) >= 2 * self.workers:
+                        yield pending.popleft().result()
+                    pending.append(pool.submit(_extract_range, path, start, end))
+                while pending:
+                    yield pending.popleft().result()
+            finally:
+                for future in pending:
+                    future.cancel()
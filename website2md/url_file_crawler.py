@@ -6,11 +6,25 @@ Reads URLs from a text file, deduplicates them, and crawls using crawl4ai
 
 import os
 import re
-from typing import Set, List, Dict, Optional
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 from urllib.parse import urlparse
 from crawl4ai import AsyncWebCrawler, CrawlerRunConfig, CacheMode
 from crawl4ai.async_configs import BrowserConfig
 from .config import CrawlConfig
+from .domain_filter import DomainFilter
+from .fetcher import open_fetcher
+from .output_writer import AsyncFileWriter, PageSaver
+from .page_store import DirectoryPageStore, open_page_store_async
+from .revalidation import open_revalidator
+from .scheduler import arun_many_politely
+from .seen_set import SeenSet, open_seen_set
+from .url_dedupe import URLDeduplicator
+from .url_extract import ParallelURLExtractor, extract_url
+from .url_normalizer import URLNormalizer
+from .url_source import is_plain_text_file, iter_chunks, iter_url_entries, iterate_in_thread
+
+# Invalid lines reported one by one before the rest are only counted
+MAX_INVALID_WARNINGS = 20
 
 class URLFileCrawler:
     """
@@ -19,159 +33,147 @@ class URLFileCrawler:
     
     def __init__(self, config: CrawlConfig):
         self.config = config
+        self.normalizer = URLNormalizer.for_config(config)
         
-    def read_urls_from_file(self, file_path: str) -> Set[str]:
+    def read_urls_from_file(self, file_path: str) -> List[str]:
         """
-        Read URLs from text file and return deduplicated set
+        Read URLs from text file and return them deduplicated, in file order
+        
+        URLs are compared by canonical form but returned as written, since
+        that is what gets fetched. The file is streamed line by line, so
+        only the unique URLs (up to
+        config.dedupe_memory_urls of them, see url_dedupe.URLDeduplicator)
+        are held in memory. gzip and zstd files and sitemap XML are read
+        too (see url_source.iter_url_entries).
         
         Args:
             file_path: Path to text file containing URLs
             
         Returns:
-            Set of unique, valid URLs
+            List of unique, valid URLs
         """
-        urls = set()
-        
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"URL file not found: {file_path}")
             
-        with open(file_path, 'r', encoding='utf-8') as file:
-            for line_num, line in enumerate(file, 1):
-                line = line.strip()
-                
-                # Skip empty lines and comments
-                if not line or line.startswith('#'):
-                    continue
-                    
-                # Extract URL from line (handle cases like "mailto:", "https://...")
-                url = self._extract_url_from_line(line)
-                if url:
-                    urls.add(url)
-                else:
-                    print(f"Warning: Invalid URL on line {line_num}: {line}")
-                    
-        return urls
+        return self._dedupe(self._iter_urls_from_file(file_path))
     
-    def _extract_url_from_line(self, line: str) -> Optional[str]:
-        """
-        Extract valid HTTP/HTTPS URL from a line of text
+    def _iter_urls_from_file(self, file_path: str) -> Iterator[Tuple[str, str]]:
+        """Yield (URL as written, canonical form) for every valid line of a URL file"""
+        if (os.path.getsize(file_path) >= self.config.url_extract_min_bytes
+                and is_plain_text_file(file_path)):
+            yield from self._extract_urls_in_parallel(file_path)
+            return
         
-        Args:
-            line: Line of text that may contain a URL
+        invalid = 0
+        for line_num, line in iter_url_entries(file_path):
+            # Extract URL from line (handle cases like "mailto:", "https://...")
+            url = self._extract_url_from_line(line)
+            if url:
+                yield url, self.normalizer.canonicalize(url)
+                continue
             
-        Returns:
-            Valid URL or None
-        """
-        line = line.strip()
+            invalid += 1
+            if invalid <= MAX_INVALID_WARNINGS:
+                print(f"Warning: Invalid URL on line {line_num}: {line[:200]}")
         
-        # Skip mailto and other non-http protocols
-        if line.startswith(('mailto:', 'tel:', 'ftp:', 'file:')):
-            return None
-            
-        # If line starts with http/https, validate it
-        if line.startswith(('http://', 'https://')):
-            if self._is_valid_url(line):
-                return line
-        
-        # Try to find URL in the line using regex
-        url_pattern = r'https?://[^\s<>"]+[^\s<>"\.]'
-        match = re.search(url_pattern, line)
-        if match:
-            url = match.group()
-            if self._is_valid_url(url):
-                return url
-                
-        return None
+        if invalid > MAX_INVALID_WARNINGS:
+            print(f"Warning: {invalid - MAX_INVALID_WARNINGS} more invalid lines not shown")
+    
+    def _extract_urls_in_parallel(self, file_path: str) -> Iterator[Tuple[str, str]]:
+        """Yield (URL, canonical form) pairs of a large plain-text file, extracted by a process pool"""
+        extractor = ParallelURLExtractor(self.normalizer.rules, self.config.url_extract_workers)
+        print(f"Extracting URLs with {extractor.workers} worker(s)")
+        
+        invalid = 0
+        first_line = 0
+        for chunk in extractor.extract_chunks(file_path):
+            for line_num, line in chunk.invalid_lines[:max(0, MAX_INVALID_WARNINGS - invalid)]:
+                print(f"Warning: Invalid URL on line {first_line + line_num}: {line}")
+            invalid += chunk.invalid
+            first_line += chunk.line_count
+            yield from zip(chunk.urls, chunk.keys)
+        
+        if invalid > MAX_INVALID_WARNINGS:
+            print(f"Warning: {invalid - MAX_INVALID_WARNINGS} more invalid lines not shown")
     
-    def _is_valid_url(self, url: str) -> bool:
+    def _extract_url_from_line(self, line: str) -> Optional[str]:
         """
-        Validate if string is a proper URL
+        Extract valid HTTP/HTTPS URL from a line of text
         
         Args:
-            url: URL string to validate
+            line: Line of text that may contain a URL
             
         Returns:
-            True if valid URL
+            URL as written, or None
         """
-        try:
-            result = urlparse(url)
-            return all([result.scheme, result.netloc]) and result.scheme in ['http', 'https']
-        except Exception:
-            return False
+        return extract_url(line.strip())
     
-    def filter_urls_by_domain(self, urls: Set[str], allowed_domains: Optional[List[str]] = None) -> Set[str]:
+    def filter_urls_by_domain(self, urls: Iterable[str], allowed_domains: Optional[List[str]] = None) -> List[str]:
         """
-        Filter URLs by allowed domains
+        Filter URLs by allowed domains, keeping their order
+        
+        Each allowed domain also admits its subdomains, and a leading
+        ``www.`` is ignored on both sides.
         
         Args:
-            urls: Set of URLs to filter
+            urls: URLs to filter
             allowed_domains: List of allowed domains (e.g., ['docs.cursor.com'])
             
         Returns:
-            Filtered set of URLs
+            Filtered list of URLs
         """
         if not allowed_domains:
-            return urls
+            return list(urls)
             
-        filtered_urls = set()
-        for url in urls:
-            try:
-                domain = urlparse(url).netloc.lower()
-                # Remove www. prefix for comparison
-                domain = domain.replace('www.', '')
-                
-                for allowed_domain in allowed_domains:
-                    allowed_domain = allowed_domain.lower().replace('www.', '')
-                    if domain == allowed_domain or domain.endswith('.' + allowed_domain):
-                        filtered_urls.add(url)
-                        break
-            except Exception:
-                continue
-                
-        return filtered_urls
+        domain_filter = DomainFilter(allowed_domains=allowed_domains, include_subdomains=True, ignore_www=True)
+        return domain_filter.filter(urls)
     
-    def deduplicate_urls(self, urls: Set[str]) -> Set[str]:
+    def deduplicate_urls(self, urls: Iterable[str]) -> List[str]:
         """
-        Advanced URL deduplication handling fragments and query parameters
+        Deduplicate URLs by their canonical form, keeping the first occurrence
+        
+        Spellings that differ only in fragment, host case, default port,
+        trailing slash, index page, query order or tracking parameters
+        collapse into one URL (see url_normalizer.CanonicalRules). Runs in a
+        single pass and continues on disk past config.dedupe_memory_urls
+        distinct URLs.
         
         Args:
-            urls: Set of URLs to deduplicate
+            urls: URLs to deduplicate
             
         Returns:
-            Deduplicated set of URLs
+            First spelling of every canonical URL, in input order
+        """
+        canonicalize = self.normalizer.canonicalize
+        return self._dedupe((url, canonicalize(url)) for url in urls)
+    
+    def _dedupe(self, keyed_urls: Iterable[Tuple[str, str]]) -> List[str]:
         """
-        seen_normalized = set()
-        deduplicated = set()
+        Order-preserving dedupe of (URL, canonical form) pairs using the config.seen_set backend
         
-        for url in urls:
-            try:
-                parsed = urlparse(url)
-                
-                # Create normalized version without fragment
-                normalized = f"{parsed.scheme}://{parsed.netloc}{parsed.path}"
-                if parsed.query:
-                    normalized += f"?{parsed.query}"
-                    
-                # For fragment-only differences, prefer the one without fragment
-                if normalized not in seen_normalized:
-                    seen_normalized.add(normalized)
-                    deduplicated.add(url)
-                elif not parsed.fragment:
-                    # Replace with non-fragment version
-                    deduplicated = {u for u in deduplicated if not u.startswith(normalized)}
-                    deduplicated.add(url)
-                    
-            except Exception:
-                # Keep original URL if parsing fails
-                deduplicated.add(url)
-                
-        return deduplicated
+        The memory backend continues on disk past config.dedupe_memory_urls
+        distinct URLs; the hashed and bloom backends are compact enough to
+        hold every key.
+        """
+        seen = None if self.config.seen_set == "memory" else open_seen_set(self.config)
+        try:
+            deduplicator = URLDeduplicator(max_in_memory=self.config.dedupe_memory_urls, seen=seen)
+            return list(deduplicator.dedupe_keyed(keyed_urls))
+        finally:
+            if seen is not None:
+                seen.close()
     
     async def crawl_urls_from_file(self, file_path: str, output_dir: str, 
                                  allowed_domains: Optional[List[str]] = None) -> Dict:
         """
         Main method to crawl URLs from file
         
+        The file is read while it is crawled: URLs are validated, filtered,
+        deduplicated and checked against existing output config.url_chunk_size
+        at a time on a worker thread, and at most config.url_queue_size of
+        them wait for the browser. The first pages are fetched as soon as the
+        first chunk is read, and memory stays flat whatever the file size.
+        
         Args:
             file_path: Path to text file containing URLs
             output_dir: Directory to save crawled content
@@ -181,37 +183,27 @@ class URLFileCrawler:
             Dictionary with crawl summary
         """
         print(f"Reading URLs from file: {file_path}")
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"URL file not found: {file_path}")
         
-        # Step 1: Read URLs from file
-        raw_urls = self.read_urls_from_file(file_path)
-        print(f"Found {len(raw_urls)} raw URLs")
+        summary = {
+            'urls_found': 0,
+            'urls_filtered': 0,
+            'urls_unique': 0,
+            'pages_crawled': 0,
+            'files_saved': 0,
+            'files_skipped': 0,
+            'files_unchanged': 0,
+            'files_updated': 0,
+            'errors': 0,
+            'error_details': []
+        }
         
-        # Step 2: Filter by domains if specified
-        if allowed_domains:
-            filtered_urls = self.filter_urls_by_domain(raw_urls, allowed_domains)
-            print(f"After domain filtering: {len(filtered_urls)} URLs")
-        else:
-            filtered_urls = raw_urls
-            
-        # Step 3: Deduplicate URLs
-        unique_urls = self.deduplicate_urls(filtered_urls)
-        print(f"After deduplication: {len(unique_urls)} unique URLs")
-        
-        if not unique_urls:
-            return {
-                'urls_found': len(raw_urls),
-                'urls_filtered': len(filtered_urls),
-                'urls_unique': 0,
-                'pages_crawled': 0,
-                'files_saved': 0,
-                'errors': 0,
-                'error_details': ['No valid URLs to crawl']
-            }
-        
-        # Step 4: Create output directory
+        # Create output directory
         os.makedirs(output_dir, exist_ok=True)
+        pages = await open_page_store_async(self.config, output_dir)
         
-        # Step 5: Setup crawl4ai configuration
+        # Setup crawl4ai configuration
         browser_config = BrowserConfig(
             headless=True,
             verbose=False
@@ -219,70 +211,168 @@ class URLFileCrawler:
         
         crawler_config = CrawlerRunConfig(
             cache_mode=CacheMode.BYPASS if self.config.bypass_cache else CacheMode.ENABLED,
-            semaphore_count=self.config.max_concurrent_requests,
-            mean_delay=self.config.delay,
             css_selector=self.config.content_selector,
-            excluded_tags=self.config.exclude_selectors,
-            stream=True  # Process results as they come
+            excluded_tags=self.config.exclude_selectors
         )
         
-        # Step 6: Crawl URLs using arun_many
-        urls_list = list(unique_urls)
-        if self.config.max_pages and len(urls_list) > self.config.max_pages:
-            urls_list = urls_list[:self.config.max_pages]
-            print(f"Limited to first {self.config.max_pages} URLs")
+        seen = None
+        revalidating = set()
         
-        summary = {
-            'urls_found': len(raw_urls),
-            'urls_filtered': len(filtered_urls),
-            'urls_unique': len(unique_urls),
-            'pages_crawled': 0,
-            'files_saved': 0,
-            'files_skipped': 0,
-            'errors': 0,
-            'error_details': []
-        }
+        # The store and seen set are closed on every way out, including a
+        # URL file that turns out to be empty or unreadable
+        try:
+            seen = None if self.config.seen_set == "memory" else open_seen_set(self.config)
+            chunks = self._iter_crawl_chunks(file_path, output_dir, allowed_domains, pages, summary, seen)
+            
+            # Existing files are re-checked with conditional requests instead of skipped
+            async with open_revalidator(self.config, output_dir) as revalidator:
+                urls = self._stream_urls(chunks, revalidator, summary, revalidating)
+                
+                # Read up to the first URL to crawl before starting the browser
+                first_url = await anext(urls, None)
+                if first_url is None:
+                    if not summary['urls_unique']:
+                        summary['error_details'].append('No valid URLs to crawl')
+                    else:
+                        print("All URLs already have output files, nothing to crawl")
+                    return summary
+                
+                await self._crawl_stream(
+                    self._prepend(first_url, urls), output_dir, pages, browser_config,
+                    crawler_config, revalidator, revalidating, summary
+                )
+        finally:
+            pages.close()
+            if seen is not None:
+                seen.close()
+        
+        return summary
+    
+    def _iter_crawl_chunks(self, file_path: str, output_dir: str, allowed_domains: Optional[List[str]],
+                           pages, summary: Dict, seen: Optional[SeenSet]) -> Iterator[Tuple[List[str], List[str]]]:
+        """
+        Read a URL file through validation, domain filter, dedupe and existing-file check
+        
+        Blocking; run on a worker thread with url_source.iterate_in_thread.
+        The urls_found, urls_filtered and urls_unique counts of ``summary``
+        grow as the file is read.
+        
+        Yields:
+            Tuple of (URLs to crawl, URLs whose output file already exists) per chunk
+        """
+        keyed_urls = self._count(self._iter_urls_from_file(file_path), summary, 'urls_found')
+        if allowed_domains:
+            domain_filter = DomainFilter(allowed_domains=allowed_domains, include_subdomains=True, ignore_www=True)
+            keyed_urls = (keyed for keyed in keyed_urls if domain_filter.matches(keyed[0]))
+        keyed_urls = self._count(keyed_urls, summary, 'urls_filtered')
+        
+        # Deduplicated by canonical form; the URLs are crawled as written
+        deduplicator = URLDeduplicator(max_in_memory=self.config.dedupe_memory_urls, seen=seen)
+        for chunk in iter_chunks(deduplicator.dedupe_keyed(keyed_urls), self.config.url_chunk_size):
+            summary['urls_unique'] += len(chunk)
+            if self.config.overwrite_existing:
+                yield chunk, []
+            else:
+                yield self.skip_existing_urls(chunk, output_dir, pages)
+    
+    @staticmethod
+    def _count(keyed_urls: Iterable[Tuple[str, str]], summary: Dict, key: str) -> Iterator[Tuple[str, str]]:
+        for keyed in keyed_urls:
+            summary[key] += 1
+            yield keyed
+    
+    async def _stream_urls(self, chunks: Iterator[Tuple[List[str], List[str]]], revalidator,
+                           summary: Dict, revalidating: Set[str]) -> AsyncIterator[str]:
+        """Yield the URLs to crawl as the file is read, up to config.max_pages"""
+        remaining = self.config.max_pages or None
+        async for to_crawl, skipped in iterate_in_thread(chunks):
+            if skipped and revalidator is not None:
+                recheck_urls, unchanged_urls = await revalidator.filter_not_modified(skipped)
+                revalidating.update(recheck_urls)
+                summary['files_skipped'] += len(unchanged_urls)
+                summary['files_unchanged'] += len(unchanged_urls)
+                to_crawl = recheck_urls + to_crawl
+            else:
+                summary['files_skipped'] += len(skipped)
+            
+            for url in to_crawl:
+                if remaining is not None:
+                    if remaining == 0:
+                        print(f"Limited to first {self.config.max_pages} URLs")
+                        return
+                    remaining -= 1
+                yield url
+        
+        print(f"Read {summary['urls_found']} URLs: {summary['urls_filtered']} after domain filtering, "
+              f"{summary['urls_unique']} unique")
+    
+    @staticmethod
+    async def _prepend(first: str, rest: AsyncIterator[str]) -> AsyncIterator[str]:
+        yield first
+        async for url in rest:
+            yield url
+    
+    async def _crawl_stream(self, urls: AsyncIterator[str], output_dir: str, pages, browser_config,
+                            crawler_config, revalidator, revalidating: Set[str], summary: Dict) -> None:
+        """Crawl URLs as they are read and save their pages, updating summary"""
+        # Files are written by a thread pool so slow disks don't stall the browser
+        writer = AsyncFileWriter(self.config.writer_threads, self.config.max_pending_writes)
         
-        async with AsyncWebCrawler(config=browser_config) as crawler:
-            print(f"\nStarting crawl of {len(urls_list)} URLs...")
+        async with writer, \
+                AsyncWebCrawler(config=browser_config) as browser, \
+                open_fetcher(self.config, browser) as crawler:
+            print("\nStarting crawl, reading URLs as it runs...")
             print("-" * 60)
             
+            saver = PageSaver(
+                writer, pages, output_dir, summary, revalidator, revalidating,
+                overwrite_existing=self.config.overwrite_existing
+            )
             try:
-                async for result in await crawler.arun_many(urls_list, config=crawler_config):
-                    summary['pages_crawled'] += 1
-                    
-                    if result.success:
-                        # Save content to file
-                        filename = self._url_to_filename(result.url)
-                        file_path = os.path.join(output_dir, filename)
-                        
-                        # Check if file exists (skip existing files feature)
-                        if os.path.exists(file_path):
-                            summary['files_skipped'] += 1
-                            print(f"[SKIP] {result.url} -> {filename} (exists)")
-                            continue
-                        
-                        # Save markdown content
-                        content = f"---\nurl: {result.url}\ncrawled_at: {self._get_timestamp()}\n---\n{result.markdown}"
-                        
-                        with open(file_path, 'w', encoding='utf-8') as f:
-                            f.write(content)
-                            
-                        summary['files_saved'] += 1
-                        print(f"[SAVE] {result.url} -> {filename}")
-                        
-                    else:
-                        summary['errors'] += 1
-                        error_msg = f"{result.url}: {result.error_message}"
-                        summary['error_details'].append(error_msg)
-                        print(f"[ERROR] {error_msg}")
-                        
+                async for result in arun_many_politely(
+                    crawler, urls, crawler_config,
+                    max_concurrent=self.config.max_concurrent_requests,
+                    delay=self.config.delay,
+                    max_queued=self.config.url_queue_size
+                ):
+                    await saver.save(result, self._url_to_filename(result.url), self._get_timestamp())
+            
             except Exception as e:
                 summary['errors'] += 1
                 summary['error_details'].append(f"Crawl failed: {str(e)}")
                 print(f"[FATAL] Crawl failed: {e}")
         
-        return summary
+        saver.count_write_errors()
+        
+        if summary['files_skipped']:
+            print(f"Skipped {summary['files_skipped']} URLs with existing files (use --force to re-crawl)")
+    
+    def skip_existing_urls(self, urls: List[str], output_dir: str, pages=None) -> Tuple[List[str], List[str]]:
+        """
+        Split URLs into those still to crawl and those already saved
+        
+        Args:
+            urls: URLs to check
+            output_dir: Directory the crawled files are saved to
+            pages: Output backend to check; defaults to the files in output_dir
+            
+        Returns:
+            Tuple of (URLs to crawl, URLs whose output file already exists)
+        """
+        if pages is None:
+            # Answered from the output manifest, without touching the files
+            with DirectoryPageStore(output_dir) as pages:
+                return self.skip_existing_urls(urls, output_dir, pages)
+        
+        to_crawl = []
+        skipped = []
+        for url in urls:
+            if pages.exists(url, self._url_to_filename(url)):
+                skipped.append(url)
+            else:
+                to_crawl.append(url)
+                
+        return to_crawl, skipped
     
     def _url_to_filename(self, url: str) -> str:
         """
@@ -6,11 +6,20 @@ Accepts URL lists directly from user input and crawls them using crawl4ai
 
 import os
 import re
-from typing import List, Set, Dict, Optional, Union
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 from urllib.parse import urlparse
 from crawl4ai import AsyncWebCrawler, CrawlerRunConfig, CacheMode
 from crawl4ai.async_configs import BrowserConfig
 from .config import CrawlConfig
+from .domain_filter import DomainFilter
+from .fetcher import open_fetcher
+from .output_writer import AsyncFileWriter, PageSaver
+from .page_store import DirectoryPageStore, open_page_store_async
+from .revalidation import open_revalidator
+from .scheduler import arun_many_politely
+from .seen_set import open_seen_set
+from .url_dedupe import dedupe_urls
+from .url_normalizer import URLNormalizer
 
 class URLListCrawler:
     """
@@ -19,10 +28,11 @@ class URLListCrawler:
     
     def __init__(self, config: CrawlConfig):
         self.config = config
+        self.normalizer = URLNormalizer.for_config(config)
         
-    def parse_url_input(self, url_input: Union[str, List[str]]) -> Set[str]:
+    def parse_url_input(self, url_input: Union[str, List[str]]) -> List[str]:
         """
-        Parse various URL input formats and return a set of valid URLs
+        Parse various URL input formats and return the valid URLs, deduplicated
         
         Args:
             url_input: URLs in various formats:
@@ -32,39 +42,28 @@ class URLListCrawler:
                      - Single URL string: "https://example.com"
                      
         Returns:
-            Set of unique, valid URLs
+            List of unique, valid URLs in input order, compared by canonical
+            form but kept as written
         """
-        urls = set()
-        
         if isinstance(url_input, list):
             # Handle list input
-            for url in url_input:
-                if isinstance(url, str):
-                    parsed_url = self._validate_and_clean_url(url.strip())
-                    if parsed_url:
-                        urls.add(parsed_url)
-        
+            candidates = [url for url in url_input if isinstance(url, str)]
         elif isinstance(url_input, str):
             # Handle string input - try different separators
             if '\n' in url_input:
                 # Line-separated
-                for line in url_input.split('\n'):
-                    parsed_url = self._validate_and_clean_url(line.strip())
-                    if parsed_url:
-                        urls.add(parsed_url)
+                candidates = url_input.split('\n')
             elif ',' in url_input:
                 # Comma-separated
-                for url in url_input.split(','):
-                    parsed_url = self._validate_and_clean_url(url.strip())
-                    if parsed_url:
-                        urls.add(parsed_url)
+                candidates = url_input.split(',')
             else:
                 # Single URL
-                parsed_url = self._validate_and_clean_url(url_input.strip())
-                if parsed_url:
-                    urls.add(parsed_url)
+                candidates = [url_input]
+        else:
+            candidates = []
         
-        return urls
+        urls = (self._validate_and_clean_url(url.strip()) for url in candidates)
+        return self._dedupe(url for url in urls if url)
     
     def _validate_and_clean_url(self, url: str) -> Optional[str]:
         """
@@ -74,7 +73,7 @@ class URLListCrawler:
             url: URL string to validate
             
         Returns:
-            Cleaned valid URL or None
+            URL (with https:// added if it had no scheme), or None
         """
         if not url:
             return None
@@ -98,73 +97,61 @@ class URLListCrawler:
         except Exception:
             return None
     
-    def filter_urls_by_domain(self, urls: Set[str], allowed_domains: Optional[List[str]] = None) -> Set[str]:
+    def filter_urls_by_domain(self, urls: Iterable[str], allowed_domains: Optional[List[str]] = None) -> List[str]:
         """
-        Filter URLs by allowed domains
+        Filter URLs by allowed domains, keeping their order
+        
+        Each allowed domain also admits its subdomains, and a leading
+        ``www.`` is ignored on both sides.
         
         Args:
-            urls: Set of URLs to filter
+            urls: URLs to filter
             allowed_domains: List of allowed domains (e.g., ['docs.cursor.com'])
             
         Returns:
-            Filtered set of URLs
+            Filtered list of URLs
         """
         if not allowed_domains:
-            return urls
+            return list(urls)
             
-        filtered_urls = set()
-        for url in urls:
-            try:
-                domain = urlparse(url).netloc.lower()
-                # Remove www. prefix for comparison
-                domain = domain.replace('www.', '')
-                
-                for allowed_domain in allowed_domains:
-                    allowed_domain = allowed_domain.lower().replace('www.', '')
-                    if domain == allowed_domain or domain.endswith('.' + allowed_domain):
-                        filtered_urls.add(url)
-                        break
-            except Exception:
-                continue
-                
-        return filtered_urls
+        domain_filter = DomainFilter(allowed_domains=allowed_domains, include_subdomains=True, ignore_www=True)
+        return domain_filter.filter(urls)
     
-    def deduplicate_urls(self, urls: Set[str]) -> Set[str]:
+    def deduplicate_urls(self, urls: Iterable[str]) -> List[str]:
         """
-        Advanced URL deduplication handling fragments and query parameters
+        Deduplicate URLs by their canonical form, keeping the first occurrence
+        
+        Spellings that differ only in fragment, host case, default port,
+        trailing slash, index page, query order or tracking parameters
+        collapse into one URL (see url_normalizer.CanonicalRules). Runs in a
+        single pass and continues on disk past config.dedupe_memory_urls
+        distinct URLs.
         
         Args:
-            urls: Set of URLs to deduplicate
+            urls: URLs to deduplicate
             
         Returns:
-            Deduplicated set of URLs
+            First spelling of every canonical URL, in input order
         """
-        seen_normalized = set()
-        deduplicated = set()
+        return self._dedupe(urls)
+    
+    def _dedupe(self, urls: Iterable[str]) -> List[str]:
+        """
+        Order-preserving dedupe by canonical form using the config.seen_set backend
         
-        for url in urls:
-            try:
-                parsed = urlparse(url)
-                
-                # Create normalized version without fragment
-                normalized = f"{parsed.scheme}://{parsed.netloc}{parsed.path}"
-                if parsed.query:
-                    normalized += f"?{parsed.query}"
-                    
-                # For fragment-only differences, prefer the one without fragment
-                if normalized not in seen_normalized:
-                    seen_normalized.add(normalized)
-                    deduplicated.add(url)
-                elif not parsed.fragment:
-                    # Replace with non-fragment version
-                    deduplicated = {u for u in deduplicated if not u.startswith(normalized)}
-                    deduplicated.add(url)
-                    
-            except Exception:
-                # Keep original URL if parsing fails
-                deduplicated.add(url)
-                
-        return deduplicated
+        The memory backend continues on disk past config.dedupe_memory_urls
+        distinct URLs; the hashed and bloom backends are compact enough to
+        hold every key.
+        """
+        seen = None if self.config.seen_set == "memory" else open_seen_set(self.config)
+        try:
+            return dedupe_urls(
+                urls, key=self.normalizer.canonicalize,
+                max_in_memory=self.config.dedupe_memory_urls, seen=seen
+            )
+        finally:
+            if seen is not None:
+                seen.close()
     
     async def crawl_url_list(self, url_input: Union[str, List[str]], output_dir: str, 
                            allowed_domains: Optional[List[str]] = None) -> Dict:
@@ -209,8 +196,8 @@ class URLListCrawler:
         else:
             filtered_urls = raw_urls
             
-        # Step 3: Deduplicate URLs
-        unique_urls = self.deduplicate_urls(filtered_urls)
+        # Step 3: URLs were deduplicated by canonical form while parsing
+        unique_urls = filtered_urls
         print(f"After deduplication: {len(unique_urls)} unique URLs")
         
         if not unique_urls:
@@ -227,6 +214,7 @@ class URLListCrawler:
         
         # Step 4: Create output directory
         os.makedirs(output_dir, exist_ok=True)
+        pages = await open_page_store_async(self.config, output_dir)
         
         # Step 5: Setup crawl4ai configuration
         browser_config = BrowserConfig(
@@ -236,15 +224,35 @@ class URLListCrawler:
         
         crawler_config = CrawlerRunConfig(
             cache_mode=CacheMode.BYPASS if self.config.bypass_cache else CacheMode.ENABLED,
-            semaphore_count=self.config.max_concurrent_requests,
-            mean_delay=self.config.delay,
             css_selector=self.config.content_selector,
-            excluded_tags=self.config.exclude_selectors,
-            stream=True  # Process results as they come
+            excluded_tags=self.config.exclude_selectors
         )
         
-        # Step 6: Crawl URLs using arun_many
+        # Step 6: Crawl URLs with per-host politeness, processing results as they come
         urls_list = list(unique_urls)
+        
+        # Drop URLs whose output file already exists before anything reaches the browser
+        skipped_urls = []
+        unchanged_urls = []
+        revalidating = set()
+        if not self.config.overwrite_existing:
+            try:
+                urls_list, skipped_urls = self.skip_existing_urls(urls_list, output_dir, pages)
+                if skipped_urls and self.config.revalidate:
+                    # Existing files are re-checked with conditional requests instead of skipped
+                    async with open_revalidator(self.config, output_dir) as revalidator:
+                        recheck_urls, unchanged_urls = await revalidator.filter_not_modified(skipped_urls)
+                    print(f"Revalidating {len(skipped_urls)} existing files: {len(unchanged_urls)} not modified")
+                    revalidating = set(recheck_urls)
+                    urls_list = recheck_urls + urls_list
+                    skipped_urls = unchanged_urls
+                elif skipped_urls:
+                    print(f"Skipping {len(skipped_urls)} URLs with existing files (use --force to re-crawl)")
+            except BaseException:
+                # The crawl below never starts, so nothing else closes the store
+                pages.close()
+                raise
+        
         if self.config.max_pages and len(urls_list) > self.config.max_pages:
             urls_list = urls_list[:self.config.max_pages]
             print(f"Limited to first {self.config.max_pages} URLs")
@@ -256,52 +264,76 @@ class URLListCrawler:
             'urls_unique': len(unique_urls),
             'pages_crawled': 0,
             'files_saved': 0,
-            'files_skipped': 0,
+            'files_skipped': len(skipped_urls),
+            'files_unchanged': len(unchanged_urls),
+            'files_updated': 0,
             'errors': 0,
             'error_details': []
         }
         
-        async with AsyncWebCrawler(config=browser_config) as crawler:
+        if not urls_list:
+            print("All URLs already have output files, nothing to crawl")
+            pages.close()
+            return summary
+        
+        # Files are written by a thread pool so slow disks don't stall the browser
+        writer = AsyncFileWriter(self.config.writer_threads, self.config.max_pending_writes)
+        
+        async with pages, writer, \
+                AsyncWebCrawler(config=browser_config) as browser, \
+                open_fetcher(self.config, browser) as crawler, \
+                open_revalidator(self.config, output_dir) as revalidator:
             print(f"\nStarting crawl of {len(urls_list)} URLs...")
             print("-" * 60)
             
+            saver = PageSaver(
+                writer, pages, output_dir, summary, revalidator, revalidating,
+                overwrite_existing=self.config.overwrite_existing
+            )
             try:
-                async for result in await crawler.arun_many(urls_list, config=crawler_config):
-                    summary['pages_crawled'] += 1
-                    
-                    if result.success:
-                        # Save content to file
-                        filename = self._url_to_filename(result.url)
-                        file_path = os.path.join(output_dir, filename)
-                        
-                        # Check if file exists (skip existing files feature)
-                        if os.path.exists(file_path):
-                            summary['files_skipped'] += 1
-                            print(f"[SKIP] {result.url} -> {filename} (exists)")
-                            continue
-                        
-                        # Save markdown content
-                        content = f"---\nurl: {result.url}\ncrawled_at: {self._get_timestamp()}\n---\n{result.markdown}"
-                        
-                        with open(file_path, 'w', encoding='utf-8') as f:
-                            f.write(content)
-                            
-                        summary['files_saved'] += 1
-                        print(f"[SAVE] {result.url} -> {filename}")
-                        
-                    else:
-                        summary['errors'] += 1
-                        error_msg = f"{result.url}: {result.error_message}"
-                        summary['error_details'].append(error_msg)
-                        print(f"[ERROR] {error_msg}")
-                        
+                async for result in arun_many_politely(
+                    crawler, urls_list, crawler_config,
+                    max_concurrent=self.config.max_concurrent_requests,
+                    delay=self.config.delay
+                ):
+                    await saver.save(result, self._url_to_filename(result.url), self._get_timestamp())
+            
             except Exception as e:
                 summary['errors'] += 1
                 summary['error_details'].append(f"Crawl failed: {str(e)}")
                 print(f"[FATAL] Crawl failed: {e}")
         
+        saver.count_write_errors()
+        
         return summary
     
+    def skip_existing_urls(self, urls: List[str], output_dir: str, pages=None) -> Tuple[List[str], List[str]]:
+        """
+        Split URLs into those still to crawl and those already saved
+        
+        Args:
+            urls: URLs to check
+            output_dir: Directory the crawled files are saved to
+            pages: Output backend to check; defaults to the files in output_dir
+            
+        Returns:
+            Tuple of (URLs to crawl, URLs whose output file already exists)
+        """
+        if pages is None:
+            # Answered from the output manifest, without touching the files
+            with DirectoryPageStore(output_dir) as pages:
+                return self.skip_existing_urls(urls, output_dir, pages)
+        
+        to_crawl = []
+        skipped = []
+        for url in urls:
+            if pages.exists(url, self._url_to_filename(url)):
+                skipped.append(url)
+            else:
+                to_crawl.append(url)
+                
+        return to_crawl, skipped
+    
     def _url_to_filename(self, url: str) -> str:
         """
         Convert URL to safe filename
@@ -0,0 +1,229 @@
+"""
+Canonical URL forms used to decide whether two URLs are the same page
+"""
+
+import re
+from collections.abc import MutableSet
+from dataclasses import dataclass, fields, replace
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, Optional
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+INDEX_PAGES = frozenset({"index.html", "index.htm", "index.php", "default.aspx", "default.htm"})
+TRACKING_PARAMS = frozenset({
+    "gclid", "dclid", "gbraid", "wbraid", "fbclid", "msclkid", "yclid", "igshid",
+    "mc_cid", "mc_eid", "_ga", "_gl", "_hsenc", "_hsmi", "mkt_tok", "ref_src",
+})
+TRACKING_PREFIXES = ("utm_",)
+
+_PERCENT = re.compile(r"%[0-9A-Fa-f]{2}")
+_UNRESERVED = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-._~")
+
+
+@dataclass(frozen=True)
+class CanonicalRules:
+    """Which rewrites URLNormalizer applies; every rule is on by default"""
+    remove_fragment: bool = True  # Drop #section
+    remove_default_port: bool = True  # http://host:80/ -> http://host/
+    normalize_percent_encoding: bool = True  # %7e -> ~, %2f -> %2F
+    remove_dot_segments: bool = True  # /a/./b/../c -> /a/c
+    remove_index_page: bool = True  # /docs/index.html -> /docs/
+    strip_trailing_slash: bool = True  # /docs/ -> /docs (the root path keeps its slash)
+    sort_query: bool = True  # ?b=2&a=1 -> ?a=1&b=2
+    remove_tracking_params: bool = True  # Drop utm_*, gclid, fbclid, ...
+
+    @classmethod
+    def from_dict(cls, overrides: Optional[Dict[str, Any]]) -> "CanonicalRules":
+        """Default rules with the given fields overridden; unknown names raise ValueError"""
+        if not overrides:
+            return cls()
+        known = {field.name for field in fields(cls)}
+        unknown = set(overrides) - known
+        if unknown:
+            raise ValueError(f"Unknown URL normalization rules: {', '.join(sorted(unknown))}")
+        return replace(cls(), **overrides)
+
+
+def _normalize_escape(match: "re.Match") -> str:
+    char = chr(int(match.group(0)[1:], 16))
+    if char in _UNRESERVED:
+        return char
+    return match.group(0).upper()
+
+
+def _normalize_percent(text: str) -> str:
+    if '%' not in text:
+        return text
+    return _PERCENT.sub(_normalize_escape, text)
+
+
+def _remove_dot_segments(path: str) -> str:
+    """RFC 3986 section 5.2.4"""
+    if '.' not in path:
+        return path
+    segments = path.split('/')
+    output = []
+    for segment in segments[1:] if path.startswith('/') else segments:
+        if segment == '.':
+            continue
+        if segment == '..':
+            if output:
+                output.pop()
+            continue
+        output.append(segment)
+    if segments[-1] in ('.', '..'):
+        output.append('')
+    result = '/'.join(output)
+    return '/' + result if path.startswith('/') else result
+
+
+def _is_tracking_param(name: str) -> bool:
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+class URLNormalizer:
+    """
+    Rewrite http(s) URLs to one canonical spelling
+
+    Scheme and host are lowercased and the other rewrites are chosen by
+    CanonicalRules. Results are memoized in an LRU cache of ``cache_size``
+    URLs, so the navigation links repeated on every page of a site are only
+    parsed once. Non-http(s) and unparsable URLs are returned unchanged.
+
+    Canonical forms are keys for deciding whether two URLs are the same
+    page; some rules (index page, trailing slash, query order) can name a
+    different resource on some servers, so crawlers fetch the URL as it was
+    written and only compare canonical forms.
+    """
+
+    def __init__(self, rules: Optional[CanonicalRules] = None, cache_size: int = 65536):
+        self.rules = rules or CanonicalRules()
+        self.canonicalize = lru_cache(maxsize=cache_size)(self._canonicalize)
+        self._origin = lru_cache(maxsize=1024)(self._split_origin)
+
+    @classmethod
+    def for_config(cls, config) -> "URLNormalizer":
+        """Normalizer with the rule overrides of config.url_normalization"""
+        overrides = getattr(config, "url_normalization", None)
+        if not overrides:
+            return default_normalizer
+        return cls(CanonicalRules.from_dict(overrides))
+
+    def _canonicalize(self, url: str) -> str:
+        rules = self.rules
+        try:
+            parts = urlsplit(url.strip())
+            port = parts.port
+        except ValueError:
+            return url
+        scheme = parts.scheme
+        if scheme not in DEFAULT_PORTS or not parts.netloc:
+            return url
+
+        host = (parts.hostname or '').rstrip('.')
+        if ':' in host:
+            host = f"[{host}]"
+        netloc = host
+        if parts.username is not None:
+            userinfo = parts.netloc.rsplit('@', 1)[0]
+            netloc = f"{userinfo}@{host}"
+        if port is not None and not (rules.remove_default_port and port == DEFAULT_PORTS[scheme]):
+            netloc = f"{netloc}:{port}"
+
+        path = parts.path
+        if rules.normalize_percent_encoding:
+            path = _normalize_percent(path)
+        if rules.remove_dot_segments:
+            path = _remove_dot_segments(path)
+        if rules.remove_index_page:
+            last = path.rsplit('/', 1)[-1]
+            if last.lower() in INDEX_PAGES:
+                path = path[:-len(last)]
+        if not path:
+            path = '/'
+        if rules.strip_trailing_slash and len(path) > 1:
+            path = path.rstrip('/') or '/'
+
+        query = parts.query
+        if query and (rules.remove_tracking_params or rules.sort_query or rules.normalize_percent_encoding):
+            params = [param for param in query.split('&') if param]
+            if rules.remove_tracking_params:
+                params = [param for param in params if not _is_tracking_param(param.split('=', 1)[0])]
+            if rules.normalize_percent_encoding:
+                params = [_normalize_percent(param) for param in params]
+            if rules.sort_query:
+                params.sort()
+            query = '&'.join(params)
+
+        fragment = '' if rules.remove_fragment else parts.fragment
+        return urlunsplit((scheme, netloc, path, query, fragment))
+
+    def _split_origin(self, base_url: str) -> str:
+        parts = urlsplit(base_url)
+        return f"{parts.scheme}://{parts.netloc}"
+
+    def resolve(self, base_url: str, href: str) -> str:
+        """
+        Absolute URL of a link found on ``base_url``, as urljoin gives it
+
+        Absolute and root-relative links, the bulk of navigation menus,
+        skip urljoin entirely.
+        """
+        if href.startswith(('http://', 'https://')):
+            return href
+        if href.startswith('/') and not href.startswith('//'):
+            return self._origin(base_url) + href
+        return urljoin(base_url, href)
+
+    def join(self, base_url: str, href: str) -> str:
+        """Canonical form of a link found on ``base_url``"""
+        return self.canonicalize(self.resolve(base_url, href))
+
+    def cache_info(self):
+        return self.canonicalize.cache_info()
+
+
+default_normalizer = URLNormalizer()
+
+
+class CanonicalURLSet(MutableSet):
+    """
+    Set of URLs compared by canonical form, keeping each URL as first written
+
+    Adding a URL whose canonical form is already present does nothing, and
+    iteration yields the stored spellings, which are the URLs to fetch.
+    """
+
+    def __init__(self, urls: Iterable[str] = (), normalizer: Optional[URLNormalizer] = None):
+        self.normalizer = normalizer or default_normalizer
+        self._urls: Dict[str, str] = {}  # Canonical form -> URL as written
+        self.update(urls)
+
+    def __contains__(self, url: object) -> bool:
+        return isinstance(url, str) and self.normalizer.canonicalize(url) in self._urls
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._urls.values())
+
+    def __len__(self) -> int:
+        return len(self._urls)
+
+    def add(self, url: str) -> None:
+        self._urls.setdefault(self.normalizer.canonicalize(url), url)
+
+    def discard(self, url: str) -> None:
+        self._urls.pop(self.normalizer.canonicalize(url), None)
+
+    def update(self, urls: Iterable[str]) -> None:
+        for url in urls:
+            self.add(url)
+
+    def __repr__(self) -> str:
+        return f"CanonicalURLSet({list(self._urls.values())!r})"
+
+
+def canonicalize_url(url: str) -> str:
+    """Canonical form of ``url`` under the default rules"""
+    return default_normalizer.canonicalize(url)
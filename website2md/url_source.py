@@ -0,0 +1,156 @@
+"""
+Streaming readers for URL list files: plain text, gzip, zstd and sitemap XML
+"""
+
+import asyncio
+import gzip
+import io
+import logging
+import xml.etree.ElementTree as ET
+from contextlib import contextmanager
+from typing import AsyncIterator, BinaryIO, Iterable, Iterator, List, Tuple, TypeVar
+
+from .compression import _require_zstandard
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+_BUFFER_SIZE = 1024 * 1024
+
+
+def _local_name(tag: str) -> str:
+    """Strip the XML namespace from a tag name"""
+    return tag.rsplit('}', 1)[-1]
+
+
+@contextmanager
+def open_url_file(path: str) -> Iterator[BinaryIO]:
+    """
+    Open a URL file as a decompressed binary stream
+
+    gzip and zstd files are recognized by their magic bytes, whatever their
+    name, and decompressed while they are read.
+    """
+    raw = open(path, 'rb', buffering=_BUFFER_SIZE)
+    try:
+        head = raw.peek(4)[:4]
+        if head.startswith(_GZIP_MAGIC):
+            stream = io.BufferedReader(gzip.GzipFile(fileobj=raw), _BUFFER_SIZE)
+        elif head == _ZSTD_MAGIC:
+            _require_zstandard()
+            stream = io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(raw), _BUFFER_SIZE)
+        else:
+            stream = raw
+        yield stream
+    finally:
+        raw.close()
+
+
+def _is_xml(head: bytes) -> bool:
+    return head.lstrip(b"\xef\xbb\xbf \t\r\n").startswith(b"<")
+
+
+def is_plain_text_file(path: str) -> bool:
+    """True for an uncompressed, non-XML URL file, which can be memory-mapped"""
+    with open(path, 'rb') as f:
+        head = f.read(512)
+    return not (head.startswith(_GZIP_MAGIC) or head[:4] == _ZSTD_MAGIC or _is_xml(head))
+
+
+def iter_url_entries(path: str) -> Iterator[Tuple[int, str]]:
+    """
+    Yield the URL entries of a list file without loading it into memory
+
+    Text files yield one entry per non-empty line that is not a ``#``
+    comment. Sitemap XML files (``<urlset>``) yield the ``<loc>`` of every
+    ``<url>``; parsed elements are freed as the file is read, so memory
+    stays flat for sitemaps of any size. Child sitemaps of a
+    ``<sitemapindex>`` are not fetched.
+
+    Yields:
+        (line or entry number, stripped entry text)
+    """
+    with open_url_file(path) as stream:
+        if _is_xml(stream.peek(512)[:512]):
+            yield from _iter_sitemap_entries(path, stream)
+            return
+
+        text = io.TextIOWrapper(stream, encoding='utf-8', errors='replace')
+        for line_num, line in enumerate(text, 1):
+            line = line.strip()
+            if line and not line.startswith('#'):
+                yield line_num, line
+
+
+def _iter_sitemap_entries(path: str, stream: BinaryIO) -> Iterator[Tuple[int, str]]:
+    root = None
+    entry = 0
+    skipped_sitemaps = 0
+    for event, elem in ET.iterparse(stream, events=("start", "end")):
+        if root is None:
+            root = elem
+        if event != "end":
+            continue
+
+        kind = _local_name(elem.tag)
+        if kind not in ("url", "sitemap"):
+            continue
+        entry += 1
+        if kind == "sitemap":
+            skipped_sitemaps += 1
+        else:
+            for child in elem:
+                if _local_name(child.tag) == "loc" and child.text:
+                    yield entry, child.text.strip()
+                    break
+        # Drop parsed entries so the tree never holds more than one
+        root.clear()
+
+    if skipped_sitemaps:
+        logger.warning(f"{path} is a sitemap index; its {skipped_sitemaps} child sitemaps were not fetched")
+
+
+def iter_chunks(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Group ``items`` into lists of up to ``size``"""
+    chunk: List[T] = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+async def iterate_in_thread(iterator: Iterator[T]) -> AsyncIterator[T]:
+    """
+    Consume a blocking iterator from async code
+
+    Each ``next()`` runs on a worker thread, so reading, decompressing and
+    parsing never block the event loop. Iterate over chunks rather than
+    single items to keep the thread hand-offs cheap.
+    """
+    done = object()
+    try:
+        while True:
+            item = await asyncio.to_thread(next, iterator, done)
+            if item is done:
+                return
+            yield item
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            try:
+                close()
+            except ValueError:
+                # Cancelled while next() still runs on its thread; the
+                # generator is closed when it is garbage collected
+                pass
@@ -3,116 +3,66 @@ Utility functions for the web crawler
 """
 
 import json
-import csv
-import xml.etree.ElementTree as ET
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Iterator, Optional
 import re
-from urllib.parse import urlparse, urljoin
+from urllib.parse import urlparse, urljoin, urlsplit
 import logging
 import os
 
+from .domain_filter import DomainFilter
+from .public_suffix import base_domain
+from .url_normalizer import canonicalize_url
+
 logger = logging.getLogger(__name__)
 
 
-def save_results(results: List[Dict[str, Any]], filename: str, format: str = "json") -> None:
+def save_results(results: Iterable[Dict[str, Any]], filename: str, format: str = "json") -> None:
     """
     Save crawl results to file in specified format
     
+    Pages are written one at a time, so ``results`` may be any iterable;
+    to write during a crawl, pass a writer from sinks.create_writer() as the
+    crawl's sink instead.
+    
     Args:
-        results: List of crawled page data
+        results: Crawled page data
         filename: Output filename
-        format: Output format (json, csv, xml, txt)
+        format: Output format (json, jsonl, csv, xml, txt)
     """
-    format = format.lower()
+    from .sinks import create_writer
     
     try:
-        if format == "json":
-            _save_json(results, filename)
-        elif format == "csv":
-            _save_csv(results, filename)
-        elif format == "xml":
-            _save_xml(results, filename)
-        elif format == "txt":
-            _save_txt(results, filename)
-        else:
-            raise ValueError(f"Unsupported format: {format}")
+        with create_writer(filename, format) as writer:
+            for result in results:
+                writer.write(result)
             
-        logger.info(f"Results saved to {filename} in {format} format")
+        logger.info(f"Results saved to {filename} in {format.lower()} format")
         
     except Exception as e:
         logger.error(f"Error saving results: {e}")
         raise
 
 
-def _save_json(results: List[Dict[str, Any]], filename: str) -> None:
-    """Save results as JSON"""
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(results, f, indent=2, ensure_ascii=False, default=str)
-
-
-def _save_csv(results: List[Dict[str, Any]], filename: str) -> None:
-    """Save results as CSV"""
-    if not results:
-        return
-        
-    # Get all unique keys from all results
-    fieldnames = set()
-    for result in results:
-        fieldnames.update(result.keys())
-    
-    fieldnames = sorted(list(fieldnames))
+def read_jsonl(filename: str) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily read records from a JSON Lines file
     
-    with open(filename, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        
-        for result in results:
-            # Convert complex objects to strings
-            row = {}
-            for key, value in result.items():
-                if isinstance(value, (dict, list)):
-                    row[key] = json.dumps(value, ensure_ascii=False)
-                else:
-                    row[key] = str(value) if value is not None else ""
-            writer.writerow(row)
-
-
-def _save_xml(results: List[Dict[str, Any]], filename: str) -> None:
-    """Save results as XML"""
-    root = ET.Element("crawl_results")
+    A trailing record without a newline is ignored, so a file that is still
+    being written can be read safely.
     
-    for result in results:
-        page = ET.SubElement(root, "page")
+    Args:
+        filename: JSON Lines file
         
-        for key, value in result.items():
-            elem = ET.SubElement(page, key)
-            if isinstance(value, (dict, list)):
-                elem.text = json.dumps(value, ensure_ascii=False)
-            else:
-                elem.text = str(value) if value is not None else ""
-    
-    tree = ET.ElementTree(root)
-    tree.write(filename, encoding='utf-8', xml_declaration=True)
-
-
-def _save_txt(results: List[Dict[str, Any]], filename: str) -> None:
-    """Save results as plain text"""
-    with open(filename, 'w', encoding='utf-8') as f:
-        for i, result in enumerate(results, 1):
-            f.write(f"=== Page {i} ===\n")
-            f.write(f"URL: {result.get('url', 'N/A')}\n")
-            f.write(f"Title: {result.get('title', 'N/A')}\n")
-            f.write(f"Depth: {result.get('depth', 'N/A')}\n")
-            f.write(f"Status: {result.get('status_code', 'N/A')}\n")
-            
-            content = result.get('content', '')
-            if content:
-                # Truncate very long content
-                if len(content) > 1000:
-                    content = content[:1000] + "... [truncated]"
-                f.write(f"Content:\n{content}\n")
-            
-            f.write("\n" + "="*50 + "\n\n")
+    Yields:
+        One page record at a time
+    """
+    with open(filename, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.endswith('\n'):
+                break
+            line = line.strip()
+            if line:
+                yield json.loads(line)
 
 
 def load_config(config_file: str) -> Dict[str, Any]:
@@ -135,16 +85,13 @@ def is_valid_url(url: str) -> bool:
 
 
 def normalize_url(url: str) -> str:
-    """Normalize URL by removing fragments and lowercasing domain"""
-    try:
-        parsed = urlparse(url)
-        # Remove fragment and normalize
-        normalized = f"{parsed.scheme}://{parsed.netloc.lower()}{parsed.path}"
-        if parsed.query:
-            normalized += f"?{parsed.query}"
-        return normalized
-    except Exception:
-        return url
+    """
+    Canonical form of a URL under the default rules
+    
+    See url_normalizer.CanonicalRules; crawlers with custom rules use
+    URLNormalizer.for_config(config) instead.
+    """
+    return canonicalize_url(url)
 
 
 def extract_domain(url: str) -> str:
@@ -159,11 +106,16 @@ def extract_base_domain(url: str) -> str:
     """
     Extract base domain from URL, handling subdomains properly.
     
+    The base domain is the registrable domain under the bundled Public
+    Suffix List (see public_suffix.base_domain), so multi-label suffixes
+    and hosting platforms are handled too.
+    
     Examples:
         https://docs.anthropic.com/zh-CN/docs -> anthropic.com
         https://console.anthropic.com/legal -> anthropic.com  
         https://api.openai.com/v1/chat -> openai.com
-        https://platform.openai.com/docs -> openai.com
+        https://news.bbc.co.uk/sport -> bbc.co.uk
+        https://someone.github.io/blog -> someone.github.io
     
     Args:
         url: Full URL string
@@ -172,36 +124,7 @@ def extract_base_domain(url: str) -> str:
         Base domain string (e.g., "anthropic.com")
     """
     try:
-        domain = extract_domain(url)
-        if not domain:
-            return ""
-            
-        # Common domain suffixes (TLDs and common extensions)
-        domain_suffixes = [
-            '.com', '.ai', '.so', '.dev', '.online', '.org', '.net', 
-            '.cn', '.info', '.app', '.io', '.xyz', '.co', '.run', 
-            '.me', '.pro', '.top', '.edu', '.gov', '.mil'
-        ]
-        
-        # Split domain into parts
-        parts = domain.split('.')
-        
-        # Handle cases like "domain.co.uk", "domain.com.cn" etc.
-        # Look for known suffixes and preserve them
-        for suffix in domain_suffixes:
-            if domain.endswith(suffix):
-                suffix_parts = suffix[1:].split('.')  # Remove leading dot and split
-                if len(parts) >= len(suffix_parts) + 1:
-                    # Take the domain name + suffix
-                    base_parts = parts[-(len(suffix_parts) + 1):]
-                    return '.'.join(base_parts)
-        
-        # Fallback: take last two parts if we have them
-        if len(parts) >= 2:
-            return '.'.join(parts[-2:])
-        
-        return domain
-        
+        return base_domain(urlsplit(url).hostname or "")
     except Exception as e:
         logger.debug(f"Error extracting base domain from {url}: {e}")
         return ""
@@ -226,7 +149,7 @@ def is_same_base_domain(url1: str, url2: str) -> bool:
         base1 = extract_base_domain(url1)
         base2 = extract_base_domain(url2)
         
-        return base1 and base2 and base1 == base2
+        return bool(base1) and base1 == base2
     except Exception:
         return False
 
@@ -235,6 +158,8 @@ def should_crawl_url(target_url: str, base_url: str, allow_external_domains: boo
     """
     Determine if a URL should be crawled based on domain filtering rules.
     
+    One-off check; crawlers build a DomainFilter once per crawl instead.
+    
     Args:
         target_url: URL to check for crawling
         base_url: Original/base URL provided by user  
@@ -248,23 +173,9 @@ def should_crawl_url(target_url: str, base_url: str, allow_external_domains: boo
         # Basic URL validation
         if not is_valid_url(target_url) or not is_valid_url(base_url):
             return False
-            
-        target_domain = extract_domain(target_url)
-        base_domain = extract_domain(base_url)
         
-        # If external domains are explicitly allowed, crawl everything
-        if allow_external_domains:
-            return True
-            
-        # Check if exact same domain (including subdomain)
-        if target_domain == base_domain:
-            return True
-            
-        # Check if target domain is in allowed domains list
-        if allowed_domains and target_domain in allowed_domains:
-            return True
-            
-        return False
+        domain_filter = DomainFilter(base_url, allowed_domains, allow_external=allow_external_domains)
+        return domain_filter.matches(target_url)
         
     except Exception as e:
         logger.debug(f"Error checking if should crawl {target_url}: {e}")